@@ -15,15 +15,14 @@
 # under the License.
 
 """Follows (aka tails) a realtime search using the job endpoints and prints
-   results to stdout."""
+   results to stdout. See stail.py to tail a search from a single export
+   stream instead, without polling a job."""
 
 from pprint import pprint
 import sys, os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
-import time
 
 import splunklib.client as client
-import splunklib.results as results
 
 try:
     import utils
@@ -31,19 +30,6 @@ except ImportError:
     raise Exception("Add the SDK repository to your PYTHONPATH to run the examples "
                     "(e.g., export PYTHONPATH=~/splunk-sdk-python.")
 
-def follow(job, count, items):
-    offset = 0 # High-water mark
-    while True:
-        total = count()
-        if total <= offset:
-            time.sleep(1) # Wait for something to show up
-            job.refresh()
-            continue
-        stream = items(offset+1)
-        for event in results.ResultsReader(stream):
-            pprint(event)
-        offset = total
-
 def main():
     usage = "usage: follow.py <search>"
     opts = utils.parse(sys.argv[1:], {}, ".splunkrc", usage=usage)
@@ -60,23 +46,11 @@ def main():
         latest_time="rt", 
         search_mode="realtime")
 
-    # Wait for the job to transition out of QUEUED and PARSING so that
-    # we can if its a transforming search, or not.
-    while True:
-        job.refresh()
-        if job['dispatchState'] not in ['QUEUED', 'PARSING']:
-            break
-        time.sleep(2) # Wait
-        
-    if job['reportSearch'] is not None: # Is it a transforming search?
-        count = lambda: int(job['numPreviews'])
-        items = lambda _: job.preview()
-    else:
-        count = lambda: int(job['eventCount'])
-        items = lambda offset: job.events(offset=offset)
-    
     try:
-        follow(job, count, items)
+        # Job.follow fetches only the events added since the last poll (or
+        # each new preview of a transforming search).
+        for event in job.follow():
+            pprint(event)
     except KeyboardInterrupt:
         print "\nInterrupted."
     finally:
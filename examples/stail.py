@@ -23,7 +23,6 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 from pprint import pprint
 
 from splunklib.client import connect
-from splunklib.results import ResultsReader
 
 try:
     import utils
@@ -42,16 +41,9 @@ def main():
     service = connect(**opts.kwargs)
 
     try:
-        result = service.get(
-            "search/jobs/export",
-            search=search,
-            earliest_time="rt", 
-            latest_time="rt", 
-            search_mode="realtime")
-
-        for result in ResultsReader(result.body):
-            if result is not None:
-                print pprint(result)
+        # Jobs.follow reads a single realtime export stream.
+        for result in service.jobs.follow(search):
+            pprint(result)
 
     except KeyboardInterrupt:
         print "\nInterrupted."
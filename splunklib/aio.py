@@ -0,0 +1,574 @@
+# Copyright 2011-2014 Splunk, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"): you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""The **splunklib.aio** module provides asynchronous versions of
+:class:`splunklib.binding.Context` and :class:`splunklib.client.Service`.
+
+The asynchronous classes have the same interface as their synchronous
+counterparts, except that the methods that talk to splunkd return a
+:class:`Future` immediately instead of blocking until the response arrives.
+The requests themselves run on a bounded :class:`WorkerPool` that is shared
+by everything created from the same :class:`Context`, so a single process can
+have hundreds of searches and entity fetches in flight while only ever using
+a handful of threads and connections.
+
+The SDK supports versions of Python that predate ``asyncio``, which is why
+this module is built on futures rather than coroutines. The requests are made
+by the same code as the synchronous client, so namespaces, paths, and the
+parsing of responses behave exactly the same way.
+
+**Example**::
+
+    import splunklib.aio as aio
+    import splunklib.results as results
+    service = aio.Service(host="localhost", username="admin", password="...")
+    service.login().result()
+    jobs = [service.jobs.create(q, exec_mode="blocking") for q in queries]
+    for job in aio.as_completed(jobs):
+        stream = job.result().results().result()
+        for row in results.ResultsReader(stream):
+            ...
+    service.close()
+"""
+
+import logging
+import Queue
+import sys
+import threading
+import time
+from collections import deque
+
+import binding
+
+__all__ = [
+    "as_completed",
+    "CancelledError",
+    "Context",
+    "Future",
+    "gather",
+    "Service",
+    "TimeoutError",
+    "WorkerPool"
+]
+
+DEFAULT_WORKERS = 8
+
+
+class TimeoutError(Exception):
+    """Raised when a :class:`Future` is not done, or a search job has not
+    finished (see :meth:`splunklib.client.Job.wait`), within the time allowed."""
+    pass
+
+
+class CancelledError(Exception):
+    """Raised when the result of a cancelled :class:`Future` is requested."""
+    pass
+
+
+class Future(object):
+    """This class represents the result of an operation that may not have
+    finished yet.
+
+    A ``Future`` is returned by :meth:`WorkerPool.submit` and by all the
+    asynchronous methods in this module. Call :meth:`result` to wait for the
+    operation to finish and get its return value (or have its exception
+    raised).
+    """
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._state = "pending" # pending, running, cancelled, or finished
+        self._result = None
+        self._exc_info = None
+        self._callbacks = []
+
+    def __repr__(self):
+        return "<Future %s>" % self._state
+
+    def add_done_callback(self, fn):
+        """Calls *fn* with this ``Future`` once it is done.
+
+        If the ``Future`` is already done, *fn* is called immediately.
+        """
+        with self._condition:
+            if self._state in ("pending", "running"):
+                self._callbacks.append(fn)
+                return
+        fn(self)
+
+    def cancel(self):
+        """Cancels the operation if it has not started yet.
+
+        :return: ``True`` if the operation was cancelled.
+        :rtype: ``boolean``
+        """
+        with self._condition:
+            if self._state == "cancelled":
+                return True
+            if self._state != "pending":
+                return False
+            self._state = "cancelled"
+            self._condition.notify_all()
+        self._run_callbacks()
+        return True
+
+    def cancelled(self):
+        """Indicates whether the operation was cancelled."""
+        return self._state == "cancelled"
+
+    def done(self):
+        """Indicates whether the operation finished or was cancelled."""
+        return self._state in ("cancelled", "finished")
+
+    def exception(self, timeout=None):
+        """Waits for the operation and returns the exception it raised, or
+        ``None`` if it succeeded.
+
+        :param timeout: The number of seconds to wait (optional).
+        :type timeout: ``float``
+        :raises TimeoutError: Raised if the operation is not done in time.
+        """
+        self._wait(timeout)
+        return None if self._exc_info is None else self._exc_info[1]
+
+    def result(self, timeout=None):
+        """Waits for the operation and returns its result.
+
+        If the operation raised an exception, the same exception is raised
+        here, with its original traceback.
+
+        :param timeout: The number of seconds to wait (optional).
+        :type timeout: ``float``
+        :raises TimeoutError: Raised if the operation is not done in time.
+        """
+        self._wait(timeout)
+        if self._exc_info is not None:
+            raise self._exc_info[0], self._exc_info[1], self._exc_info[2]
+        return self._result
+
+    def _wait(self, timeout):
+        with self._condition:
+            if timeout is None:
+                while not self.done():
+                    # A finite wait keeps the thread responsive to
+                    # KeyboardInterrupt on Python 2.
+                    self._condition.wait(3600)
+            else:
+                deadline = time.time() + timeout
+                while not self.done():
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        raise TimeoutError("Operation did not finish in %s seconds." % timeout)
+                    self._condition.wait(remaining)
+            if self._state == "cancelled":
+                raise CancelledError()
+
+    def _start(self):
+        # Called by a worker before running the operation. Returns False if
+        # the operation was cancelled in the meantime.
+        with self._condition:
+            if self._state != "pending":
+                return False
+            self._state = "running"
+            return True
+
+    def _finish(self, result=None, exc_info=None):
+        with self._condition:
+            self._result = result
+            self._exc_info = exc_info
+            self._state = "finished"
+            self._condition.notify_all()
+        self._run_callbacks()
+
+    def _run_callbacks(self):
+        callbacks, self._callbacks = self._callbacks, []
+        for fn in callbacks:
+            try:
+                fn(self)
+            except Exception:
+                logging.exception("Exception in Future callback %s", fn)
+
+
+def _chain(future, fn):
+    # Returns a Future for fn(future.result()).
+    chained = Future()
+    def done(f):
+        if f.cancelled():
+            chained.cancel()
+            return
+        try:
+            chained._finish(fn(f.result()))
+        except:
+            chained._finish(exc_info=sys.exc_info())
+    future.add_done_callback(done)
+    return chained
+
+
+def as_completed(futures, timeout=None):
+    """Yields *futures* in the order they finish.
+
+    :param futures: The futures to wait for.
+    :type futures: ``list`` of :class:`Future`
+    :param timeout: The number of seconds to wait for all of them (optional).
+    :type timeout: ``float``
+    :raises TimeoutError: Raised if they are not all done in time.
+    """
+    futures = list(futures)
+    finished = Queue.Queue()
+    for future in futures:
+        future.add_done_callback(finished.put)
+    deadline = None if timeout is None else time.time() + timeout
+    for _ in xrange(len(futures)):
+        try:
+            if deadline is None:
+                yield finished.get(True, 3600)
+            else:
+                yield finished.get(True, max(0, deadline - time.time()))
+        except Queue.Empty:
+            if deadline is None:
+                continue
+            raise TimeoutError("Operations did not finish in %s seconds." % timeout)
+
+
+def gather(futures, timeout=None):
+    """Waits for all of *futures* and returns their results, in order.
+
+    :param futures: The futures to wait for.
+    :type futures: ``list`` of :class:`Future`
+    :param timeout: The number of seconds to wait for all of them (optional).
+    :type timeout: ``float``
+    :return: A ``list`` of results.
+    """
+    futures = list(futures)
+    deadline = None if timeout is None else time.time() + timeout
+    results = []
+    for future in futures:
+        remaining = None if deadline is None else max(0, deadline - time.time())
+        results.append(future.result(remaining))
+    return results
+
+
+class WorkerPool(object):
+    """This class runs functions on a bounded set of worker threads.
+
+    Threads are started as work arrives, up to *workers* of them, and live
+    until :meth:`shutdown` is called. They are daemon threads, so a pool that
+    is never shut down does not keep the process alive.
+
+    :param workers: The maximum number of threads (the default is 8).
+    :type workers: ``integer``
+
+    **Example**::
+
+        import splunklib.aio as aio
+        pool = aio.WorkerPool(4)
+        futures = [pool.submit(service.jobs.create, q) for q in queries]
+        jobs = aio.gather(futures)
+        pool.shutdown()
+    """
+    def __init__(self, workers=DEFAULT_WORKERS):
+        if workers < 1:
+            raise ValueError("A WorkerPool needs at least one worker.")
+        self.workers = workers
+        self._tasks = Queue.Queue()
+        self._threads = []
+        self._idle = 0 # Number of workers waiting for a task
+        self._lock = threading.Lock()
+        self._is_shutdown = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+
+    def submit(self, fn, *args, **kwargs):
+        """Schedules ``fn(*args, **kwargs)`` to run on a worker.
+
+        :return: A :class:`Future` for the value returned by *fn*.
+        """
+        future = Future()
+        with self._lock:
+            if self._is_shutdown:
+                raise RuntimeError("Cannot submit work to a WorkerPool that has been shut down.")
+            self._tasks.put((future, fn, args, kwargs))
+            if self._tasks.qsize() > self._idle and \
+                    len(self._threads) < self.workers:
+                thread = threading.Thread(target=self._work)
+                thread.daemon = True
+                thread.start()
+                self._threads.append(thread)
+        return future
+
+    def imap(self, fn, iterable, ordered=True, window=None):
+        """Lazily applies *fn* to each item of *iterable* on the workers.
+
+        At most *window* calls are in flight at a time, so arbitrarily long
+        iterables can be processed in bounded memory. Work that has not
+        started yet is cancelled if the caller stops iterating early.
+
+        :param fn: A function of one argument.
+        :param iterable: The arguments to call *fn* with.
+        :param ordered: If ``True`` (the default), results are yielded in the
+            order of *iterable*; otherwise they are yielded as they finish.
+        :type ordered: ``boolean``
+        :param window: The maximum number of calls in flight (the default is
+            twice the number of workers).
+        :type window: ``integer``
+        :return: An iterator over the results.
+        """
+        window = window or 2 * self.workers
+        items = iter(iterable)
+        pending = deque()
+        finished = Queue.Queue()
+        try:
+            for item in items:
+                future = self.submit(fn, item)
+                pending.append(future)
+                if not ordered:
+                    future.add_done_callback(finished.put)
+                if len(pending) >= window:
+                    yield self._next(pending, finished, ordered)
+            while pending:
+                yield self._next(pending, finished, ordered)
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def _next(self, pending, finished, ordered):
+        if ordered:
+            return pending.popleft().result()
+        future = finished.get()
+        pending.remove(future)
+        return future.result()
+
+    def shutdown(self, wait=True):
+        """Stops the workers once the work already submitted is done.
+
+        :param wait: If ``True`` (the default), blocks until the workers exit.
+        :type wait: ``boolean``
+        """
+        with self._lock:
+            if self._is_shutdown:
+                return
+            self._is_shutdown = True
+            threads = list(self._threads)
+            for _ in threads:
+                self._tasks.put(None)
+        if wait:
+            for thread in threads:
+                if thread is not threading.current_thread():
+                    thread.join()
+
+    def _work(self):
+        while True:
+            with self._lock:
+                self._idle += 1
+            task = self._tasks.get()
+            with self._lock:
+                self._idle -= 1
+            if task is None:
+                return
+            future, fn, args, kwargs = task
+            del task
+            if future._start():
+                try:
+                    result = fn(*args, **kwargs)
+                except:
+                    future._finish(exc_info=sys.exc_info())
+                else:
+                    future._finish(result)
+            del future, fn, args, kwargs
+
+
+class _Proxy(object):
+    # Wraps a synchronous SDK object so that the methods named in _methods
+    # run on a WorkerPool and return Futures. Everything else is passed
+    # through to the wrapped object unchanged.
+    _methods = ()
+
+    def __init__(self, target, pool):
+        object.__setattr__(self, "_target", target)
+        object.__setattr__(self, "pool", pool)
+
+    def __setattr__(self, name, value):
+        # Attributes such as token or namespace belong to the wrapped object.
+        setattr(self._target, name, value)
+
+    def __getattr__(self, name):
+        value = getattr(self._target, name)
+        if name not in self._methods:
+            return value
+        def method(*args, **kwargs):
+            future = self.pool.submit(value, *args, **kwargs)
+            return _chain(future, self._wrap)
+        method.__name__ = name
+        method.__doc__ = value.__doc__
+        return method
+
+    def __repr__(self):
+        return "<%s %r>" % (self.__class__.__name__, self._target)
+
+    def _wrap(self, value):
+        # Converts values returned by the synchronous methods.
+        return value
+
+
+class Context(_Proxy):
+    """This class is the asynchronous version of
+    :class:`splunklib.binding.Context`.
+
+    It takes the same arguments as the synchronous ``Context``, plus the
+    number of *workers* to run requests on. Unless you pass your own
+    *handler*, requests are made with a :func:`splunklib.binding.pooled_handler`
+    that keeps one connection per worker alive.
+
+    The :meth:`login`, :meth:`get`, :meth:`post`, :meth:`delete`, and
+    :meth:`request` methods return a :class:`Future`.
+
+    :param workers: The maximum number of concurrent requests (the default
+        is 8).
+    :type workers: ``integer``
+    :param pool: A :class:`WorkerPool` to run requests on, which may be shared
+        with other objects (optional; overrides *workers*).
+    :type pool: :class:`WorkerPool`
+
+    **Example**::
+
+        import splunklib.aio as aio
+        c = aio.Context(host="localhost", username="admin", password="...")
+        c.login().result()
+        responses = aio.gather([c.get(path) for path in paths])
+        c.close()
+    """
+    _methods = ("delete", "get", "login", "post", "request")
+
+    def __init__(self, handler=None, workers=DEFAULT_WORKERS, pool=None, **kwargs):
+        if pool is None:
+            pool = WorkerPool(workers)
+        if handler is None:
+            handler = binding.pooled_handler(pool_size=pool.workers)
+        _Proxy.__init__(self, self._create(handler=handler, **kwargs), pool)
+
+    def _create(self, **kwargs):
+        return binding.Context(**kwargs)
+
+    def _wrap(self, value):
+        # login returns the synchronous object, so that calls can be chained.
+        return self if value is self._target else value
+
+    def close(self):
+        """Shuts down the worker pool and closes idle connections."""
+        self.pool.shutdown()
+        handler = self._target.http.handler
+        if isinstance(handler, binding.ConnectionPool):
+            handler.close()
+
+
+class Service(Context):
+    """This class is the asynchronous version of
+    :class:`splunklib.client.Service`.
+
+    It takes the same arguments as :class:`Context`. In addition to the
+    methods of :class:`Context`, :meth:`search` returns a :class:`Future`,
+    and the collections (``apps``, ``jobs``, ``saved_searches``, and so on)
+    are wrapped so that their methods that make round trips to the server
+    return futures as well:
+
+    * ``list``, ``iter``, ``create``, ``delete``, ``get``, ``post``, and
+      ``item`` on collections.
+
+    * ``create``, ``export``, and ``oneshot`` on ``jobs``.
+
+    * ``is_done``, ``is_ready``, ``refresh``, ``results``, ``preview``,
+      ``events``, and the job control methods on the jobs returned.
+    """
+    _methods = Context._methods + ("search",)
+
+    def _create(self, **kwargs):
+        import client
+        return client.Service(**kwargs)
+
+    def __getattr__(self, name):
+        value = Context.__getattr__(self, name)
+        return self._wrap(value)
+
+    def _wrap(self, value):
+        import client
+        if value is self._target:
+            return self
+        if isinstance(value, client.Jobs):
+            return Jobs(value, self.pool)
+        if isinstance(value, client.Job):
+            return Job(value, self.pool)
+        if isinstance(value, client.ReadOnlyCollection):
+            return Collection(value, self.pool)
+        return value
+
+
+class Collection(_Proxy):
+    """The asynchronous version of a :class:`splunklib.client.Collection`.
+
+    ``list``, ``iter``, ``create``, ``delete``, ``get``, ``post``, and
+    ``itemmeta`` return futures. Because the results of ``iter`` are
+    collected on a worker, its future resolves to a ``list``. Use
+    :meth:`item` in place of ``collection[key]``.
+    """
+    _methods = ("create", "delete", "get", "item", "itemmeta", "iter", "list", "post")
+
+    def __getattr__(self, name):
+        if name == "item":
+            name = "__getitem__"
+            value = getattr(self._target, name)
+            return lambda key: _chain(self.pool.submit(value, key), self._wrap)
+        if name == "iter":
+            iterate = self._target.iter
+            return lambda *args, **kwargs: _chain(
+                self.pool.submit(lambda: list(iterate(*args, **kwargs))),
+                self._wrap)
+        return _Proxy.__getattr__(self, name)
+
+    def _wrap(self, value):
+        if isinstance(value, list):
+            return [self._wrap(x) for x in value]
+        return value
+
+
+class Jobs(Collection):
+    """The asynchronous version of :class:`splunklib.client.Jobs`.
+
+    In addition to the methods of :class:`Collection`, ``export`` and
+    ``oneshot`` return futures. Jobs are returned as :class:`Job` objects.
+    """
+    _methods = Collection._methods + ("export", "oneshot")
+
+    def _wrap(self, value):
+        import client
+        if isinstance(value, client.Job):
+            return Job(value, self.pool)
+        return Collection._wrap(self, value)
+
+
+class Job(_Proxy):
+    """The asynchronous version of :class:`splunklib.client.Job`.
+
+    The methods that make round trips to the server return futures. Methods
+    that returned the job itself resolve to this object.
+    """
+    _methods = ("cancel", "disable_preview", "enable_preview", "events",
+                "finalize", "is_done", "is_ready", "pause", "preview",
+                "refresh", "results", "searchlog", "set_priority", "set_ttl",
+                "summary", "timeline", "touch", "unpause")
+
+    def _wrap(self, value):
+        return self if value is self._target else value
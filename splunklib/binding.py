@@ -25,12 +25,19 @@ If you want a friendlier interface to the Splunk REST API, use the
 """
 
 import httplib
+import json
 import logging
+import os
 import socket
 import ssl
 import urllib
 import io
+import select
 import sys
+import tempfile
+import threading
+import time
+import zlib
 
 from datetime import datetime
 from functools import wraps
@@ -42,12 +49,22 @@ from xml.etree.ElementTree import XML
 
 from data import record
 
+try:
+    import fcntl
+except ImportError:
+    fcntl = None # Windows, which locks files with msvcrt
+    import msvcrt
+
 __all__ = [
     "AuthenticationError",
     "connect",
     "Context",
+    "ConnectionPool",
+    "FileSessionStore",
     "handler",
-    "HTTPError"
+    "HTTPError",
+    "pooled_handler",
+    "SessionStore"
 ]
 
 # If you change these, update the docstring
@@ -56,6 +73,13 @@ DEFAULT_HOST = "localhost"
 DEFAULT_PORT = "8089"
 DEFAULT_SCHEME = "https"
 
+# Defaults for the keep-alive connections of pooled_handler.
+DEFAULT_POOL_SIZE = 8
+DEFAULT_POOL_IDLE_TIMEOUT = 60
+
+# The number of compressed bytes read at a time from a compressed response.
+DECOMPRESS_CHUNK_SIZE = 64 * 1024
+
 def _log_duration(f):
     @wraps(f)
     def new_f(*args, **kwargs):
@@ -396,6 +420,11 @@ class Context(object):
     :param password: The password for the Splunk account.
     :type password: ``string``
     :param handler: The HTTP request handler (optional).
+    :param session_store: A store that shares the session token with the
+        other ``Context`` objects that log in as the same user to the same
+        Splunk instance, even in other processes (optional; see
+        :class:`SessionStore`).
+    :type session_store: :class:`SessionStore`
     :returns: A ``Context`` instance.
 
     **Example**::
@@ -421,6 +450,7 @@ class Context(object):
         self.username = kwargs.get("username", "")
         self.password = kwargs.get("password", "")
         self.autologin = kwargs.get("autologin", False)
+        self.session_store = kwargs.get("session_store")
 
     # Shared per-context request headers
     @property
@@ -464,10 +494,17 @@ class Context(object):
             socket.write("X-Splunk-Input-Mode: Streaming\\r\\n")
             socket.write("\\r\\n")
         """
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        host = self.host
+        if host.startswith('[') and host.endswith(']'):
+            host = host[1:-1]
+        sock = socket.create_connection((host, self.port))
         if self.scheme == "https":
-            sock = ssl.wrap_socket(sock)
-        sock.connect((socket.gethostbyname(self.host), self.port))
+            if hasattr(ssl, '_create_unverified_context'):
+                # Python 2.7.9+: the same unverified context as handler().
+                context = ssl._create_unverified_context()
+                sock = context.wrap_socket(sock, server_hostname=host)
+            else:
+                sock = ssl.wrap_socket(sock)
         return sock
 
     @_authentication
@@ -740,6 +777,13 @@ class Context(object):
         The authentication token obtained from the server is stored in the
         ``token`` field of the ``Context`` object.
 
+        If the ``Context`` has a session store, the token is taken from the
+        store instead, unless there is none yet, or it is the token this
+        ``Context`` already has (which has expired, when :meth:`login` is
+        called by ``autologin``). Only one ``Context`` sharing the store
+        logs in at a time, so when a session expires, the first one to log
+        in again stores its token and the others use it.
+
         :raises AuthenticationError: Raised when login fails.
         :returns: The ``Context`` object, so you can chain calls.
 
@@ -755,6 +799,23 @@ class Context(object):
             # password, then login is a nop, since we're automatically
             # logged in.
             return
+        store = self.session_store
+        if store is None:
+            return self._login()
+        key = "%s/%s" % (self.authority, self.username)
+        stale = None if self.token is _NoAuthenticationToken else self.token
+        with store.lock(key):
+            token = store.get(key)
+            if token is not None and token != stale:
+                self.token = token
+                store.avoided += 1
+                return self
+            self._login()
+            store.put(key, self.token)
+            store.logins += 1
+        return self
+
+    def _login(self):
         try:
             response = self.http.post(
                 self.authority + self._abspath("/services/auth/login"),
@@ -867,6 +928,9 @@ def connect(**kwargs):
     :param autologin: When ``True``, automatically tries to log in again if the
         session terminates.
     :type autologin: ``Boolean``
+    :param session_store: A store that shares the session token with other
+        ``Context`` objects (optional; see :class:`SessionStore`).
+    :type session_store: :class:`SessionStore`
     :return: An initialized :class:`Context` instance.
 
     **Example**::
@@ -879,6 +943,142 @@ def connect(**kwargs):
     c.login()
     return c
 
+class SessionStore(object):
+    """This class shares session tokens among the :class:`Context` objects
+    of a process that log in as the same user to the same Splunk instance.
+
+    Pass a session store to each ``Context`` (or
+    :class:`splunklib.client.Service`) as its *session_store* argument. The
+    first one to log in stores its session token, and the others use it
+    instead of logging in, until the session expires. Then the first one to
+    get an authentication error logs in again (if ``autologin`` is set), and
+    the others use the new token. Use a :class:`FileSessionStore` to share
+    the tokens among processes.
+
+    The ``logins`` and ``avoided`` fields count the logins made through the
+    store, and the logins avoided by using a stored token instead.
+
+    A subclass stores the tokens elsewhere by overriding :meth:`get`,
+    :meth:`put`, and :meth:`lock`.
+
+    **Example**::
+
+        import splunklib.binding as binding
+        store = binding.SessionStore()
+        contexts = [binding.connect(session_store=store, ...) for _ in range(8)]
+        print store.logins, store.avoided # 1 7
+    """
+    def __init__(self):
+        self.logins = 0
+        self.avoided = 0
+        self._tokens = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Returns the session token stored under *key*, or ``None``.
+
+        :param key: The Splunk instance and user the session is for.
+        :type key: ``string``
+        """
+        return self._tokens.get(key)
+
+    def put(self, key, token):
+        """Stores the session token *token* under *key*.
+
+        :param key: The Splunk instance and user the session is for.
+        :type key: ``string``
+        :param token: The session token.
+        :type token: ``string``
+        """
+        self._tokens[key] = token
+
+    @contextmanager
+    def lock(self, key):
+        """Returns a context manager that holds the lock on *key*, so that
+        only one :class:`Context` logs in as that user at a time.
+
+        :param key: The Splunk instance and user the session is for.
+        :type key: ``string``
+        """
+        with self._lock:
+            yield
+
+
+class FileSessionStore(SessionStore):
+    """This class is a :class:`SessionStore` that keeps the session tokens in
+    a file, so that the processes on a host share them.
+
+    The file is locked while a process logs in, so only one of them logs in
+    when a session expires. The file holds session keys, so it is readable
+    only by its owner. A path on a memory file system, such as
+    ``/dev/shm``, keeps the tokens out of persistent storage.
+
+    :param path: The path of the file to store the tokens in. A file with
+        ``.lock`` appended to the path is used for locking.
+    :type path: ``string``
+
+    **Example**::
+
+        import splunklib.client as client
+        import splunklib.binding as binding
+        store = binding.FileSessionStore("/dev/shm/splunk-sessions")
+        # In each worker process:
+        s = client.connect(session_store=store, autologin=True, ...)
+    """
+    def __init__(self, path):
+        super(FileSessionStore, self).__init__()
+        self.path = os.path.abspath(path)
+
+    def get(self, key):
+        token = self._read().get(key)
+        return None if token is None else str(token)
+
+    def put(self, key, token):
+        tokens = self._read()
+        tokens[key] = token
+        # Written to a temporary file (created readable only by its owner)
+        # and renamed, so that readers never see a partial file.
+        fd, temp = tempfile.mkstemp(prefix=".", dir=os.path.dirname(self.path))
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(tokens, f)
+            if os.name == 'nt' and os.path.exists(self.path):
+                os.remove(self.path)
+            os.rename(temp, self.path)
+        except:
+            os.remove(temp)
+            raise
+
+    @contextmanager
+    def lock(self, key):
+        # One lock for the whole file, held by one thread of one process.
+        with self._lock:
+            with open(self.path + ".lock", 'a+') as f:
+                if fcntl is not None:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+                else:
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                try:
+                    yield
+                finally:
+                    if fcntl is not None:
+                        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+                    else:
+                        f.seek(0)
+                        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def _read(self):
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except IOError:
+            return {} # Nothing stored yet
+        except ValueError:
+            logging.warning("Ignoring the malformed session store %s.", self.path)
+            return {}
+
+
 # Note: the error response schema supports multiple messages but we only
 # return the first, although we do return the body so that an exception
 # handler that wants to read multiple messages can do so.
@@ -1119,6 +1319,19 @@ class ResponseReader(io.RawIOBase):
     The ``ResponseReader`` class is intended to be a layer to unify the different
     types of HTTP libraries used with this SDK. This class also provides a
     preview of the stream and a few useful predicates.
+
+    A response body sent with ``Content-Encoding: gzip`` or ``deflate`` is
+    decompressed as it is read, so the reader always returns the
+    uncompressed body.
+
+    :meth:`readinto` reads the body of an uncompressed ``httplib`` response
+    from the socket straight into the buffer it is given, so wrapping a
+    ``ResponseReader`` in an ``io.BufferedReader`` (or calling
+    :meth:`readinto` with a buffer you reuse) reads the body without
+    building a string for each chunk.
+
+    :meth:`read1` returns as soon as any of the body has arrived, which is
+    what reading a stream, such as a realtime export, needs.
     """
     # For testing, you can use a StringIO as the argument to
     # ``ResponseReader`` instead of an ``httplib.HTTPResponse``. It
@@ -1144,13 +1357,29 @@ class ResponseReader(io.RawIOBase):
         :param size: The number of characters to retrieve.
         :type size: ``integer``
         """
-        c = self.read(size)
-        self._buffer = self._buffer + c
-        return c
+        # Only the characters not peeked at already are read.
+        if len(self._buffer) < size:
+            self._buffer += self._read(size - len(self._buffer))
+        return self._buffer[:size]
 
     def close(self):
         """Closes this response."""
         self._response.close()
+        io.RawIOBase.close(self)
+
+    def getheader(self, name, default=None):
+        """Returns the value of a header of the response.
+
+        :param name: The name of the header (case insensitive).
+        :type name: ``string``
+        :param default: The value to return if the header is not present, or
+            if the wrapped response carries no headers (optional).
+        :return: The value of the header, or *default*.
+        """
+        getheader = getattr(self._response, 'getheader', None)
+        if getheader is None:
+            return default
+        return getheader(name, default)
 
     def read(self, size = None):
         """Reads a given number of characters from the response.
@@ -1161,11 +1390,44 @@ class ResponseReader(io.RawIOBase):
 
         """
         r = self._buffer
+        if r == '':
+            return self._read(size)
+        if size is not None and 0 <= size <= len(r):
+            self._buffer = r[size:]
+            return r[:size]
         self._buffer = ''
-        if size is not None:
-            size -= len(r)
-        r = r + self._response.read(size)
-        return r
+        return r + self._read(None if size is None else size - len(r))
+
+    def _read(self, size):
+        data = self._response.read(size)
+        if data == '' and size > 0 and getattr(self._response, 'length', None) > 0:
+            # httplib returns an empty string instead of raising when the
+            # connection is lost before the whole body has arrived.
+            raise httplib.IncompleteRead('')
+        return data
+
+    def read1(self, size):
+        """Reads at most a given number of characters from the response,
+        waiting only for the first of them to arrive.
+
+        An empty string is returned only at the end of the response.
+
+        :param size: The most characters to read.
+        :type size: ``integer``
+        """
+        if self._buffer != '':
+            data, self._buffer = self._buffer[:size], self._buffer[size:]
+            return data
+        response = self._response
+        if isinstance(response, httplib.HTTPResponse):
+            data = _read1(response, size)
+        elif hasattr(response, 'read1'):
+            data = response.read1(size)
+        else:
+            data = response.read(size)
+        if data == '' and size > 0 and getattr(response, 'length', None) > 0:
+            raise httplib.IncompleteRead('')
+        return data
 
     def readable(self):
         """ Indicates that the response reader is readable."""
@@ -1178,54 +1440,229 @@ class ResponseReader(io.RawIOBase):
         :type byte_array: ``bytearray`` or ``memoryview``
 
         """
-        max_size = len(byte_array)
-        data = self.read(max_size)
-        bytes_read = len(data)
-        byte_array[:bytes_read] = data
-        return bytes_read
-
-
-def handler(key_file=None, cert_file=None, timeout=None):
+        view = memoryview(byte_array)
+        size = len(view)
+        count = 0
+        if self._buffer != '':
+            count = min(size, len(self._buffer))
+            view[:count] = self._buffer[:count]
+            self._buffer = self._buffer[count:]
+            if count == size:
+                return count
+        response = self._response
+        if isinstance(response, httplib.HTTPResponse):
+            n = _readinto(response, view[count:])
+        elif hasattr(response, 'readinto'):
+            n = response.readinto(view[count:])
+        else:
+            data = response.read(size - count)
+            n = len(data)
+            view[count:count + n] = data
+        if n == 0 and count == 0 and size > 0 and getattr(response, 'length', None) > 0:
+            raise httplib.IncompleteRead('')
+        return count + n
+
+
+# Reads the body of the httplib *response* into *view* the way
+# HTTPResponse.read does, but straight from the socket, without building a
+# string. The socket file of a response is unbuffered, so nothing of the body
+# has been read into it. Chunked responses, and responses that end when the
+# connection closes, are read (and copied) with HTTPResponse.read.
+def _readinto(response, view):
+    fp = response.fp
+    if fp is None:
+        return 0
+    if response.chunked or response.length is None or \
+            response._method == 'HEAD' or \
+            not isinstance(fp, socket._fileobject) or fp._rbuf.getvalue():
+        data = response.read(len(view))
+        view[:len(data)] = data
+        return len(data)
+    size = min(len(view), response.length)
+    count = fp._sock.recv_into(view, size) if size > 0 else 0
+    response.length -= count
+    if count == 0 or response.length == 0:
+        response.close()
+    return count
+
+
+# Reads at most *size* bytes of the body of the httplib *response*, waiting
+# only for the first of them, where HTTPResponse.read waits for all *size*:
+# the rest of the current chunk of a chunked response, or what the socket has
+# ready otherwise.
+def _read1(response, size):
+    if response.fp is None or size <= 0:
+        return ''
+    if response.chunked:
+        if response.chunk_left is None:
+            # Reading one byte reads the size of the next chunk.
+            data = response.read(1)
+            if data == '' or size == 1 or response.chunk_left is None:
+                return data
+            return data + response.read(min(size - 1, response.chunk_left))
+        return response.read(min(size, response.chunk_left))
+    fp = response.fp
+    if response.length is not None:
+        size = min(size, response.length)
+    if response._method == 'HEAD' or not isinstance(fp, socket._fileobject) or \
+            fp._rbuf.getvalue():
+        return response.read(size)
+    data = fp._sock.recv(size) if size > 0 else ''
+    if response.length is not None:
+        response.length -= len(data)
+    if data == '' or response.length == 0:
+        response.close()
+    return data
+
+
+def _connect(scheme, host, port, key_file=None, cert_file=None, timeout=None):
+    """Opens a new ``httplib`` connection to *host* and *port*."""
+    kwargs = {}
+    if timeout is not None: kwargs['timeout'] = timeout
+    if scheme == "http":
+        return httplib.HTTPConnection(host, port, **kwargs)
+    if scheme == "https":
+        if key_file is not None: kwargs['key_file'] = key_file
+        if cert_file is not None: kwargs['cert_file'] = cert_file
+
+        # If running Python 2.7.9+, disable SSL certificate validation
+        if sys.version_info >= (2,7,9) and key_file is None and cert_file is None:
+            kwargs['context'] = ssl._create_unverified_context()
+        return httplib.HTTPSConnection(host, port, **kwargs)
+    raise ValueError("unsupported scheme: %s" % scheme)
+
+# Builds the body and headers of an httplib request from the given request
+# message. With *compress*, the response may be compressed, and a body of at
+# least *compress_requests* bytes is sent gzip compressed.
+def _request(host, message, compress=False, compress_requests=None):
+    body = message.get("body", "")
+    head = {
+        "Content-Length": str(len(body)),
+        "Host": host,
+        "User-Agent": "splunk-sdk-python/0.1",
+        "Accept": "*/*",
+    } # defaults
+    if compress:
+        head["Accept-Encoding"] = "gzip, deflate"
+    for key, value in message["headers"]:
+        head[key] = value
+    if compress_requests is not None and isinstance(body, str) and \
+            len(body) >= compress_requests and \
+            not any(key.lower() == "content-encoding" for key in head):
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        body = compressor.compress(body) + compressor.flush()
+        head["Content-Encoding"] = "gzip"
+        head["Content-Length"] = str(len(body))
+    return body, head
+
+# Returns a ResponseReader over the body of the httplib *response*, read from
+# *raw*, which decompresses it if the server compressed it.
+def _response_body(response, raw):
+    encoding = (response.getheader("content-encoding") or "").strip().lower()
+    if encoding in ("gzip", "x-gzip", "deflate"):
+        raw = _DecompressedResponse(raw, encoding)
+    return ResponseReader(raw)
+
+
+class _DecompressedResponse(object):
+    """Wraps an ``httplib.HTTPResponse`` whose body is gzip or deflate
+    compressed, and decompresses the body incrementally as it is read.
+    """
+    def __init__(self, response, encoding):
+        self._response = response
+        # 32 + MAX_WBITS accepts both the gzip and the zlib header. Some
+        # servers send deflate without the zlib header, so that is retried
+        # as a raw stream.
+        self._decompressor = zlib.decompressobj(32 + zlib.MAX_WBITS)
+        self._raw = encoding == "deflate"
+        self._started = False
+
+    def __getattr__(self, name):
+        return getattr(self._response, name)
+
+    def read(self, size=None):
+        if size is not None and size < 0:
+            size = None
+        parts = []
+        while size is None or size > 0:
+            data = self._inflate(size)
+            if data == "":
+                break
+            parts.append(data)
+            if size is not None:
+                size -= len(data)
+        return "".join(parts)
+
+    def readinto(self, view):
+        # The compressed body cannot be read into the buffer, so this copies.
+        if len(view) == 0:
+            return 0
+        data = self._inflate(len(view))
+        view[:len(data)] = data
+        return len(data)
+
+    def read1(self, size):
+        return self._inflate(size) if size > 0 else ""
+
+    def _inflate(self, size):
+        # Returns at most *size* (or any number of) decompressed bytes, or ""
+        # at the end of the body. Only the compressed bytes that have arrived
+        # are read, so a stream is decompressed as it arrives.
+        response = self._response
+        if isinstance(response, httplib.HTTPResponse):
+            read1 = lambda size: _read1(response, size)
+        else:
+            read1 = getattr(response, 'read1', response.read)
+        while self._decompressor is not None:
+            data = self._decompressor.unconsumed_tail or read1(DECOMPRESS_CHUNK_SIZE)
+            if data == "":
+                data, self._decompressor = self._decompressor.flush(), None
+                return data
+            try:
+                data = self._decompressor.decompress(data, size or 0)
+            except zlib.error:
+                if not self._raw or self._started:
+                    raise
+                self._decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+                data = self._decompressor.decompress(data, size or 0)
+            self._started = True
+            if data != "":
+                return data
+        return ""
+
+
+def handler(key_file=None, cert_file=None, timeout=None, compress=True,
+            compress_requests=None):
     """This class returns an instance of the default HTTP request handler using
     the values you provide.
 
+    With *compress* set, the handler asks for gzip or deflate compressed
+    responses, which are decompressed as they are read (see
+    :class:`ResponseReader`). A request body of *compress_requests* bytes or
+    more, such as a large batch of events posted to ``receivers/simple``, is
+    sent gzip compressed, which needs a Splunk instance that accepts
+    compressed requests.
+
     :param `key_file`: A path to a PEM (Privacy Enhanced Mail) formatted file containing your private key (optional).
     :type key_file: ``string``
     :param `cert_file`: A path to a PEM (Privacy Enhanced Mail) formatted file containing a certificate chain file (optional).
     :type cert_file: ``string``
     :param `timeout`: The request time-out period, in seconds (optional).
     :type timeout: ``integer`` or "None"
+    :param `compress`: Whether to accept compressed responses (the default
+        is ``True``).
+    :type compress: ``boolean``
+    :param `compress_requests`: The smallest request body, in bytes, to
+        compress (optional, the default is to never compress).
+    :type compress_requests: ``integer`` or "None"
     """
 
-    def connect(scheme, host, port):
-        kwargs = {}
-        if timeout is not None: kwargs['timeout'] = timeout
-        if scheme == "http":
-            return httplib.HTTPConnection(host, port, **kwargs)
-        if scheme == "https":
-            if key_file is not None: kwargs['key_file'] = key_file
-            if cert_file is not None: kwargs['cert_file'] = cert_file
-
-            # If running Python 2.7.9+, disable SSL certificate validation
-            if sys.version_info >= (2,7,9) and key_file is None and cert_file is None:
-                kwargs['context'] = ssl._create_unverified_context()
-            return httplib.HTTPSConnection(host, port, **kwargs)
-        raise ValueError("unsupported scheme: %s" % scheme)
-
     def request(url, message, **kwargs):
         scheme, host, port, path = _spliturl(url)
-        body = message.get("body", "")
-        head = {
-            "Content-Length": str(len(body)),
-            "Host": host,
-            "User-Agent": "splunk-sdk-python/0.1",
-            "Accept": "*/*",
-        } # defaults
-        for key, value in message["headers"]:
-            head[key] = value
+        body, head = _request(host, message, compress, compress_requests)
         method = message.get("method", "GET")
 
-        connection = connect(scheme, host, port)
+        connection = _connect(scheme, host, port, key_file, cert_file, timeout)
         try:
             connection.request(method, path, body, head)
             if timeout is not None:
@@ -1238,7 +1675,276 @@ def handler(key_file=None, cert_file=None, timeout=None):
             "status": response.status,
             "reason": response.reason,
             "headers": response.getheaders(),
-            "body": ResponseReader(response),
+            "body": _response_body(response, response),
         }
 
     return request
+
+
+def pooled_handler(key_file=None, cert_file=None, timeout=None,
+                   pool_size=DEFAULT_POOL_SIZE,
+                   idle_timeout=DEFAULT_POOL_IDLE_TIMEOUT, compress=True,
+                   compress_requests=None):
+    """Returns an HTTP request handler that keeps connections alive between
+    requests.
+
+    The handler is a drop-in replacement for the one returned by
+    :func:`handler`, but instead of paying for a TCP (and SSL) handshake on
+    every request, it reuses the connections to each scheme, host, and port.
+    See :class:`ConnectionPool` for details.
+
+    :param `key_file`: A path to a PEM (Privacy Enhanced Mail) formatted file containing your private key (optional).
+    :type key_file: ``string``
+    :param `cert_file`: A path to a PEM (Privacy Enhanced Mail) formatted file containing a certificate chain file (optional).
+    :type cert_file: ``string``
+    :param `timeout`: The request time-out period, in seconds (optional).
+    :type timeout: ``integer`` or "None"
+    :param `pool_size`: The maximum number of idle connections kept for each
+        scheme, host, and port (the default is 8).
+    :type pool_size: ``integer``
+    :param `idle_timeout`: The number of seconds an idle connection is kept
+        before it is discarded (the default is 60).
+    :type idle_timeout: ``integer``
+    :param `compress`: Whether to accept compressed responses (the default
+        is ``True``), as for :func:`handler`.
+    :type compress: ``boolean``
+    :param `compress_requests`: The smallest request body, in bytes, to
+        compress (optional, the default is to never compress), as for
+        :func:`handler`.
+    :type compress_requests: ``integer`` or "None"
+    :return: A :class:`ConnectionPool`.
+
+    **Example**::
+
+        import splunklib.binding as binding
+        import splunklib.client as client
+        service = client.connect(handler=binding.pooled_handler(), ...)
+    """
+    return ConnectionPool(key_file=key_file, cert_file=cert_file,
+                          timeout=timeout, pool_size=pool_size,
+                          idle_timeout=idle_timeout, compress=compress,
+                          compress_requests=compress_requests)
+
+
+class ConnectionPool(object):
+    """This class is an HTTP request handler that reuses keep-alive
+    connections.
+
+    A ``ConnectionPool`` is called exactly like the function returned by
+    :func:`handler`, so it can be passed as the ``handler`` argument of
+    :class:`Context` or :class:`splunklib.client.Service`. Use the
+    :func:`pooled_handler` function to create one.
+
+    A connection goes back to the pool once the body of its response has been
+    read to the end or the response is closed. At most *pool_size* idle
+    connections are kept for each (scheme, host, port); any others are closed.
+    Idle connections are discarded once they are older than *idle_timeout*
+    seconds or the server has closed them. The server may still close an
+    idle connection just as a request is sent on it. Such a request is sent
+    again on a new connection only if it is a ``GET``, ``HEAD``, or
+    ``OPTIONS``, and failed before any of a response arrived. Other requests
+    raise the error, because the server may have run them.
+
+    A single ``ConnectionPool`` can be shared by many threads, and by many
+    ``Context`` objects.
+
+    **Example**::
+
+        import splunklib.binding as binding
+        pool = binding.pooled_handler(pool_size=4, idle_timeout=30)
+        c = binding.connect(handler=pool, ...)
+        c.get("apps/local").body.read()
+        c.get("apps/local").body.read() # Reuses the first connection.
+        pool.close()
+    """
+    def __init__(self, key_file=None, cert_file=None, timeout=None,
+                 pool_size=DEFAULT_POOL_SIZE,
+                 idle_timeout=DEFAULT_POOL_IDLE_TIMEOUT, compress=True,
+                 compress_requests=None):
+        if pool_size < 0:
+            raise ValueError("pool_size must not be negative.")
+        self.key_file = key_file
+        self.cert_file = cert_file
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.idle_timeout = idle_timeout
+        self.compress = compress
+        self.compress_requests = compress_requests
+        self.created = 0 # Number of connections opened
+        self.reused = 0  # Number of requests sent over a pooled connection
+        self._idle = {}  # (scheme, host, port) -> [(connection, released_at)]
+        self._lock = threading.Lock()
+
+    def __call__(self, url, message, **kwargs):
+        scheme, host, port, path = _spliturl(url)
+        body, head = _request(host, message, self.compress,
+                              self.compress_requests)
+        method = message.get("method", "GET")
+        key = (scheme, host, port)
+
+        while True:
+            connection, reused = self._acquire(key)
+            sent = False
+            try:
+                connection.request(method, path, body, head)
+                sent = True
+                if self.timeout is not None:
+                    connection.sock.settimeout(self.timeout)
+                response = connection.getresponse()
+                break
+            except (httplib.HTTPException, socket.error) as e:
+                connection.close()
+                # The server may close a keep-alive connection at any time
+                # while it sits in the pool. Resend the request on a new
+                # connection only if that cannot run it twice.
+                if not reused or method not in _IDEMPOTENT_METHODS or \
+                        (sent and not _no_response(e)):
+                    raise
+                logging.debug("Pooled connection to %s:%s failed; retrying.", host, port)
+            except:
+                connection.close()
+                raise
+
+        return {
+            "status": response.status,
+            "reason": response.reason,
+            "headers": response.getheaders(),
+            "body": _response_body(
+                response, _PooledResponse(self, key, connection, response)),
+        }
+
+    @property
+    def idle(self):
+        """Returns the number of idle connections in this pool."""
+        with self._lock:
+            return sum(len(v) for v in self._idle.itervalues())
+
+    def close(self):
+        """Closes all idle connections in this pool.
+
+        Connections whose responses are still being read are closed when
+        those responses are done.
+        """
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for connections in idle.itervalues():
+            for connection, _ in connections:
+                connection.close()
+
+    def _acquire(self, key):
+        # Returns a (connection, reused) pair for *key*, preferring the most
+        # recently used idle connection that is still alive.
+        while True:
+            with self._lock:
+                connections = self._idle.get(key)
+                if not connections:
+                    self.created += 1
+                    break
+                connection, released_at = connections.pop()
+            if time.time() - released_at < self.idle_timeout and \
+                    not _is_dropped(connection.sock):
+                with self._lock:
+                    self.reused += 1
+                return connection, True
+            connection.close()
+        scheme, host, port = key
+        connection = _connect(scheme, host, port, self.key_file,
+                              self.cert_file, self.timeout)
+        return connection, False
+
+    def _release(self, key, connection):
+        # Returns *connection* to the pool, or closes it if the pool is full.
+        now = time.time()
+        expired = []
+        with self._lock:
+            connections = self._idle.setdefault(key, [])
+            # Connections are appended in release order, so the stale ones
+            # are always at the front.
+            while connections and now - connections[0][1] >= self.idle_timeout:
+                expired.append(connections.pop(0)[0])
+            if len(connections) < self.pool_size:
+                connections.append((connection, now))
+                connection = None
+        for c in expired:
+            c.close()
+        if connection is not None:
+            connection.close()
+
+
+# The methods whose requests may be sent again when the connection fails
+_IDEMPOTENT_METHODS = frozenset(["GET", "HEAD", "OPTIONS"])
+
+# Returns True if *error*, raised while waiting for a response, means the
+# server closed the connection before sending any of the response.
+def _no_response(error):
+    if not isinstance(error, httplib.BadStatusLine):
+        return False
+    # Older releases of Python 2.7 pass the empty line itself.
+    return error.line in ("", "''") or \
+        error.line.startswith("No status line received")
+
+# Returns True if the server closed the idle *connection* (or sent data we did
+# not ask for, which leaves the connection just as unusable).
+def _is_dropped(sock):
+    # An idle socket that is readable has been closed by the server (or has
+    # unexpected data on it); either way it cannot be used for a request.
+    if sock is None:
+        return True
+    try:
+        readable, _, _ = select.select([sock], [], [], 0)
+    except (select.error, socket.error, ValueError):
+        return True
+    return len(readable) > 0
+
+
+class _PooledResponse(object):
+    """Wraps an ``httplib.HTTPResponse`` so that its connection goes back to a
+    :class:`ConnectionPool` once the response body has been consumed.
+    """
+    def __init__(self, pool, key, connection, response):
+        self._pool = pool
+        self._key = key
+        self._connection = connection
+        self._response = response
+        if response.length == 0:
+            # Nothing to read (204, 304, HEAD, ...), so release right away.
+            self.read()
+
+    def __getattr__(self, name):
+        return getattr(self._response, name)
+
+    def _finish(self):
+        connection, self._connection = self._connection, None
+        if connection is None:
+            return
+        if connection.sock is None or self._response.will_close:
+            connection.close()
+        else:
+            self._pool._release(self._key, connection)
+
+    def read(self, size=None):
+        data = self._response.read(size)
+        if self._response.isclosed():
+            self._finish()
+        return data
+
+    def readinto(self, view):
+        count = _readinto(self._response, view)
+        if self._response.isclosed():
+            self._finish()
+        return count
+
+    def read1(self, size):
+        data = _read1(self._response, size)
+        if self._response.isclosed():
+            self._finish()
+        return data
+
+    def close(self):
+        if not self._response.isclosed():
+            # Unread data is still on the wire; the connection is unusable.
+            self._response.close()
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+        self._finish()
@@ -58,21 +58,54 @@ attributes, and methods that are specific to each kind of entity. For example::
     my_app.package()  # Creates a compressed package of this application
 """
 
+import calendar
 import datetime
+import errno
+import hashlib
+import heapq
+import httplib
+import io
+import itertools
 import json
+import mmap
+import os
+import tempfile
 import urllib
 import logging
+import Queue
+import re
+import sys
+import threading
+import time
 from time import sleep
 from datetime import datetime, timedelta
 import socket
 import contextlib
-
-from binding import Context, HTTPError, AuthenticationError, namespace, UrlEncoded, _encode
+import math
+import zlib
+from StringIO import StringIO
+
+try:
+    from xml.etree.cElementTree import XML
+except ImportError:
+    from xml.etree.ElementTree import XML
+
+try:
+    from collections import OrderedDict  # must be python 2.7
+except ImportError:
+    from ordereddict import OrderedDict
+
+from aio import WorkerPool, DEFAULT_WORKERS, TimeoutError
+from binding import Context, HTTPError, AuthenticationError, namespace, UrlEncoded, _encode, _is_dropped
 from data import record
 import data
+import results
 
 __all__ = [
     "connect",
+    "EntityCache",
+    "ResultCache",
+    "SearchPool",
     "NotSupportedError",
     "OperationError",
     "IncomparableException",
@@ -110,6 +143,16 @@ XNAME_CONTENT = XNAMEF_ATOM % "content"
 
 MATCH_ENTRY_CONTENT = "%s/%s/*" % (XNAME_ENTRY, XNAME_CONTENT)
 
+# The number of results each slice of Jobs.parallel_export may read ahead of
+# the caller.
+EXPORT_SLICE_BUFFER = 1000
+
+
+class _ExportStopped(Exception):
+    # Raised in the workers of Jobs.parallel_export once the caller has
+    # stopped iterating.
+    pass
+
 
 class IllegalOperationException(Exception):
     """Thrown when an operation is not possible on the Splunk instance that a
@@ -196,24 +239,91 @@ def _load_atom(response, match=None):
     return data.load(response.body.read(), match)
 
 
-# Load an array of atom entries from the body of the given response
+# Load an array of atom entries from the body of the given response. Each
+# <entry> of a <feed> is loaded as it is parsed. Unlike most other endpoints,
+# the jobs endpoint does not return its state wrapped in another element, but
+# at the top level. For example, in XML, it returns <entry>...</entry> instead
+# of <feed><entry>...</entry></feed>.
 def _load_atom_entries(response):
-    r = _load_atom(response)
-    if 'feed' in r:
-        # Need this to handle a random case in the REST API
-        if r.feed.get('totalResults') == 0:
-            return []
-        entries = r.feed.get('entry', None)
-        if entries is None: return None
-        return entries if isinstance(entries, list) else [entries]
-    # Unlike most other endpoints, the jobs endpoint does not return
-    # its state wrapped in another element, but at the top level.
-    # For example, in XML, it returns <entry>...</entry> instead of
-    # <feed><entry>...</entry></feed>.
-    else:
-        entries = r.get('entry', None)
-        if entries is None: return None
-        return entries if isinstance(entries, list) else [entries]
+    return list(data.iterload(response.body.read(), 'entry'))
+
+
+# Load the <entry> elements from the body of the given response without
+# converting them to records, for entities whose state is parsed lazily
+def _load_atom_elements(response):
+    text = response.body.read().strip()
+    if len(text) == 0: return []
+    root = XML(text)
+    if data.localname(root.tag) == 'entry':
+        return [root] # See _load_atom_entries
+    return [child for child in root if data.localname(child.tag) == 'entry']
+
+
+# Defer parsing the given <entry> element into the state of the given entity
+# until the state is first used. The title is kept for Entity.name.
+def _lazy_entity(entity, element):
+    entity._entry = element
+    entity._title = _entry_title(element)
+    return entity
+
+
+# Return the title of the given <entry> element
+def _entry_title(element):
+    for child in element:
+        if data.localname(child.tag) == 'title':
+            return (child.text or '').strip() or None
+    return None
+
+
+# Return the href of the link of the given <entry> element with the given rel
+def _entry_link(element, rel):
+    for child in element:
+        if data.localname(child.tag) == 'link' and child.get('rel') == rel:
+            return child.get('href')
+    return None
+
+
+# Sorts in the reverse order of the value it wraps (see _merge_sorted)
+class _Descending(object):
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __eq__(self, other):
+        return self.value == other.value
+
+    def __lt__(self, other):
+        return other.value < self.value
+
+
+# Merge the given lists, each sorted by the given key, into one sorted
+# iterator. heapq.merge only takes a key since Python 3.5.
+def _merge_sorted(lists, key, reverse=False):
+    wrap = _Descending if reverse else (lambda value: value)
+    heap = []
+    for i, items in enumerate(lists):
+        if len(items) > 0:
+            heap.append((wrap(key(items[0])), i, 0))
+    heapq.heapify(heap)
+    while heap:
+        _, i, n = heap[0]
+        items = lists[i]
+        yield items[n]
+        if n + 1 < len(items):
+            heapq.heapreplace(heap, (wrap(key(items[n + 1])), i, n + 1))
+        else:
+            heapq.heappop(heap)
+
+
+# Matches the <opensearch:totalResults> element of an Atom feed
+_TOTAL_RESULTS = re.compile(r"<(?:\w+:)?totalResults>\s*(\d+)\s*<")
+
+
+# Return the totalResults of the given Atom feed text, or None
+def _total_results(text):
+    match = _TOTAL_RESULTS.search(text)
+    return int(match.group(1)) if match is not None else None
 
 
 # Load the sid from the body of the given response
@@ -305,6 +415,487 @@ def connect(**kwargs):
     return Service(**kwargs).login()
 
 
+def _cache_path(path):
+    # The form of an entity path used in cache keys, so that the paths built
+    # by collections and the paths taken from Atom links match.
+    return urllib.unquote(str(path)).strip('/')
+
+
+# Drop the cached state of the entity at *path*, and of the collection it
+# belongs to (with the other entities in it), for a write that does not go
+# through Entity.post or Entity.delete
+def _invalidate_cached(service, path):
+    cache = getattr(service, 'cache', None)
+    if cache is not None:
+        cache.invalidate(str(path).strip('/').rsplit('/', 1)[0])
+
+
+def _copy_entity(entity):
+    # A shallow copy of an entity, which shares its state record.
+    copy = entity.__class__.__new__(entity.__class__)
+    copy.__dict__.update(entity.__dict__)
+    return copy
+
+
+class EntityCache(object):
+    """This class caches the state of entities for a :class:`Service`.
+
+    The cache is off by default. Turn it on by passing *cache_ttl* to
+    :class:`Service` (or :func:`connect`), or by setting the ``cache`` field
+    of a :class:`Service` to an ``EntityCache``. While it is on, creating an
+    entity without its state (``Entity(service, path)``), reading the fields
+    of such an entity, and fetching an entity from a collection
+    (``service.apps['search']``) reuse what the server returned for the same
+    path and namespace within the last *ttl* seconds. Calling
+    :meth:`Entity.refresh` always makes a round trip, and stores its result.
+
+    Entries are dropped when the entity is changed through the SDK, which
+    means any ``POST`` to the entity (:meth:`Entity.update`,
+    :meth:`Entity.enable`, :meth:`Entity.disable`, and so on),
+    :meth:`Entity.delete`, :meth:`Collection.create`, and
+    :meth:`Collection.delete`. Changes made by other clients are only seen
+    once entries expire. When there are more than *max_size* entries, the
+    least recently used ones are dropped. Search jobs, whose state changes
+    on its own, are never cached.
+
+    :param ttl: The number of seconds an entry is used for.
+    :type ttl: ``float``
+    :param max_size: The maximum number of entries.
+    :type max_size: ``integer``
+
+    **Example**::
+
+        import splunklib.client as client
+        s = client.connect(..., cache_ttl=30)
+        for _ in range(10):
+            s.indexes['main'].totalEventCount # One round trip
+        print s.cache.hits, s.cache.misses # 9 1
+    """
+    def __init__(self, ttl=30, max_size=1000):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict() # key -> (expiry time, value)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        """Drops all the entries."""
+        with self._lock:
+            self._entries.clear()
+
+    def get(self, key):
+        """Returns the value cached for *key*, or ``None``.
+
+        :param key: A tuple whose first item is the path of an entity.
+        """
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None or entry[0] < time.time():
+                self.misses += 1
+                return None
+            self._entries[key] = entry # Most recently used at the end
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, value):
+        """Caches *value* for *key*.
+
+        :param key: A tuple whose first item is the path of an entity.
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (time.time() + self.ttl, value)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, path):
+        """Drops the entries of the entity at *path*, in all namespaces, and
+        of the entities below it.
+
+        :param path: The path of an entity, without a namespace.
+        :type path: ``string``
+        """
+        path = _cache_path(path)
+        prefix = path + '/'
+        with self._lock:
+            for key in [k for k in self._entries
+                        if k[0] == path or k[0].startswith(prefix)]:
+                del self._entries[key]
+
+
+class _InputKinds(object):
+    # The input kinds of a Service, and the kinds of its inputs by name, which
+    # Inputs keeps for ttl seconds. Each is an (expiry time, value) tuple, or
+    # None when it is not known.
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self.clear()
+
+    def clear(self):
+        self.kinds = None
+        self.names = None
+
+    def get(self, field):
+        entry = getattr(self, field)
+        if entry is None or entry[0] < time.time():
+            return None
+        return entry[1]
+
+    def put(self, field, value):
+        setattr(self, field, (time.time() + self.ttl, value))
+        return value
+
+
+# The names of the files of a ResultCache, which are SHA-1 digests
+_RESULT_FILE = re.compile(r'^[0-9a-f]{40}$')
+
+# An absolute time, as an epoch time or an ISO 8601 time with an optional
+# UTC offset
+_EPOCH_TIME = re.compile(r'^\d+(\.\d*)?$')
+_ISO_TIME = re.compile(r'^(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2})(\.\d*)?'
+                       r'(Z|([+-])(\d{2}):?(\d{2}))?$')
+
+
+# Return the epoch time of an absolute search time, or None for a relative
+# one. A time without a UTC offset is in the time zone of the server, so it
+# is made a day later, which is the latest it can mean in any time zone.
+def _absolute_time(value):
+    value = str(value).strip()
+    if _EPOCH_TIME.match(value):
+        return float(value)
+    match = _ISO_TIME.match(value)
+    if match is None:
+        return None
+    seconds = calendar.timegm(time.strptime(match.group(1), "%Y-%m-%dT%H:%M:%S"))
+    if match.group(3) is None:
+        return seconds + 86400
+    if match.group(4) is not None:
+        offset = int(match.group(5)) * 3600 + int(match.group(6)) * 60
+        seconds -= offset if match.group(4) == '+' else -offset
+    return seconds
+
+
+# The server and user whose search results are cached, and the namespace
+# they are searched in by default. A service given only a token has no
+# username, so it is told apart from others by a digest of its token.
+def _result_origin(service):
+    user = service.username or hashlib.sha1(str(service.token)).hexdigest()
+    return (service.scheme, service.host, service.port, user,
+            tuple(sorted(service.namespace.items())))
+
+
+# Collapse the whitespace in a search query outside of quoted strings
+def _normalize_query(query):
+    return re.sub(r'"(?:[^"\\]|\\.)*"|\s+',
+                  lambda m: m.group(0) if m.group(0).startswith('"') else ' ',
+                  query.strip())
+
+
+# Copy the rest of *body* to the file *f*, through one reused buffer when the
+# body supports readinto
+def _copy_body(body, f, chunk_size=64*1024):
+    if not hasattr(body, 'readinto'):
+        while True:
+            chunk = body.read(chunk_size)
+            if chunk == "":
+                return
+            f.write(chunk)
+    buffer = bytearray(chunk_size)
+    view = memoryview(buffer)
+    while True:
+        count = body.readinto(buffer)
+        if count == 0:
+            return
+        f.write(view[:count])
+
+
+class _MappedResults(io.RawIOBase):
+    # A file-like object that reads the results stored by a ResultCache from
+    # a memory map of the file, like the ResponseReader they were read from.
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            header = json.loads(f.readline())
+            self._offset = f.tell()
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._position = self._offset
+        self._headers = header.get('headers', {})
+
+    def __str__(self):
+        return self.read()
+
+    def __len__(self):
+        return len(self._map) - self._offset
+
+    @property
+    def empty(self):
+        return self._position >= len(self._map)
+
+    def peek(self, size):
+        return self._map[self._position:self._position + size]
+
+    def getheader(self, name, default=None):
+        return self._headers.get(name.lower(), default)
+
+    def read(self, size=None):
+        if size is None or size < 0:
+            end = len(self._map)
+        else:
+            end = min(self._position + size, len(self._map))
+        data = self._map[self._position:end]
+        self._position = end
+        return data
+
+    def readable(self):
+        return True
+
+    def readinto(self, byte_array):
+        data = self.read(len(byte_array))
+        byte_array[:len(data)] = data
+        return len(data)
+
+    def close(self):
+        if not self.closed:
+            self._map.close()
+        io.RawIOBase.close(self)
+
+
+class ResultCache(object):
+    """This class caches the results of searches on disk for a
+    :class:`Service`.
+
+    The cache is off by default. Turn it on by passing a ``ResultCache`` as
+    *result_cache* to :class:`Service` (or :func:`connect`), or by setting
+    the ``result_cache`` field of a :class:`Service`. While it is on,
+    :meth:`Jobs.oneshot` and :meth:`SavedSearch.dispatch_results` return the
+    results of an identical earlier call without contacting splunkd. Calls
+    are identical when they are made to the same server, by the same user,
+    in the same namespace, with the same query (up to whitespace outside of
+    quoted strings), time bounds, ``output_mode``, and other arguments.
+
+    How long results are kept depends on the latest time of the search. If
+    it is an absolute time in the past, the results are not expected to
+    change, and are kept for *fixed_ttl* seconds. Otherwise, they are kept
+    for *ttl* seconds. Realtime searches are never cached.
+
+    Results are stored as they came from splunkd, one file each, in
+    *directory*, and read back from a memory map of the file. On a miss the
+    whole response is written to the file before it is returned, so the
+    results are no longer streamed. When the files take more than
+    *max_bytes*, the least recently used ones are removed; results larger
+    than that are not kept at all. The files are reused by other processes
+    and later ``ResultCache`` objects with the same *directory*.
+
+    :param directory: The directory for the files (optional; the default is
+        a new temporary directory).
+    :type directory: ``string``
+    :param max_bytes: The most bytes the files may take.
+    :type max_bytes: ``integer``
+    :param ttl: The number of seconds results are kept for.
+    :type ttl: ``float``
+    :param fixed_ttl: The number of seconds results are kept for when their
+        search ended in the past.
+    :type fixed_ttl: ``float``
+
+    **Example**::
+
+        import splunklib.client as client
+        import splunklib.results as results
+        cache = client.ResultCache("/var/cache/dashboard", ttl=60)
+        s = client.connect(..., result_cache=cache)
+        for _ in range(10):
+            # One search
+            rr = results.ResultsReader(s.jobs.oneshot("search * | head 5"))
+        print cache.hits, cache.misses # 9 1
+    """
+    def __init__(self, directory=None, max_bytes=256*1024*1024, ttl=60,
+                 fixed_ttl=3600):
+        if directory is None:
+            directory = tempfile.mkdtemp(prefix="splunklib-results-")
+        elif not os.path.isdir(directory):
+            os.makedirs(directory)
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.fixed_ttl = fixed_ttl
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict() # key -> (size, expiry time)
+        self._lock = threading.Lock()
+        self._load()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key)
+
+    def _load(self):
+        # Read the entries left in the directory, least recently used first.
+        found = []
+        for name in os.listdir(self.directory):
+            if not _RESULT_FILE.match(name):
+                continue
+            try:
+                with open(self._path(name), 'rb') as f:
+                    expires = json.loads(f.readline())['expires']
+                stat = os.stat(self._path(name))
+            except (IOError, OSError, ValueError, KeyError):
+                continue
+            found.append((stat.st_mtime, name, stat.st_size, expires))
+        now = time.time()
+        with self._lock:
+            for _, key, size, expires in sorted(found):
+                if expires < now:
+                    self._remove(key)
+                else:
+                    self._entries[key] = (size, expires)
+                    self.size += size
+            self._evict()
+
+    def _remove(self, path):
+        try:
+            os.remove(self._path(path))
+        except OSError:
+            pass # Removed by another process
+
+    def _evict(self):
+        while self.size > self.max_bytes and self._entries:
+            key, (size, _) = self._entries.popitem(last=False)
+            self.size -= size
+            self.evictions += 1
+            self._remove(key)
+
+    def key(self, *parts):
+        """Returns the key for a call, which is a digest of *parts*.
+
+        :param parts: Values that ``repr`` the same exactly when the calls are
+            identical.
+        """
+        return hashlib.sha1(repr(parts)).hexdigest()
+
+    def expires(self, latest_time=None):
+        """Returns when results should expire, as an epoch time, or ``None``
+        if they should not be cached.
+
+        :param latest_time: The latest time of the search (optional).
+        :type latest_time: ``string``
+        """
+        now = time.time()
+        if latest_time is None or str(latest_time).strip() in ("", "now"):
+            return now + self.ttl
+        if str(latest_time).startswith("rt"):
+            return None
+        seconds = _absolute_time(latest_time)
+        if seconds is not None and seconds <= now:
+            return now + self.fixed_ttl
+        return now + self.ttl
+
+    def clear(self):
+        """Removes all the entries."""
+        with self._lock:
+            for key in self._entries:
+                self._remove(key)
+            self._entries.clear()
+            self.size = 0
+
+    def get(self, key):
+        """Returns a file-like object that reads the results cached for
+        *key*, or ``None``.
+
+        :param key: A key returned by :meth:`key`.
+        """
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None and entry[1] < time.time():
+                self.size -= entry[0]
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries[key] = entry # Most recently used at the end
+        try:
+            results = _MappedResults(self._path(key))
+            os.utime(self._path(key), None)
+        except (IOError, OSError, ValueError):
+            # Removed by another process
+            with self._lock:
+                if self._entries.pop(key, None) is not None:
+                    self.size -= entry[0]
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return results
+
+    def put(self, key, body, expires):
+        """Stores the results read from *body* for *key*, and returns a
+        file-like object that reads them.
+
+        :param key: A key returned by :meth:`key`.
+        :param body: The body of a response from splunkd.
+        :type body: :class:`splunklib.binding.ResponseReader`
+        :param expires: When the results expire, as an epoch time.
+        :type expires: ``float``
+        """
+        content_type = getattr(body, 'getheader', lambda name: None)('content-type')
+        header = {'expires': expires, 'headers': {}}
+        if content_type is not None:
+            header['headers']['content-type'] = content_type
+        fd, temp = tempfile.mkstemp(prefix=".", dir=self.directory)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(json.dumps(header) + "\n")
+                _copy_body(body, f)
+                size = f.tell()
+            if size > self.max_bytes:
+                # Too large to keep, but read from the file all the same.
+                return _MappedResults(temp)
+            path = self._path(key)
+            if os.name == 'nt' and os.path.exists(path):
+                os.remove(path)
+            os.rename(temp, path)
+            temp = None
+            results = _MappedResults(path)
+        finally:
+            if temp is not None:
+                self._remove(temp)
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self.size -= entry[0]
+            self._entries[key] = (size, expires)
+            self.size += size
+            self._evict()
+        return results
+
+    def fetch(self, key, latest_time, request):
+        """Returns the results cached for *key*, or else the results of
+        calling *request*, which it caches according to *latest_time*.
+
+        :param key: A key returned by :meth:`key`.
+        :param latest_time: The latest time of the search, or ``None``.
+        :type latest_time: ``string``
+        :param request: A function that returns the body of a response from
+            splunkd.
+        """
+        results = self.get(key)
+        if results is not None:
+            return results
+        expires = self.expires(latest_time)
+        if expires is None:
+            return request()
+        return self.put(key, request(), expires)
+
+
 # In preparation for adding Storm support, we added an
 # intermediary class between Service and Context. Storm's
 # API is not going to be the same as enterprise Splunk's
@@ -351,6 +942,23 @@ class Service(_BaseService):
     :param `password`: The password, which is used to authenticate the Splunk
                        instance.
     :type password: ``string``
+    :param `cache_ttl`: If set, entity state is cached for this many seconds
+                        (optional; see :class:`EntityCache`).
+    :type cache_ttl: ``float``
+    :param `cache_size`: The maximum number of entries in the cache (the
+                         default is 1000).
+    :type cache_size: ``integer``
+    :param `input_kinds_ttl`: The number of seconds :class:`Inputs` keeps the
+                              input kinds and the kinds of inputs by name
+                              (the default is 300).
+    :type input_kinds_ttl: ``float``
+    :param `result_cache`: If set, the results of searches are cached on disk
+                           (optional; see :class:`ResultCache`).
+    :type result_cache: :class:`ResultCache`
+    :param `session_store`: If set, the session token is shared with the other
+                            services that log in as the same user (optional;
+                            see :class:`splunklib.binding.SessionStore`).
+    :type session_store: :class:`splunklib.binding.SessionStore`
     :return: A :class:`Service` instance.
 
     **Example**::
@@ -366,6 +974,11 @@ class Service(_BaseService):
     def __init__(self, **kwargs):
         super(Service, self).__init__(**kwargs)
         self._splunk_version = None
+        self.cache = None
+        if kwargs.get("cache_ttl") is not None:
+            self.cache = EntityCache(kwargs["cache_ttl"], kwargs.get("cache_size", 1000))
+        self._input_kinds = _InputKinds(kwargs.get("input_kinds_ttl", 300))
+        self.result_cache = kwargs.get("result_cache")
 
     @property
     def apps(self):
@@ -836,11 +1449,24 @@ class Entity(Endpoint):
     # optional fields. See above.
     defaults = {}
 
+    # Whether the state of this kind of entity may be served from the
+    # service's EntityCache.
+    _cacheable = True
+
+    # The Atom <entry> element and title of an entity loaded lazily by a
+    # collection, which is parsed into its state when first used.
+    _entry = None
+    _title = None
+
     def __init__(self, service, path, **kwargs):
         Endpoint.__init__(self, service, path)
         self._state = None
         if not kwargs.get('skip_refresh', False):
-            self.refresh(kwargs.get('state', None))  # "Prefresh"
+            state = kwargs.get('state', None)
+            if state is None:
+                self._load() # "Prefresh"
+            else:
+                self.refresh(state)
         return
 
     def __contains__(self, item):
@@ -932,6 +1558,8 @@ class Entity(Endpoint):
         :return:
         """
         if owner is None and app is None and sharing is None: # No namespace provided
+            if self._entry is not None:
+                self._hydrate()
             if self._state is not None and 'access' in self._state:
                 return (self._state.access.owner,
                         self._state.access.app,
@@ -943,9 +1571,45 @@ class Entity(Endpoint):
         else:
             return (owner,app,sharing)
 
+    def _cache(self):
+        # The service's EntityCache, if this entity may use it.
+        if not self._cacheable:
+            return None
+        return getattr(self.service, 'cache', None)
+
+    def _cache_key(self):
+        # The same key before and after the state is loaded, so the namespace
+        # is the service's rather than the one in the entity's access.
+        namespace = self.service.namespace
+        return (_cache_path(self.path), namespace['owner'], namespace['app'],
+                namespace['sharing'])
+
+    def _invalidate(self):
+        cache = getattr(self.service, 'cache', None)
+        if cache is not None:
+            cache.invalidate(self.path)
+
+    def _hydrate(self):
+        # Parses the <entry> element this entity was loaded lazily with.
+        entry, self._entry = self._entry, None
+        self._state = _parse_atom_entry(data.load_elem(entry)[1])
+
+    def _load(self):
+        # Loads the state of this entity, from the cache if possible.
+        cache = self._cache()
+        if cache is not None:
+            state = cache.get(self._cache_key())
+            if state is not None:
+                self._state = state
+                return self
+        return self.refresh()
+
     def delete(self):
         owner, app, sharing = self._proper_namespace()
-        return self.service.delete(self.path, owner=owner, app=app, sharing=sharing)
+        try:
+            return self.service.delete(self.path, owner=owner, app=app, sharing=sharing)
+        finally:
+            self._invalidate()
 
     def get(self, path_segment="", owner=None, app=None, sharing=None, **query):
         owner, app, sharing = self._proper_namespace(owner, app, sharing)
@@ -953,7 +1617,12 @@ class Entity(Endpoint):
 
     def post(self, path_segment="", owner=None, app=None, sharing=None, **query):
         owner, app, sharing = self._proper_namespace(owner, app, sharing)
-        return super(Entity, self).post(path_segment, owner=owner, app=app, sharing=sharing, **query)
+        try:
+            return super(Entity, self).post(path_segment, owner=owner, app=app, sharing=sharing, **query)
+        finally:
+            # Any POST to an entity (update, enable, disable, and so on) may
+            # change its state.
+            self._invalidate()
 
     def refresh(self, state=None):
         """Refreshes the state of this entity.
@@ -976,10 +1645,15 @@ class Entity(Endpoint):
             search = s.apps['search']
             search.refresh()
         """
+        self._entry = None
         if state is not None:
             self._state = state
         else:
+            cache = self._cache()
+            key = self._cache_key() if cache is not None else None
             self._state = self.read(self.get())
+            if cache is not None:
+                cache.put(key, self._state)
         return self
 
     @property
@@ -1035,6 +1709,8 @@ class Entity(Endpoint):
         :return: The entity name.
         :rtype: ``string``
         """
+        if self._state is None and self._title is not None:
+            return self._title # Loaded lazily, and not parsed yet
         return self.state.title
 
     def read(self, response):
@@ -1059,7 +1735,9 @@ class Entity(Endpoint):
 
         :return: A ``dict`` containing fields and metadata for the entity.
         """
-        if self._state is None: self.refresh()
+        if self._state is None:
+            if self._entry is not None: self._hydrate()
+            else: self._load()
         return self._state
 
     def update(self, **kwargs):
@@ -1177,11 +1855,10 @@ class ReadOnlyCollection(Endpoint):
                 # have to extract values out.
                 key, ns = key
                 key = UrlEncoded(key, encode_slash=True)
-                response = self.get(key, owner=ns.owner, app=ns.app)
+                entries = self._fetch(key, ns.owner, ns.app)
             else:
                 key = UrlEncoded(key, encode_slash=True)
-                response = self.get(key)
-            entries = self._load_list(response)
+                entries = self._fetch(key)
             if len(entries) > 1:
                 raise AmbiguousReferenceException("Found multiple entities named '%s'; please specify a namespace." % key)
             elif len(entries) == 0:
@@ -1194,6 +1871,26 @@ class ReadOnlyCollection(Endpoint):
             else:
                 raise
 
+    def _fetch(self, key, owner=None, app=None):
+        # Returns the entities named *key*, using the service's EntityCache
+        # if the items of this collection may be cached.
+        cache = getattr(self.service, 'cache', None)
+        if cache is None or not getattr(self.item, '_cacheable', False):
+            return self._load_list(self.get(key, owner=owner, app=app))
+        namespace = self.service.namespace
+        cache_key = (_cache_path(self.path + key),
+                     owner if owner is not None else namespace['owner'],
+                     app if app is not None else namespace['app'],
+                     None if owner is not None or app is not None else namespace['sharing'],
+                     'item')
+        entries = cache.get(cache_key)
+        if entries is None:
+            entries = self._load_list(self.get(key, owner=owner, app=app))
+            cache.put(cache_key, entries)
+        # The cached entities are copied, so that refreshing an entity does
+        # not change the ones returned to other callers.
+        return [_copy_entity(entity) for entity in entries]
+
     def __iter__(self, **kwargs):
         """Iterate over the entities in the collection.
 
@@ -1298,6 +1995,59 @@ class ReadOnlyCollection(Endpoint):
 
         return entities
 
+    def _iter_pages(self, offset, count, pagesize, lazy, workers, **kwargs):
+        # Implements iter(workers=...): loads the first page to learn the
+        # totalResults of the collection, then the remaining pages on a pool
+        # of *workers* threads.
+        load = self._load_lazy_list if lazy else self._load_list
+        unbounded = count == self.null_count
+        first = pagesize if unbounded else min(pagesize, count)
+        response = self.get(count=first, offset=offset, **kwargs)
+        text = response.body.read()
+        response.body = StringIO(text)
+        total = _total_results(text)
+        items = load(response)
+        for item in items:
+            yield item
+        if len(items) < first or (not unbounded and len(items) >= count):
+            return
+        if total is None:
+            # Not a feed that knows its size, so page through the rest.
+            rest = self.null_count if unbounded else count - len(items)
+            for item in self.iter(offset + len(items), rest, pagesize, lazy, **kwargs):
+                yield item
+            return
+        end = total if unbounded else min(total, offset + count)
+
+        def fetch(page):
+            return load(self.get(count=min(pagesize, end - page), offset=page, **kwargs))
+
+        pool = WorkerPool(workers)
+        try:
+            for items in pool.imap(fetch, xrange(offset + first, end, pagesize), window=workers):
+                for item in items:
+                    yield item
+        finally:
+            pool.shutdown(wait=False)
+
+    def _load_lazy_list(self, response):
+        """Converts *response* to a list of entities whose state is parsed
+        from the Atom ``<entry>`` elements of *response* when first used.
+
+        The entities are created by :meth:`_lazy_item`, which subclasses
+        that override :meth:`_load_list` should override too.
+        """
+        return [self._lazy_item(element)
+                for element in _load_atom_elements(response)]
+
+    def _lazy_item(self, element):
+        # Only the title and the alternate link, which _entity_path needs,
+        # are read from the element here.
+        state = record({'title': _entry_title(element),
+                        'links': record({'alternate': _entry_link(element, 'alternate')})})
+        entity = self.item(self.service, self._entity_path(state), skip_refresh=True)
+        return _lazy_entity(entity, element)
+
     def itemmeta(self):
         """Returns metadata for members of the collection.
 
@@ -1337,7 +2087,7 @@ class ReadOnlyCollection(Endpoint):
         content = _load_atom(response, MATCH_ENTRY_CONTENT)
         return _parse_atom_metadata(content)
 
-    def iter(self, offset=0, count=None, pagesize=None, **kwargs):
+    def iter(self, offset=0, count=None, pagesize=None, lazy=False, workers=None, **kwargs):
         """Iterates over the collection.
 
         This method is equivalent to the :meth:`list` method, but
@@ -1350,6 +2100,17 @@ class ReadOnlyCollection(Endpoint):
         :type count: ``integer``
         :param pagesize: The number of entities to load (optional).
         :type pagesize: ``integer``
+        :param lazy: If ``True``, the state of each entity is only parsed
+            from the response when it is first used, except for its name
+            (optional). This saves time and memory when listing many entities
+            of which few fields are read.
+        :type lazy: ``boolean``
+        :param workers: With *pagesize*, the number of pages to load at the
+            same time (optional). The first page is loaded on its own to find
+            the size of the collection, then the other pages are loaded by
+            *workers* threads. Entities are still returned in order, and at
+            most *workers* pages are held in memory.
+        :type workers: ``integer``
         :param kwargs: Additional arguments (optional):
 
             - "search" (``string``): The search query to filter responses.
@@ -1372,14 +2133,27 @@ class ReadOnlyCollection(Endpoint):
                 # Loads 10 saved searches at a time from the
                 # server.
                 ...
+            names = [s.name for s in s.saved_searches.iter(lazy=True)]
+            for job in s.jobs.iter(pagesize=100, workers=8):
+                # Loads 8 pages of 100 jobs at a time.
+                ...
         """
         assert pagesize is None or pagesize > 0
         if count is None:
             count = self.null_count
+        # Collections of collections (such as Configurations) are not lazy.
+        lazy = lazy and issubclass(self.item, Entity)
+        if pagesize is not None and workers is not None and workers > 1:
+            for item in self._iter_pages(offset, count, pagesize, lazy, workers, **kwargs):
+                yield item
+            return
         fetched = 0
         while count == self.null_count or fetched < count:
             response = self.get(count=pagesize or count, offset=offset, **kwargs)
-            items = self._load_list(response)
+            if lazy:
+                items = self._load_lazy_list(response)
+            else:
+                items = self._load_list(response)
             N = len(items)
             fetched += N
             for item in items:
@@ -1400,6 +2174,15 @@ class ReadOnlyCollection(Endpoint):
 
         :param count: The maximum number of entities to return (optional).
         :type count: ``integer``
+        :param lazy: If ``True``, the state of each entity is only parsed
+            when it is first used (optional; see :meth:`iter`).
+        :type lazy: ``boolean``
+        :param pagesize: The number of entities to load per request
+            (optional; see :meth:`iter`).
+        :type pagesize: ``integer``
+        :param workers: The number of pages to load at the same time
+            (optional; see :meth:`iter`).
+        :type workers: ``integer``
         :param kwargs: Additional arguments (optional):
 
             - "offset" (``integer``): The offset of the first item to return.
@@ -1505,6 +2288,9 @@ class Collection(ReadOnlyCollection):
             params['app'] = namespace.app
             params['sharing'] = namespace.sharing
         response = self.post(name=name, **params)
+        cache = getattr(self.service, 'cache', None)
+        if cache is not None:
+            cache.invalidate(self.path + UrlEncoded(name, encode_slash=True))
         atom = _load_atom(response, XNAME_ENTRY)
         if atom is None:
             # This endpoint doesn't return the content of the new
@@ -1560,6 +2346,10 @@ class Collection(ReadOnlyCollection):
                 raise KeyError("No such entity %s" % name)
             else:
                 raise
+        finally:
+            cache = getattr(self.service, 'cache', None)
+            if cache is not None:
+                cache.invalidate(_path(self.path, name))
         return self
 
     def get(self, name="", owner=None, app=None, sharing=None, **query):
@@ -1713,14 +2503,17 @@ class Stanza(Entity):
         :return: The :class:`Stanza` object.
         """
         body = _encode(**stanza)
-        self.service.post(self.path, body=body)
+        try:
+            self.service.post(self.path, body=body)
+        finally:
+            _invalidate_cached(self.service, self.path)
         return self
 
     def __len__(self):
         # The stanza endpoint returns all the keys at the same level in the XML as the eai information
         # and 'disabled', so to get an accurate length, we have to filter those out and have just
         # the stanza keys.
-        return len([x for x in self._state.content.keys()
+        return len([x for x in self.content.keys()
                     if not x.startswith('eai') and x != 'disabled'])
 
 
@@ -1894,6 +2687,11 @@ class Index(Entity):
 
         :return: A writable socket.
         """
+        return self._attach(host, source, sourcetype)
+
+    def _attach(self, host=None, source=None, sourcetype=None, headers=()):
+        # Opens a socket to receivers/stream, adding *headers* (strings of
+        # the form "Name: value") to the request.
         args = { 'index': self.name }
         if host is not None: args['host'] = host
         if source is not None: args['source'] = source
@@ -1904,14 +2702,13 @@ class Index(Entity):
         # the connection open and use the Splunk extension headers to note
         # the input mode
         sock = self.service.connect()
-        headers = ["POST %s HTTP/1.1\r\n" % self.service._abspath(path),
-                   "Host: %s:%s\r\n" % (self.service.host, int(self.service.port)),
-                   "Accept-Encoding: identity\r\n",
-                   "Authorization: %s\r\n" % self.service.token,
-                   "X-Splunk-Input-Mode: Streaming\r\n",
-                   "\r\n"]
-        for h in headers:
-            sock.write(h)
+        lines = ["POST %s HTTP/1.1" % self.service._abspath(path),
+                 "Host: %s:%s" % (self.service.host, int(self.service.port)),
+                 "Accept-Encoding: identity",
+                 "Authorization: %s" % self.service.token,
+                 "X-Splunk-Input-Mode: Streaming"]
+        lines.extend(headers)
+        sock.sendall("".join(line + "\r\n" for line in lines) + "\r\n")
         return sock
 
     @contextlib.contextmanager
@@ -2028,6 +2825,83 @@ class Index(Entity):
         self.service.post(PATH_RECEIVERS_SIMPLE, body=event, **args)
         return self
 
+    def batch_submit(self, events, host=None, source=None, sourcetype=None):
+        """Submits several events to the index in a single ``HTTP POST``.
+
+        The events are sent one per line, so how they are split back into
+        events depends on the line breaking rules of their source type. Events
+        that span several lines need a source type that does not break them
+        at each line.
+
+        :param events: The events to submit.
+        :type events: ``list`` of ``string``
+        :param `host`: The host value of the events.
+        :type host: ``string``
+        :param `source`: The source value of the events.
+        :type source: ``string``
+        :param `sourcetype`: The sourcetype value of the events.
+        :type sourcetype: ``string``
+
+        :return: The :class:`Index`.
+        """
+        body = _join_events(events)
+        if body:
+            self.submit(body, host=host, source=source, sourcetype=sourcetype)
+        return self
+
+    def stream(self, host=None, source=None, sourcetype=None, **kwargs):
+        """Returns an :class:`IndexStream` that writes events to the index
+        over a buffered, reconnecting :meth:`attach` socket.
+
+        The arguments after *sourcetype* are those of :class:`IndexStream`.
+
+        :param host: The host value for events written to the stream.
+        :type host: ``string``
+        :param source: The source value for events written to the stream.
+        :type source: ``string``
+        :param sourcetype: The sourcetype value for events written to the
+            stream.
+        :type sourcetype: ``string``
+
+        :return: An :class:`IndexStream`.
+
+        **Example**::
+
+            import splunklib.client as client
+            s = client.connect(...)
+            with s.indexes['main'].stream(sourcetype='syslog') as stream:
+                for line in sys.stdin:
+                    stream.write(line)
+        """
+        return IndexStream(self, host=host, source=source,
+                           sourcetype=sourcetype, **kwargs)
+
+    def writer(self, host=None, source=None, sourcetype=None, **kwargs):
+        """Returns an :class:`IndexWriter` that buffers events written to it
+        and submits them to the index in batches.
+
+        The arguments after *sourcetype* are those of :class:`IndexWriter`.
+
+        :param `host`: The host value of the events.
+        :type host: ``string``
+        :param `source`: The source value of the events.
+        :type source: ``string``
+        :param `sourcetype`: The sourcetype value of the events.
+        :type sourcetype: ``string``
+
+        :return: An :class:`IndexWriter`.
+
+        **Example**::
+
+            import splunklib.client as client
+            s = client.connect(...)
+            with s.indexes['main'].writer(sourcetype='access_log') as writer:
+                for line in open('access.log'):
+                    writer.write(line)
+        """
+        return IndexWriter(self, host=host, source=source,
+                           sourcetype=sourcetype, **kwargs)
+
     # kwargs: host, host_regex, host_segment, rename-source, sourcetype
     def upload(self, filename, **kwargs):
         """Uploads a file for immediate indexing.
@@ -2049,6 +2923,443 @@ class Index(Entity):
         return self
 
 
+def _join_events(events):
+    # Returns the body of a POST to receivers/simple with one event per line.
+    lines = []
+    for event in events:
+        if isinstance(event, unicode):
+            event = event.encode('utf-8')
+        lines.append(event.rstrip("\r\n"))
+    return "".join(line + "\n" for line in lines)
+
+
+class IndexWriter(object):
+    """This class buffers events and submits them to an index in batches.
+
+    Retrieve an ``IndexWriter`` using :meth:`Index.writer`. Events passed to
+    :meth:`write` are kept in memory and submitted in one ``HTTP POST`` (as
+    :meth:`Index.batch_submit` does) when *max_events* of them or
+    *max_bytes* of them are buffered, or when the oldest of them has been
+    buffered for *max_age* seconds.
+
+    By default, batches are submitted by a background thread, so
+    :meth:`write` only waits for the server when *max_pending* batches are
+    already waiting to be submitted. This limits the memory used when events
+    are written faster than the server takes them. An error from the server
+    is raised by the next call to :meth:`write`, :meth:`flush`, or
+    :meth:`close`; the events of the batch that failed are lost.
+
+    With *background* set to ``False``, batches are submitted by the thread
+    that calls :meth:`write`, and *max_age* is only checked when events are
+    written.
+
+    Call :meth:`close` (or use the writer in a ``with`` block) to submit the
+    events that are still buffered. The ``metrics`` property reports the
+    delivery rates and the latency of the batches.
+
+    :param index: The index to write to.
+    :type index: :class:`Index`
+    :param max_events: The number of events to submit at a time.
+    :type max_events: ``integer``
+    :param max_bytes: The number of bytes to submit at a time.
+    :type max_bytes: ``integer``
+    :param max_age: The longest time to buffer an event, in seconds.
+    :type max_age: ``float``
+    :param max_pending: The number of batches that may wait to be submitted.
+    :type max_pending: ``integer``
+    :param background: Whether to submit batches on a background thread.
+    :type background: ``boolean``
+    """
+    def __init__(self, index, host=None, source=None, sourcetype=None,
+                 max_events=1000, max_bytes=1024*1024, max_age=1.0,
+                 max_pending=4, background=True):
+        self.index = index
+        self.max_events = max_events
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._args = {'host': host, 'source': source, 'sourcetype': sourcetype}
+        self._lock = threading.Lock()
+        self._aging = threading.Lock() # Held while submitting old events
+        self._events = []
+        self._size = 0
+        self._oldest = None # When the oldest buffered event was written
+        self._error = None
+        self._closed = False
+        self._started = time.time()
+        self._sent = {'events': 0, 'bytes': 0, 'batches': 0, 'failed': 0,
+                      'latency': 0.0, 'max_latency': 0.0}
+        self._batches = Queue.Queue(max_pending)
+        self._thread = None
+        if background:
+            self._thread = threading.Thread(target=self._run)
+            self._thread.daemon = True
+            self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def metrics(self):
+        """The delivery metrics of this writer, as a ``dict``:
+
+        * ``events``, ``bytes``, and ``batches``: The number of events, bytes,
+          and batches submitted.
+
+        * ``failed``: The number of events in batches that failed.
+
+        * ``events_per_second`` and ``bytes_per_second``: The rates at which
+          events and bytes have been submitted since the writer was created.
+
+        * ``buffered``: The number of events waiting to be submitted.
+
+        * ``flush_latency`` and ``max_flush_latency``: The average and longest
+          time to submit a batch, in seconds.
+        """
+        with self._lock:
+            sent = dict(self._sent)
+            buffered = len(self._events)
+        elapsed = max(time.time() - self._started, 1e-6)
+        batches = sent.pop('batches')
+        latency = sent.pop('latency')
+        return record({
+            'events': sent['events'],
+            'bytes': sent['bytes'],
+            'batches': batches,
+            'failed': sent['failed'],
+            'buffered': buffered,
+            'events_per_second': sent['events'] / elapsed,
+            'bytes_per_second': sent['bytes'] / elapsed,
+            'flush_latency': latency / batches if batches else 0.0,
+            'max_flush_latency': sent['max_latency']
+        })
+
+    def write(self, event):
+        """Buffers an event, submitting the buffered events if there are
+        enough of them.
+
+        :param event: The event. A trailing newline is removed.
+        :type event: ``string``
+        """
+        self._check()
+        if self._closed:
+            raise ValueError("Cannot write to a closed IndexWriter.")
+        if isinstance(event, unicode):
+            event = event.encode('utf-8')
+        event = event.rstrip("\r\n")
+        now = time.time()
+        with self._lock:
+            if not self._events:
+                self._oldest = now
+            self._events.append(event)
+            self._size += len(event) + 1
+            if len(self._events) >= self.max_events or \
+                    self._size >= self.max_bytes or \
+                    (self._thread is None and now - self._oldest >= self.max_age):
+                batch = self._take()
+            else:
+                batch = None
+        if batch is not None:
+            self._send(batch)
+
+    def flush(self):
+        """Submits all the buffered events, and waits until they have been
+        received by the server."""
+        with self._lock:
+            batch = self._take()
+        if batch is not None:
+            self._send(batch)
+        if self._thread is not None:
+            self._batches.join()
+            # Wait for a batch the thread found too old to keep buffering.
+            with self._aging:
+                pass
+        self._check()
+
+    def close(self):
+        """Submits all the buffered events and stops the background thread."""
+        if self._closed:
+            return
+        try:
+            self.flush()
+        finally:
+            self._closed = True
+            if self._thread is not None:
+                self._batches.put(None)
+                self._thread.join()
+
+    def _take(self):
+        # Removes the buffered events as a batch. Call with _lock held.
+        if not self._events:
+            return None
+        batch = (_join_events(self._events), len(self._events))
+        self._events = []
+        self._size = 0
+        self._oldest = None
+        return batch
+
+    def _send(self, batch):
+        if self._thread is None:
+            self._submit(batch)
+            self._check()
+        else:
+            self._batches.put(batch)
+
+    def _submit(self, batch):
+        body, count = batch
+        start = time.time()
+        try:
+            self.index.service.post(PATH_RECEIVERS_SIMPLE, body=body,
+                                    index=self.index.name,
+                                    **dict((k, v) for k, v in self._args.iteritems()
+                                           if v is not None))
+        except Exception:
+            with self._lock:
+                self._sent['failed'] += count
+                self._error = sys.exc_info()
+            return
+        latency = time.time() - start
+        with self._lock:
+            self._sent['events'] += count
+            self._sent['bytes'] += len(body)
+            self._sent['batches'] += 1
+            self._sent['latency'] += latency
+            self._sent['max_latency'] = max(self._sent['max_latency'], latency)
+
+    def _check(self):
+        # Raises the error of a failed batch, once.
+        with self._lock:
+            error, self._error = self._error, None
+        if error is not None:
+            raise error[0], error[1], error[2]
+
+    def _run(self):
+        while True:
+            with self._lock:
+                oldest = self._oldest
+            wait = self.max_age if oldest is None else oldest + self.max_age - time.time()
+            try:
+                batch = self._batches.get(True, max(wait, 0.01))
+            except Queue.Empty:
+                with self._aging:
+                    with self._lock:
+                        if self._oldest is not None and \
+                                time.time() - self._oldest >= self.max_age:
+                            batch = self._take()
+                        else:
+                            batch = None
+                    if batch is not None:
+                        self._submit(batch)
+                continue
+            try:
+                if batch is None:
+                    return
+                self._submit(batch)
+            finally:
+                self._batches.task_done()
+
+
+class IndexStream(object):
+    """This class writes events to an index over a ``receivers/stream``
+    socket opened by :meth:`Index.attach`.
+
+    Retrieve an ``IndexStream`` using :meth:`Index.stream`. Events passed to
+    :meth:`write` are buffered until *buffer_size* bytes of them are waiting,
+    and then sent with a single ``sendall``. The socket is opened on the first
+    send. If the server has closed it, or sending fails (with a broken pipe,
+    for instance), a new socket is opened and the buffered events are sent
+    again, up to *retries* times. Events that were partly sent on the old
+    socket when it broke may be indexed twice.
+
+    With *compress* set to ``True``, the stream is sent gzip compressed (with
+    ``Content-Encoding: gzip``), which needs a Splunk instance that accepts
+    compressed streams.
+
+    The ``throughput`` property reports the events and bytes sent, and the
+    rates at which they are sent as moving averages over about *window*
+    seconds, which stay stable from one batch to the next.
+
+    :param index: The index to write to.
+    :type index: :class:`Index`
+    :param buffer_size: The number of bytes to buffer before sending.
+    :type buffer_size: ``integer``
+    :param compress: Whether to gzip the stream.
+    :type compress: ``boolean``
+    :param retries: The number of times to reconnect to send a batch.
+    :type retries: ``integer``
+    :param window: The time over which rates are averaged, in seconds.
+    :type window: ``float``
+    """
+    def __init__(self, index, host=None, source=None, sourcetype=None,
+                 buffer_size=256*1024, compress=False, retries=3, window=10.0):
+        self.index = index
+        self.buffer_size = buffer_size
+        self.compress = compress
+        self.retries = retries
+        self.window = window
+        self._args = (host, source, sourcetype)
+        self._lock = threading.RLock()
+        self._sock = None
+        self._compressor = None
+        self._chunks = []
+        self._size = 0
+        self._closed = False
+        self._started = self._last = time.time()
+        self._sent = {'events': 0, 'bytes': 0, 'bytes_sent': 0,
+                      'batches': 0, 'connections': 0}
+        self._rates = [0.0, 0.0] # Moving averages of events/s and bytes/s
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def throughput(self):
+        """The throughput of this stream, as a ``dict``:
+
+        * ``events`` and ``bytes``: The number of events and (uncompressed)
+          bytes sent.
+
+        * ``bytes_sent``: The number of bytes written to sockets, which
+          includes events sent again after reconnecting.
+
+        * ``batches``: The number of batches sent.
+
+        * ``reconnects``: The number of times a new socket was opened after
+          the first.
+
+        * ``events_per_second`` and ``bytes_per_second``: The moving averages
+          of the rates at which events and bytes are sent.
+
+        * ``average_events_per_second`` and ``average_bytes_per_second``:
+          The rates since the stream was created.
+        """
+        with self._lock:
+            sent = dict(self._sent)
+            decay = self._decay(time.time() - self._last)
+            events_rate, bytes_rate = [rate * (1 - decay) for rate in self._rates]
+        elapsed = max(time.time() - self._started, 1e-6)
+        return record({
+            'events': sent['events'],
+            'bytes': sent['bytes'],
+            'bytes_sent': sent['bytes_sent'],
+            'batches': sent['batches'],
+            'reconnects': max(sent['connections'] - 1, 0),
+            'events_per_second': events_rate,
+            'bytes_per_second': bytes_rate,
+            'average_events_per_second': sent['events'] / elapsed,
+            'average_bytes_per_second': sent['bytes'] / elapsed
+        })
+
+    def write(self, event):
+        """Buffers an event, sending the buffered events if there are enough
+        of them.
+
+        :param event: The event. A newline is added if it does not end with
+            one.
+        :type event: ``string``
+        """
+        if isinstance(event, unicode):
+            event = event.encode('utf-8')
+        if not event.endswith("\n"):
+            event += "\n"
+        with self._lock:
+            if self._closed:
+                raise ValueError("Cannot write to a closed IndexStream.")
+            self._chunks.append(event)
+            self._size += len(event)
+            if self._size >= self.buffer_size:
+                self._flush()
+
+    def flush(self):
+        """Sends the buffered events."""
+        with self._lock:
+            self._flush()
+
+    def close(self):
+        """Sends the buffered events and closes the socket."""
+        with self._lock:
+            if self._closed:
+                return
+            try:
+                self._flush()
+                if self._sock is not None and self._compressor is not None:
+                    trailer = self._compressor.flush()
+                    self._sock.sendall(trailer)
+                    self._sent['bytes_sent'] += len(trailer)
+            finally:
+                self._closed = True
+                self._disconnect()
+
+    def _flush(self):
+        if not self._chunks:
+            return
+        data = "".join(self._chunks)
+        count = len(self._chunks)
+        sent = self._send(data)
+        self._chunks = []
+        self._size = 0
+        now = time.time()
+        decay = self._decay(now - self._last)
+        interval = max(now - self._last, 1e-6)
+        self._rates = [rate + decay * (n / interval - rate)
+                       for rate, n in zip(self._rates, (count, len(data)))]
+        self._last = now
+        self._sent['events'] += count
+        self._sent['bytes'] += len(data)
+        self._sent['bytes_sent'] += sent
+        self._sent['batches'] += 1
+
+    def _decay(self, interval):
+        # The weight of the latest interval in the moving averages.
+        return 1 - math.exp(-interval / self.window)
+
+    def _send(self, data):
+        # Sends data, reconnecting as needed; returns the bytes written.
+        attempt = 0
+        while True:
+            try:
+                if self._sock is None or _is_dropped(self._sock):
+                    self._connect()
+                if self._compressor is not None:
+                    data_out = self._compressor.compress(data) + \
+                        self._compressor.flush(zlib.Z_SYNC_FLUSH)
+                else:
+                    data_out = data
+                self._sock.sendall(data_out)
+                return len(data_out)
+            except socket.error as e:
+                self._disconnect()
+                if attempt >= self.retries:
+                    raise
+                logging.debug("Stream to index %s failed (%s); reconnecting.",
+                              self.index.name, e)
+                sleep(0.1 * 2 ** attempt)
+                attempt += 1
+
+    def _connect(self):
+        self._disconnect()
+        headers = ["Content-Encoding: gzip"] if self.compress else []
+        self._sock = self.index._attach(*self._args, headers=headers)
+        self._sent['connections'] += 1
+        if self.compress:
+            self._compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def _disconnect(self):
+        sock, self._sock = self._sock, None
+        self._compressor = None
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except socket.error:
+                pass
+            sock.close()
+
+
 class Input(Entity):
     """This class represents a Splunk input. This class is the base for all
     typed input classes and is also used when the client does not recognize an
@@ -2108,8 +3419,8 @@ class Input(Entity):
 
             if 'restrictToHost' in kwargs:
                 raise IllegalOperationException("Cannot set restrictToHost on an existing input with the SDK.")
-            elif 'restrictToHost' in self._state.content:
-                to_update['restrictToHost'] = self._state.content['restrictToHost']
+            elif 'restrictToHost' in self.content:
+                to_update['restrictToHost'] = self.content['restrictToHost']
 
             # Do the actual update operation.
             return super(Input, self).update(**to_update)
@@ -2150,6 +3461,19 @@ class Inputs(Collection):
                 else:
                     raise
         else:
+            # Look the kind up in the index of input names, which makes a
+            # single request for the input.
+            built = self.service._input_kinds.get('names') is None
+            kinds = self._names().get(key, ())
+            if len(kinds) > 1:
+                raise AmbiguousReferenceException("Found multiple inputs named %s, please specify a kind" % key)
+            elif len(kinds) == 1:
+                try:
+                    return self[key, list(kinds)[0]]
+                except KeyError:
+                    self.invalidate_kinds() # The index is out of date.
+            elif built:
+                raise KeyError(key) # The index was just loaded.
             # Iterate over all the kinds looking for matches.
             kind = None
             candidate = None
@@ -2187,7 +3511,13 @@ class Inputs(Collection):
         else:
             # Without a kind, we want to minimize the number of round trips to the server, so we
             # reimplement some of the behavior of __getitem__ in order to be able to stop searching
-            # on the first hit.
+            # on the first hit, starting with the kinds in the index of input names.
+            built = self.service._input_kinds.get('names') is None
+            for kind in self._names().get(key, ()):
+                if (key, kind) in self:
+                    return True
+            if built:
+                return False # The index was just loaded.
             for kind in self.kinds:
                 try:
                     response = self.get(self.kindpath(kind) + "/" + key)
@@ -2241,6 +3571,9 @@ class Inputs(Collection):
         """
         kindpath = self.kindpath(kind)
         self.post(kindpath, name=name, **kwargs)
+        self._remember('%s:%s' % (kwargs['restrictToHost'], name) \
+                           if kwargs.has_key('restrictToHost') else name,
+                       str(kindpath))
 
         # If we created an input with restrictToHost set, then
         # its path will be <restrictToHost>:<name>, not just <name>,
@@ -2287,9 +3620,16 @@ class Inputs(Collection):
         :return: The :class:`Inputs` collection.
         """
         if kind is None:
-            self.service.delete(self[name].path)
+            entity = self[name]
         else:
-            self.service.delete(self[name, kind].path)
+            entity = self[name, kind]
+        try:
+            self.service.delete(entity.path)
+        finally:
+            _invalidate_cached(self.service, entity.path)
+        names = self.service._input_kinds.get('names')
+        if names is not None and entity.name in names:
+            names[entity.name].discard(entity.kind)
         return self
 
     def itemmeta(self, kind):
@@ -2322,7 +3662,7 @@ class Inputs(Collection):
         :return: The metadata.
         :rtype: class:``splunklib.data.Record``
         """
-        response = self.get("%s/_new" % self._kindmap[kind])
+        response = self.get("%s/_new" % self.kindpath(kind))
         content = _load_atom(response, MATCH_ENTRY_CONTENT)
         return _parse_atom_metadata(content)
 
@@ -2351,10 +3691,50 @@ class Inputs(Collection):
     def kinds(self):
         """Returns the input kinds on this Splunk instance.
 
+        The kinds are looked up once and then kept by the :class:`Service`
+        for the number of seconds given by its ``input_kinds_ttl`` argument,
+        or until :meth:`invalidate_kinds` is called.
+
         :return: The list of input kinds.
         :rtype: ``list``
         """
-        return self._get_kind_list()
+        cache = self.service._input_kinds
+        kinds = cache.get('kinds')
+        if kinds is None:
+            kinds = cache.put('kinds', self._get_kind_list())
+        return list(kinds)
+
+    def invalidate_kinds(self):
+        """Forgets the input kinds and the kinds of inputs by name kept by the
+        :class:`Service`, so that they are looked up again when next needed.
+
+        Call this after input kinds are added to or removed from the server
+        (for example, by installing an app with a modular input).
+
+        :return: The :class:`Inputs` collection.
+        """
+        self.service._input_kinds.clear()
+        return self
+
+    def _names(self):
+        # Returns the kinds of the inputs by name, loading every input
+        # (lazily) if they are not kept by the service. Looking inputs up by
+        # name then takes a single request.
+        cache = self.service._input_kinds
+        names = cache.get('names')
+        if names is None:
+            names = {}
+            kinds = self.kinds
+            for entity in self._iter_kinds(kinds, kinds, lazy=True):
+                names.setdefault(entity.name, set()).add(entity.kind)
+            cache.put('names', names)
+        return names
+
+    def _remember(self, name, kind):
+        # Adds a new input to the kinds of the inputs by name.
+        names = self.service._input_kinds.get('names')
+        if names is not None:
+            names.setdefault(name, set()).add(kind)
 
     def kindpath(self, kind):
         """Returns a path to the resources for a given input kind.
@@ -2386,7 +3766,11 @@ class Inputs(Collection):
         :return: The relative endpoint path.
         :rtype: ``string``
         """
-        if kind in self.kinds:
+        return self._kindpath(kind, self.kinds)
+
+    def _kindpath(self, kind, kinds):
+        # Implements kindpath, given the input kinds on this Splunk instance.
+        if kind in kinds:
             return UrlEncoded(kind, skip_encode=True)
         # Special cases
         elif kind == 'tcp':
@@ -2400,12 +3784,13 @@ class Inputs(Collection):
         """Returns a list of inputs that are in the :class:`Inputs` collection.
         You can also filter by one or more input kinds.
 
-        This function iterates over all possible inputs, regardless of any arguments you
-        specify. Because the :class:`Inputs` collection is the union of all the inputs of each
-        kind, this method implements parameters such as "count", "search", and so
-        on at the Python level once all the data has been fetched. The exception
-        is when you specify a single input kind, and then this method makes a single request
-        with the usual semantics for parameters.
+        Because the :class:`Inputs` collection is the union of all the inputs of
+        each kind, this method makes one request per kind, several at a time, and
+        implements parameters such as "count", "offset", and the sort parameters
+        at the Python level by merging the inputs of each kind. When "count" is
+        given, no kind returns more than "offset" plus "count" inputs. The
+        exception is when you specify a single input kind, and then this method
+        makes a single request with the usual semantics for parameters.
 
         :param kinds: The input kinds to return (optional).
 
@@ -2446,13 +3831,22 @@ class Inputs(Collection):
             - "sort_mode" (``string``): The collating sequence for sorting
               returned items: "auto", "alpha", "alpha_case", or "num".
 
+            - "lazy" (``boolean``): Whether the state of each input is only
+              parsed when it is first used (see :meth:`ReadOnlyCollection.iter`).
+
+            - "workers" (``integer``): The number of kinds to request at the
+              same time (the default is 8).
+
         :type kwargs: ``dict``
 
         :return: A list of input kinds.
         :rtype: ``list``
         """
+        lazy = kwargs.pop('lazy', False)
+        workers = kwargs.pop('workers', None)
+        known = None
         if len(kinds) == 0:
-            kinds = self.kinds
+            kinds = known = self.kinds
         if len(kinds) == 1:
             kind = kinds[0]
             logging.debug("Inputs.list taking short circuit branch for single kind.")
@@ -2464,64 +3858,103 @@ class Inputs(Collection):
             except HTTPError, he:
                 if he.status == 404: # No inputs of this kind
                     return []
-            entities = []
-            entries = _load_atom_entries(response)
-            if entries is None:
-                return [] # No inputs in a collection comes back with no feed or entry in the XML
-            for entry in entries:
-                state = _parse_atom_entry(entry)
-                # Unquote the URL, since all URL encoded in the SDK
-                # should be of type UrlEncoded, and all str should not
-                # be URL encoded.
-                path = urllib.unquote(state.links.alternate)
-                entity = Input(self.service, path, kind, state=state)
-                entities.append(entity)
-            return entities
-
-        search = kwargs.get('search', '*')
-
-        entities = []
-        for kind in kinds:
-            response = None
+            return self._load_inputs(response, kind, lazy)
+
+        return list(self._iter_kinds(kinds, known, lazy, workers, **kwargs))
+
+    def _iter_kinds(self, kinds, known=None, lazy=False, workers=None, **kwargs):
+        # Implements list and iter for several kinds: requests each kind on a
+        # pool of workers, then concatenates the inputs of each kind or, when
+        # sorting, merges them, stopping once "count" inputs are found.
+        if known is None:
+            known = self.kinds
+        paths = [(kind, self._kindpath(UrlEncoded(kind, skip_encode=True), known))
+                 for kind in kinds]
+        offset = int(kwargs.get('offset', 0))
+        count = kwargs.get('count', None)
+        limit = None if count is None else offset + int(count)
+        reverse = kwargs.get('sort_dir', 'asc') == 'desc'
+        sort_mode = kwargs.get('sort_mode', None)
+        query = {'search': kwargs.get('search', '*'), 'count': self.null_count}
+        key = None
+        if sort_mode in ('alpha', 'alpha_case'):
+            sort_key = kwargs.get('sort_key', kwargs.get('sort_field', 'name'))
+            fold = (lambda v: v.lower()) if sort_mode == 'alpha' else (lambda v: v)
+            if sort_key == 'name':
+                key = lambda x: fold(x.name)
+            else:
+                key = lambda x: fold(x[sort_key])
+            query.update(sort_key=sort_key, sort_mode=sort_mode,
+                         sort_dir='desc' if reverse else 'asc')
+        if limit is not None and (key is not None or not reverse):
+            # The first "limit" inputs of each kind are all that can be used.
+            query['count'] = limit
+
+        def fetch(path):
+            kind, path = path
             try:
-                kind = UrlEncoded(kind, skip_encode=True)
-                response = self.get(self.kindpath(kind), search=search)
+                response = self.get(path, **query)
             except HTTPError as e:
                 if e.status == 404:
-                    continue # No inputs of this kind
+                    return [] # No inputs of this kind
                 else:
                     raise
+            entities = self._load_inputs(response, kind, lazy)
+            if key is not None:
+                entities.sort(key=key, reverse=reverse)
+            elif reverse:
+                entities.reverse()
+            return entities
 
-            entries = _load_atom_entries(response)
-            if entries is None: continue # No inputs to process
-            for entry in entries:
-                state = _parse_atom_entry(entry)
-                # Unquote the URL, since all URL encoded in the SDK
-                # should be of type UrlEncoded, and all str should not
-                # be URL encoded.
-                path = urllib.unquote(state.links.alternate)
-                entity = Input(self.service, path, kind, state=state)
-                entities.append(entity)
-        if 'offset' in kwargs:
-            entities = entities[kwargs['offset']:]
-        if 'count' in kwargs:
-            entities = entities[:kwargs['count']]
-        if kwargs.get('sort_mode', None) == 'alpha':
-            sort_field = kwargs.get('sort_field', 'name')
-            if sort_field == 'name':
-                f = lambda x: x.name.lower()
-            else:
-                f = lambda x: x[sort_field].lower()
-            entities = sorted(entities, key=f)
-        if kwargs.get('sort_mode', None) == 'alpha_case':
-            sort_field = kwargs.get('sort_field', 'name')
-            if sort_field == 'name':
-                f = lambda x: x.name
+        if reverse and key is None:
+            paths.reverse()
+        pool = WorkerPool(max(1, min(workers or DEFAULT_WORKERS, len(paths))))
+        try:
+            if key is not None:
+                # The first input can only be known once every kind is in.
+                lists = list(pool.imap(fetch, paths, window=len(paths)))
+                entities = _merge_sorted(lists, key, reverse)
             else:
-                f = lambda x: x[sort_field]
-            entities = sorted(entities, key=f)
-        if kwargs.get('sort_dir', 'asc') == 'desc':
-            entities = list(reversed(entities))
+                entities = (entity for entities in pool.imap(fetch, paths, window=pool.workers)
+                            for entity in entities)
+            for n, entity in enumerate(entities):
+                if limit is not None and n >= limit:
+                    break
+                if n >= offset:
+                    yield entity
+        finally:
+            pool.shutdown(wait=False)
+
+    def _load_inputs(self, response, kind, lazy=False):
+        # Loads the inputs of the given kind from the given response. The
+        # URLs are unquoted, since all URL encoded in the SDK should be of
+        # type UrlEncoded, and all str should not be URL encoded.
+        if lazy:
+            entities = []
+            for element in _load_atom_elements(response):
+                link = _entry_link(element, 'alternate')
+                if link is not None:
+                    path = urllib.unquote(link)
+                else:
+                    # Without a link, the path is built from the name, as
+                    # create does.
+                    name = _entry_title(element)
+                    if name is None:
+                        continue
+                    path = _path(self.path + self.kindpath(kind),
+                                 UrlEncoded(name, encode_slash=True))
+                entities.append(_lazy_entity(
+                    Input(self.service, path, kind, skip_refresh=True), element))
+            return entities
+        entries = _load_atom_entries(response)
+        if entries is None:
+            return [] # No inputs in a collection comes back with no feed or entry in the XML
+        entities = []
+        for entry in entries:
+            state = _parse_atom_entry(entry)
+            path = urllib.unquote(state.links.alternate)
+            entity = Input(self.service, path, kind, state=state)
+            entities.append(entity)
         return entities
 
     def __iter__(self, **kwargs):
@@ -2531,6 +3964,10 @@ class Inputs(Collection):
     def iter(self, **kwargs):
         """ Iterates over the collection of inputs.
 
+        Inputs are returned as soon as they are available, and the remaining
+        kinds are not requested once "count" inputs are returned, unless the
+        inputs are sorted (see :meth:`list`).
+
         :param kwargs: Additional arguments (optional):
 
             - "count" (``integer``): The maximum number of items to return.
@@ -2547,10 +3984,21 @@ class Inputs(Collection):
             - "sort_mode" (``string``): The collating sequence for sorting
               returned items: "auto", "alpha", "alpha_case", or "num".
 
+            - "lazy" (``boolean``): Whether the state of each input is only
+              parsed when it is first used.
+
+            - "workers" (``integer``): The number of kinds to request at the
+              same time (the default is 8).
+
         :type kwargs: ``dict``
         """
-        for item in self.list(**kwargs):
-            yield item
+        kinds = self.kinds
+        if len(kinds) == 1:
+            for item in self.list(*kinds, **kwargs):
+                yield item
+        else:
+            for item in self._iter_kinds(kinds, kinds, **kwargs):
+                yield item
 
     def oneshot(self, path, **kwargs):
         """ Creates a oneshot data input, which is an upload of a single file
@@ -2565,8 +4013,71 @@ class Inputs(Collection):
         self.post('oneshot', name=path, **kwargs)
 
 
+# The fields of a job that Jobs.wait_all polls for
+JOB_PROGRESS_FIELDS = ["sid", "dispatchState", "doneProgress", "isDone", "isFailed"]
+
+# The number of jobs Jobs.wait_all lists per request, which keeps the URL of
+# each listing short
+JOB_POLL_BATCH = 50
+
+
+class _Poller(object):
+    # Chooses how long to wait before polling a search job again. While the
+    # job's doneProgress advances, it waits for half of the time the job is
+    # estimated to still need; otherwise, it doubles the previous wait.
+    def __init__(self, interval, max_interval):
+        self.min_interval = interval
+        self.max_interval = max_interval
+        self.interval = interval
+        self.progress = None
+        self.time = None
+
+    def next(self, progress):
+        now = time.time()
+        if self.progress is None:
+            self.interval = self.min_interval
+        elif progress > self.progress and now > self.time:
+            rate = (progress - self.progress) / (now - self.time)
+            self.interval = (1.0 - progress) / rate / 2
+        else:
+            self.interval *= 2
+        self.interval = min(max(self.interval, self.min_interval), self.max_interval)
+        self.progress, self.time = progress, now
+        return self.interval
+
+
+# Return the doneProgress of a job from its content record, as a float
+def _job_progress(content):
+    if content is None:
+        return 0.0
+    if content.get('isDone') == '1':
+        return 1.0
+    try:
+        return float(content.get('doneProgress') or 0)
+    except ValueError:
+        return 0.0
+
+
+# Return whether a job is done, from its content record
+def _job_done(content):
+    return content is not None and content.get('isDone') == '1'
+
+
+# Sleep for *delay* seconds, or raise TimeoutError if *deadline* is reached
+def _sleep_until(delay, deadline, message):
+    if deadline is not None:
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            raise TimeoutError(message)
+        delay = min(delay, remaining)
+    sleep(delay)
+
+
 class Job(Entity):
     """This class represents a search job."""
+    # The state of a job changes as it runs, so it is never cached.
+    _cacheable = False
+
     def __init__(self, service, sid, **kwargs):
         path = PATH_JOBS + sid
         Entity.__init__(self, service, path, skip_refresh=True, **kwargs)
@@ -2632,6 +4143,72 @@ class Job(Entity):
         self.post("control", action="finalize")
         return self
 
+    def follow(self, interval=0.1, max_interval=2, output_mode="json", **query_params):
+        """Follows (tails) this job, returning its events as they arrive.
+
+        The job is polled, like :meth:`is_done`, and only the events past the
+        last one returned are requested when its ``eventCount`` grows. The
+        time between polls starts at *interval* and doubles, up to
+        *max_interval*, while there are no new events. For a transforming
+        search, which has no events, the results of each new preview are
+        returned in full. The iterator ends once the job is done, so it never
+        ends for a realtime search; stop iterating to stop following. To
+        follow a realtime search without polling, see :meth:`Jobs.follow`.
+
+        :param interval: The shortest time between polls, in seconds.
+        :type interval: ``float``
+        :param max_interval: The longest time between polls, in seconds.
+        :type max_interval: ``float``
+        :param output_mode: The format to request events in: "json", "xml",
+            or "csv".
+        :type output_mode: ``string``
+        :param query_params: Additional parameters (optional), as for
+            :meth:`events` or :meth:`preview`.
+        :type query_params: ``dict``
+
+        :return: An iterator over the events (or preview results), as
+            returned by the reader :func:`splunklib.results.reader_for`
+            returns.
+
+        **Example**::
+
+            import splunklib.client as client
+            s = client.connect(...)
+            job = s.jobs.create("search index=_internal", earliest_time="rt",
+                                latest_time="rt", search_mode="realtime")
+            for event in job.follow():
+                print event
+        """
+        delay = interval
+        while not self.is_ready():
+            sleep(delay)
+            delay = min(delay * 2, max_interval)
+        transforming = self._state.content.get('reportSearch') is not None
+        field = 'numPreviews' if transforming else 'eventCount'
+        query_params['segmentation'] = query_params.get('segmentation', 'none')
+        offset = 0 # High-water mark
+        delay = interval
+        while True:
+            total = int(self._state.content.get(field) or 0)
+            done = self._state.content.get('isDone') == '1'
+            if total > offset:
+                if transforming:
+                    response = self.get("results_preview", count=0,
+                                        output_mode=output_mode, **query_params)
+                else:
+                    response = self.get("events", offset=offset, count=total - offset,
+                                        output_mode=output_mode, **query_params)
+                for event in results.reader_for(response):
+                    yield event
+                offset = total
+                delay = interval
+            elif not done:
+                sleep(delay)
+                delay = min(delay * 2, max_interval)
+            if done:
+                return
+            self.refresh()
+
     def is_done(self):
         """Indicates whether this job finished running.
 
@@ -2643,6 +4220,46 @@ class Job(Entity):
         done = (self._state.content['isDone'] == '1')
         return done
 
+    def wait(self, timeout=None, on_progress=None, interval=0.1, max_interval=5):
+        """Waits for this job to finish.
+
+        This method polls the job, like :meth:`is_done`, at intervals that
+        adapt to the job's ``doneProgress``: while the job advances, it polls
+        again after half of the time the job is estimated to still need, and
+        otherwise it waits twice as long as the last time.
+
+        :param timeout: The maximum number of seconds to wait (optional).
+        :type timeout: ``float``
+        :param on_progress: A function called with the job and its progress
+            (a ``float`` from 0 to 1) after each poll (optional).
+        :param interval: The shortest time between polls, in seconds.
+        :type interval: ``float``
+        :param max_interval: The longest time between polls, in seconds.
+        :type max_interval: ``float``
+        :raises splunklib.aio.TimeoutError: Raised if the job is not done
+            within *timeout* seconds.
+
+        :return: The :class:`Job`.
+
+        **Example**::
+
+            import splunklib.client as client
+            s = client.connect(...)
+            job = s.jobs.create("search * | head 5")
+            job.wait(timeout=60)
+        """
+        poller = _Poller(interval, max_interval)
+        deadline = None if timeout is None else time.time() + timeout
+        while True:
+            done = self.is_done()
+            progress = _job_progress(None if self._state is None else self._state.content)
+            if on_progress is not None:
+                on_progress(self, 1.0 if done else progress)
+            if done:
+                return self
+            _sleep_until(poller.next(progress), deadline,
+                         "Job %s is not done after %s seconds" % (self.sid, timeout))
+
     def is_ready(self):
         """Indicates whether this job is ready for querying.
 
@@ -2657,6 +4274,94 @@ class Job(Entity):
         ready = self._state.content['dispatchState'] not in ['QUEUED', 'PARSING']
         return ready
 
+    def iter_results(self, page_size=10000, output_mode="json", prefetch=2, **query_params):
+        """Iterates over this job's search results, a page at a time.
+
+        Unlike :meth:`results`, which returns at most as many results as the
+        server returns in one response, this method requests the results
+        *page_size* at a time, until it has all of them. While the results of
+        one page are parsed and returned, the next *prefetch* pages are loaded
+        on background threads, so at most *prefetch* + 1 pages are in memory.
+        Each page is parsed by the reader :func:`splunklib.results.reader_for`
+        returns, so the results are ``dict`` objects, and the messages
+        :class:`splunklib.results.Message` objects.
+
+        If the job is not done, this method first waits for it (see
+        :meth:`wait`).
+
+        :param page_size: The number of results to request at a time. When
+            the server returns fewer (*page_size* is above its
+            ``maxresultrows``), the rest of the page is requested as well.
+        :type page_size: ``integer``
+        :param output_mode: The format to request the results in: "json",
+            "xml", or "csv".
+        :type output_mode: ``string``
+        :param prefetch: The number of pages to load ahead of the page being
+            returned. With 0, pages are loaded only when needed.
+        :type prefetch: ``integer``
+        :param query_params: Additional parameters (optional), as for
+            :meth:`results`.
+        :type query_params: ``dict``
+
+        :return: An iterator over the results.
+
+        **Example**::
+
+            import splunklib.client as client
+            s = client.connect(...)
+            job = s.jobs.create("search index=_internal")
+            for result in job.iter_results(page_size=50000, prefetch=4):
+                ...
+        """
+        if page_size <= 0:
+            raise ValueError("page_size must be positive, not %s" % page_size)
+        if not self.is_done():
+            self.wait()
+        query_params['segmentation'] = query_params.get('segmentation', 'none')
+        if 'search' in query_params:
+            # A post-process search changes the number of results, so pages
+            # are requested until one is not full.
+            total = None
+            offsets = xrange(0, sys.maxint, page_size)
+        else:
+            total = int(self._state.content.get('resultCount', 0))
+            offsets = xrange(0, total, page_size)
+
+        def fetch(offset, count=page_size):
+            response = self.get("results", offset=offset, count=count,
+                                output_mode=output_mode, **query_params)
+            response.body = StringIO(response.body.read())
+            return response
+
+        pool = None
+        if prefetch > 0:
+            pool = WorkerPool(prefetch)
+            pages = pool.imap(fetch, offsets, window=prefetch + 1)
+        else:
+            pages = (fetch(offset) for offset in offsets)
+        try:
+            for offset, page in itertools.izip(offsets, pages):
+                end = offset + page_size if total is None else min(offset + page_size, total)
+                while True:
+                    count = 0
+                    for result in results.reader_for(page):
+                        if isinstance(result, dict):
+                            count += 1
+                        yield result
+                    offset += count
+                    if total is None or count == 0 or offset >= end:
+                        break
+                    # The server returned fewer results than asked for (more
+                    # than its maxresultrows, say), so the rest of the page
+                    # is requested before the next one is returned.
+                    page = fetch(offset, end - offset)
+                if offset < end:
+                    break
+        finally:
+            pages.close() # Cancels the pages not loaded yet
+            if pool is not None:
+                pool.shutdown(wait=False)
+
     @property
     def name(self):
         """Returns the name of the search job, which is the search ID (SID).
@@ -2681,11 +4386,9 @@ class Job(Entity):
 
             import splunklib.client as client
             import splunklib.results as results
-            from time import sleep
             service = client.connect(...)
             job = service.jobs.create("search * | head 5")
-            while not job.is_done():
-                sleep(.2)
+            job.wait()
             rr = results.ResultsReader(job.results())
             for result in rr:
                 if isinstance(result, results.Message):
@@ -2862,6 +4565,12 @@ class Jobs(Collection):
             entities.append(entity)
         return entities
 
+    def _lazy_item(self, element):
+        # Overridden because Job takes a sid instead of a path, which is the
+        # last segment of the job's alternate link.
+        sid = urllib.unquote(_entry_link(element, 'alternate')).rstrip('/').rsplit('/', 1)[-1]
+        return _lazy_entity(self.item(self.service, sid), element)
+
     def create(self, query, **kwargs):
         """ Creates a search using a search query and any additional parameters
         you provide.
@@ -2928,6 +4637,221 @@ class Jobs(Collection):
                          search=query, 
                          **params).body
 
+    def follow(self, query, **params):
+        """Runs a realtime search and returns its results as they arrive.
+
+        Unlike :meth:`Job.follow`, which polls a job, this method reads a
+        single stream from :meth:`export` for as long as the caller iterates,
+        so results arrive as soon as splunkd sends them. The JSON and CSV
+        readers read only what has arrived from the stream, rather than
+        waiting to fill a buffer.
+
+        :param query: The search query.
+        :type query: ``string``
+        :param params: Additional arguments (optional), as for :meth:`export`.
+            The time range defaults to all time in realtime ("rt"), and the
+            output mode to "json".
+        :type params: ``dict``
+
+        :return: An iterator over the results, as returned by the reader
+            :func:`splunklib.results.reader_for` returns.
+
+        **Example**::
+
+            import splunklib.client as client
+            s = client.connect(...)
+            for result in s.jobs.follow("search index=_internal"):
+                print result
+        """
+        params.setdefault('earliest_time', 'rt')
+        params.setdefault('latest_time', 'rt')
+        params.setdefault('search_mode', 'realtime')
+        params.setdefault('output_mode', 'json')
+        stream = self.export(query, **params)
+        try:
+            for result in results.reader_for(stream):
+                yield result
+        finally:
+            stream.close()
+
+    def parallel_export(self, query, earliest, latest, slices=8, workers=4,
+                        ordered=True, retries=3, retry_delay=1,
+                        checkpoint=None, **params):
+        """Exports the results of a search over a time range as concurrent
+        export streams, one per time slice, and returns them as one iterator.
+
+        The range from *earliest* to *latest* is cut into *slices* slices of
+        equal length, each of which is exported by :meth:`export` on one of
+        *workers* threads. With *ordered* set to ``True``, results are
+        returned in the order a single export of the whole range would return
+        them: slice by slice, newest slice first. Otherwise they are returned
+        as soon as any slice produces them. Each slice reads at most
+        ``EXPORT_SLICE_BUFFER`` results ahead of the caller.
+
+        A slice whose stream fails with a network error or a server error
+        (HTTP 5xx) is exported again, up to *retries* times, skipping the
+        results it has already produced. The progress of the export is
+        recorded in *checkpoint*, a ``dict`` that can be saved (with
+        ``json.dump``, for instance) and passed to a later call with the same
+        arguments to resume an export that was interrupted.
+
+        Only searches that return events are meaningful to slice: the results
+        of a transforming search (``stats``, ``timechart``, and so on) would
+        be computed separately for each slice. Diagnostic messages in the
+        streams are skipped.
+
+        **Example**::
+
+            import splunklib.client as client
+            service = client.connect(...)
+            checkpoint = {}
+            for event in service.jobs.parallel_export(
+                    "search index=main", 1388534400, 1391212800,
+                    slices=31, workers=8, output_mode="json",
+                    checkpoint=checkpoint):
+                print event["_raw"]
+
+        :param query: The search query.
+        :type query: ``string``
+        :param earliest: The start of the time range, in seconds since the
+            epoch (inclusive).
+        :type earliest: ``integer`` or ``float``
+        :param latest: The end of the time range, in seconds since the epoch
+            (exclusive).
+        :type latest: ``integer`` or ``float``
+        :param slices: The number of slices to cut the time range into.
+        :type slices: ``integer``
+        :param workers: The number of slices to export concurrently.
+        :type workers: ``integer``
+        :param ordered: Whether to return the results in time slice order.
+        :type ordered: ``boolean``
+        :param retries: The number of times to retry a failed slice.
+        :type retries: ``integer``
+        :param retry_delay: The number of seconds to wait before the first
+            retry of a slice. The delay doubles with each retry.
+        :type retry_delay: ``float``
+        :param checkpoint: The progress of the export, which is updated as
+            results are returned (optional).
+        :type checkpoint: ``dict``
+        :param params: Additional arguments to :meth:`export`, such as
+            ``output_mode`` (optional).
+        :type params: ``dict``
+
+        :return: An iterator over the results, as ``dict`` objects.
+        """
+        if "exec_mode" in params:
+            raise TypeError("Cannot specify an exec_mode to export.")
+        for name in ("earliest_time", "latest_time"):
+            if name in params:
+                raise TypeError("Cannot specify %s to parallel_export; use earliest and latest." % name)
+        if latest <= earliest:
+            raise ValueError("The time range is empty: %s to %s." % (earliest, latest))
+        if slices < 1:
+            raise ValueError("Cannot export in fewer than one slice.")
+        if checkpoint is None:
+            checkpoint = {}
+        step = (latest - earliest) / float(slices)
+        bounds = [(earliest + i * step, latest if i == slices - 1 else earliest + (i + 1) * step)
+                  for i in reversed(xrange(slices))]
+        todo = []
+        for lower, upper in bounds:
+            state = checkpoint.setdefault("%.6f-%.6f" % (lower, upper),
+                                          {"offset": 0, "done": False})
+            if not state["done"]:
+                todo.append((lower, upper, state))
+        return self._parallel_export(query, todo, min(workers, max(1, len(todo))),
+                                     ordered, retries, retry_delay, params)
+
+    def _parallel_export(self, query, todo, workers, ordered, retries,
+                         retry_delay, params):
+        # Each slice is exported by a worker, which puts (index, kind, value)
+        # tuples on a queue: its own when ordered, a shared one otherwise.
+        if ordered:
+            queues = [Queue.Queue(EXPORT_SLICE_BUFFER) for _ in todo]
+        else:
+            queues = [Queue.Queue(EXPORT_SLICE_BUFFER * workers)] * len(todo)
+        stop = threading.Event()
+
+        def put(index, kind, value=None):
+            while not stop.is_set():
+                try:
+                    queues[index].put((index, kind, value), True, 0.1)
+                    return
+                except Queue.Full:
+                    pass
+            raise _ExportStopped()
+
+        def run(index):
+            lower, upper, state = todo[index]
+            produced = state["offset"] # Results put on the queue so far
+            attempt = 0
+            try:
+                while True:
+                    if stop.is_set():
+                        return
+                    count = 0
+                    try:
+                        stream = self.export(query, earliest_time="%.6f" % lower,
+                                             latest_time="%.6f" % upper, **params)
+                        try:
+                            for result in results.reader_for(stream):
+                                if not isinstance(result, dict):
+                                    continue
+                                count += 1
+                                if count <= produced:
+                                    continue
+                                put(index, "result", result)
+                                produced += 1
+                        finally:
+                            stream.close()
+                        put(index, "done")
+                        return
+                    except (socket.error, httplib.HTTPException, HTTPError) as e:
+                        if isinstance(e, HTTPError) and e.status < 500:
+                            raise
+                        if attempt >= retries:
+                            raise
+                        logging.debug("Export of slice %s-%s failed after %d results "
+                                      "(%s); retrying.", lower, upper, produced, e)
+                        sleep(retry_delay * 2 ** attempt)
+                        attempt += 1
+            except _ExportStopped:
+                pass
+            except Exception:
+                try:
+                    put(index, "error", sys.exc_info())
+                except _ExportStopped:
+                    pass
+
+        pool = WorkerPool(workers)
+        futures = [pool.submit(run, index) for index in xrange(len(todo))]
+        try:
+            current = 0
+            remaining = len(todo)
+            while remaining > 0:
+                while True:
+                    try:
+                        index, kind, value = queues[current].get(True, 3600)
+                        break
+                    except Queue.Empty:
+                        pass
+                state = todo[index][2]
+                if kind == "result":
+                    state["offset"] += 1
+                    yield value
+                elif kind == "done":
+                    state["done"] = True
+                    remaining -= 1
+                    if ordered:
+                        current += 1
+                else:
+                    raise value[0], value[1], value[2]
+        finally:
+            stop.set()
+            for future in futures:
+                future.cancel()
+            pool.shutdown(wait=False)
+
     def itemmeta(self):
         """There is no metadata available for class:``Jobs``.
 
@@ -2959,7 +4883,9 @@ class Jobs(Collection):
 
         The ``oneshot`` method makes a single roundtrip to the server (as opposed
         to two for :meth:`create` followed by :meth:`results`), plus at most two more
-        if the ``autologin`` field of :func:`connect` is set to ``True``.
+        if the ``autologin`` field of :func:`connect` is set to ``True``. If
+        the service has a :class:`ResultCache`, the results of an identical
+        earlier search may be returned instead, without any round trip.
 
         :raises ValueError: Raised for invalid queries.
 
@@ -2968,7 +4894,8 @@ class Jobs(Collection):
         :param params: Additional arguments (optional):
 
             - "output_mode": Specifies the output format of the results (XML,
-              JSON, or CSV).
+              JSON, or CSV). :func:`splunklib.results.reader_for` returns the
+              reader for any of them.
 
             - "earliest_time": Specifies the earliest time in the time range to
               search. The time string can be a UTC time (with fractional seconds),
@@ -2987,9 +4914,349 @@ class Jobs(Collection):
         if "exec_mode" in params:
             raise TypeError("Cannot specify an exec_mode to oneshot.")
         params['segmentation'] = params.get('segmentation', 'none')
-        return self.post(search=query,
-                         exec_mode="oneshot", 
-                         **params).body
+        request = lambda: self.post(search=query,
+                                    exec_mode="oneshot", 
+                                    **params).body
+        cache = self.service.result_cache
+        if cache is None:
+            return request()
+        key = cache.key(_result_origin(self.service), "oneshot", self.path,
+                        _normalize_query(query), sorted(params.items()))
+        return cache.fetch(key, params.get('latest_time'), request)
+
+    def wait_all(self, jobs, timeout=None, on_progress=None, interval=0.1, max_interval=5):
+        """Waits for all of *jobs* to finish.
+
+        Rather than polling each job, this method polls them with requests
+        that list only the jobs still pending, up to ``JOB_POLL_BATCH`` jobs
+        per request, and only ask for the fields that tell whether a job is
+        done. Jobs that are not in the list (for example, because they belong
+        to another user) are polled individually. The
+        time between polls adapts to the progress of the slowest job, as for
+        :meth:`Job.wait`.
+
+        The state of each job is reloaded from the server the next time it is
+        used.
+
+        :param jobs: The :class:`Job` objects, or search IDs, to wait for.
+        :type jobs: ``list``
+        :param timeout: The maximum number of seconds to wait (optional).
+        :type timeout: ``float``
+        :param on_progress: A function called with a job and its progress (a
+            ``float`` from 0 to 1) whenever the progress of a job changes
+            (optional).
+        :param interval: The shortest time between polls, in seconds.
+        :type interval: ``float``
+        :param max_interval: The longest time between polls, in seconds.
+        :type max_interval: ``float``
+        :raises splunklib.aio.TimeoutError: Raised if the jobs are not all
+            done within *timeout* seconds.
+
+        :return: A ``list`` of the :class:`Job` objects, in the order given.
+
+        **Example**::
+
+            import splunklib.client as client
+            s = client.connect(...)
+            jobs = [s.jobs.create(query) for query in queries]
+            for job in s.jobs.wait_all(jobs, timeout=600):
+                print job.sid, job["resultCount"]
+        """
+        jobs = [job if isinstance(job, Job) else Job(self.service, job) for job in jobs]
+        pending = dict((job.sid, job) for job in jobs)
+        progress = {}
+        poller = _Poller(interval, max_interval)
+        deadline = None if timeout is None else time.time() + timeout
+        while True:
+            contents = self._poll(pending)
+            for sid, job in pending.items():
+                current = _job_progress(contents[sid])
+                if on_progress is not None and progress.get(sid) != current:
+                    on_progress(job, current)
+                progress[sid] = current
+                if _job_done(contents[sid]):
+                    del pending[sid]
+            if len(pending) == 0:
+                return jobs
+            slowest = min(progress[sid] for sid in pending)
+            _sleep_until(poller.next(slowest), deadline,
+                         "%d of %d jobs are not done after %s seconds" % (
+                             len(pending), len(jobs), timeout))
+
+    def _poll(self, jobs):
+        # Returns the progress fields of each of *jobs*, a dict of sid to Job,
+        # as a dict of sid to content record (None if the job has none yet).
+        # They are read from listings filtered to the sids of *jobs*,
+        # JOB_POLL_BATCH sids at a time, and jobs that are not listed (for
+        # example, because they belong to another user) are refreshed one by
+        # one. Listed jobs that are done are reloaded when next used.
+        sids = sorted(jobs)
+        listed = {}
+        for i in range(0, len(sids), JOB_POLL_BATCH):
+            batch = sids[i:i + JOB_POLL_BATCH]
+            response = self.get(
+                count=len(batch), f=JOB_PROGRESS_FIELDS,
+                search=" OR ".join('sid="%s"' % sid for sid in batch))
+            for entry in _load_atom_entries(response) or []:
+                content = entry.get('content', {})
+                if content.get('sid') in jobs:
+                    listed[content['sid']] = content
+        contents = {}
+        for sid, job in jobs.iteritems():
+            if sid in listed:
+                contents[sid] = listed[sid]
+                if listed[sid].get('isDone') == '1':
+                    job._state = None
+            else:
+                job.is_done()
+                contents[sid] = None if job._state is None else job._state.content
+        return contents
+
+    def control_many(self, jobs, action, workers=None, **params):
+        """Runs a control action on many search jobs at once.
+
+        Each job takes one ``POST`` to its ``control`` endpoint, as for
+        :meth:`Job.cancel` and the like, but up to *workers* of them are made
+        at the same time. A job that no longer exists (HTTP 404) is reported
+        as missing rather than as failed, since cancelling or touching it
+        again is a no-op, as for :meth:`Job.cancel`.
+
+        :param jobs: The search jobs, as :class:`Job` objects or search IDs.
+        :type jobs: ``list``
+        :param action: The action: ``cancel``, ``pause``, ``unpause``,
+            ``finalize``, ``touch``, ``setttl``, ``setpriority``,
+            ``enablepreview``, or ``disablepreview``. The names of the
+            :class:`Job` methods (``set_ttl``) are accepted as well.
+        :type action: ``string``
+        :param workers: The number of requests to make at the same time (the
+            default is ``splunklib.aio.DEFAULT_WORKERS``).
+        :type workers: ``integer``
+        :param params: The arguments of the action, such as ``ttl`` for
+            ``setttl`` and ``priority`` for ``setpriority``.
+        :type params: ``dict``
+
+        :return: A record with the search IDs that ``succeeded``, the ones
+            that were ``missing``, a ``dict`` of the ones that ``failed`` to
+            the exception raised for them, and the number of seconds it all
+            took (``elapsed``) and of jobs done per second (``rate``).
+
+        **Example**::
+
+            import splunklib.client as client
+            s = client.connect(...)
+            outcome = s.jobs.control_many(sids, "touch", workers=16)
+            print "%d touched in %.1f s" % (len(outcome.succeeded), outcome.elapsed)
+            for sid, error in outcome.failed.iteritems():
+                print sid, error
+        """
+        action = action.replace('_', '')
+        jobs = [job if isinstance(job, Job) else Job(self.service, job) for job in jobs]
+        def control(job):
+            try:
+                job.post("control", action=action, **params)
+                return job.sid, None
+            except Exception as e:
+                return job.sid, e
+
+        outcome = record({'succeeded': [], 'missing': [], 'failed': {}})
+        start = time.time()
+        if len(jobs) > 0:
+            pool = WorkerPool(max(1, min(workers or DEFAULT_WORKERS, len(jobs))))
+            try:
+                for sid, error in pool.imap(control, jobs):
+                    if error is None:
+                        outcome.succeeded.append(sid)
+                    elif isinstance(error, HTTPError) and error.status == 404:
+                        outcome.missing.append(sid)
+                    else:
+                        outcome.failed[sid] = error
+            finally:
+                pool.shutdown(wait=False)
+        outcome.elapsed = time.time() - start
+        outcome.rate = len(jobs) / outcome.elapsed if outcome.elapsed > 0 else 0.0
+        return outcome
+
+
+class SearchPool(object):
+    """This class runs many searches, at most *max_searches* at a time, and
+    returns the results of each one as soon as it finishes.
+
+    Searches are dispatched as normal (asynchronous) jobs in the order they
+    are given, as long as fewer than *max_searches* are running, which
+    should be no more than the search quota of the user. The running jobs
+    are polled as for :meth:`Jobs.wait_all`: with requests that list only
+    the jobs still running, up to ``JOB_POLL_BATCH`` jobs per request, except
+    for jobs that are not in the list, which are polled individually, at
+    intervals that adapt to the progress of the slowest one. When a dispatch fails before splunkd could have
+    created the job, because splunkd is busy (HTTP 503) or refuses the
+    connection, it is retried up to *retries* times, after *retry_delay*
+    seconds, and twice as long after each failure. Other failures, such as
+    a connection lost while the request was sent, are not retried, since
+    the job may have been created and a second one would count against
+    the search quota too.
+
+    :meth:`run` returns a record for each search, in the order they finish,
+    with these fields:
+
+    - ``index``: The position of the search in the queries given.
+    - ``query`` and ``params``: The search and its arguments.
+    - ``job``: The :class:`Job`, or ``None`` if it could not be dispatched.
+    - ``results``: The ``InputStream`` IO handle to all of the job's
+      results, as returned by :meth:`Job.results`, or ``None`` if the
+      search failed.
+    - ``error``: The exception raised for a search that failed, or
+      ``None``.
+    - ``queued``: The number of seconds the search waited to be dispatched.
+    - ``latency``: The number of seconds from its dispatch until it was
+      found done, or ``None``.
+    - ``retries``: The number of times its dispatch was retried.
+
+    The ``dispatched``, ``completed``, and ``failed`` fields of the pool
+    count the searches across all the calls to :meth:`run`, and the
+    ``dispatch_retries`` field counts the retried dispatches.
+
+    :param service: The :class:`Service` to search.
+    :param max_searches: The largest number of searches to run at a time.
+    :type max_searches: ``integer``
+    :param interval: The shortest time between polls, in seconds.
+    :type interval: ``float``
+    :param max_interval: The longest time between polls, in seconds.
+    :type max_interval: ``float``
+    :param retries: The number of times to retry a dispatch.
+    :type retries: ``integer``
+    :param retry_delay: The number of seconds to wait before the first retry.
+    :type retry_delay: ``float``
+
+    **Example**::
+
+        import splunklib.client as client
+        import splunklib.results as results
+        s = client.connect(...)
+        pool = client.SearchPool(s, max_searches=6)
+        for search in pool.run(queries, earliest_time="-1d"):
+            if search.error is not None:
+                print search.query, search.error
+                continue
+            for result in results.ResultsReader(search.results):
+                print search.index, result
+    """
+    def __init__(self, service, max_searches=4, interval=0.1, max_interval=5,
+                 retries=2, retry_delay=1):
+        self.service = service
+        self.max_searches = max_searches
+        self.interval = interval
+        self.max_interval = max_interval
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.dispatched = 0
+        self.completed = 0
+        self.failed = 0
+        self.dispatch_retries = 0
+
+    def run(self, queries, **params):
+        """Runs the searches, and returns their records as they finish.
+
+        If the iteration is stopped early, the searches that are still
+        running are cancelled.
+
+        :param queries: The searches, each a query string or a ``(query,
+            params)`` tuple, whose *params* are added to the arguments given
+            here.
+        :type queries: ``list``
+        :param params: The arguments for :meth:`Jobs.create`, and the
+            ``output_mode`` of the results.
+        :type params: ``dict``
+        :return: An iterator over the records of the searches.
+        """
+        if "exec_mode" in params:
+            raise TypeError("Cannot specify an exec_mode to a SearchPool.")
+        result_params = {'count': 0}
+        if 'output_mode' in params:
+            result_params['output_mode'] = params.pop('output_mode')
+        start = time.time()
+        waiting = [] # A heap of (time to dispatch, index, search)
+        for index, query in enumerate(queries):
+            kwargs = dict(params)
+            if not isinstance(query, basestring):
+                query, extra = query
+                kwargs.update(extra)
+            search = record({'index': index, 'query': query, 'params': kwargs,
+                             'job': None, 'results': None, 'error': None,
+                             'queued': None, 'latency': None, 'retries': 0})
+            waiting.append((0, index, search))
+        heapq.heapify(waiting)
+        running = OrderedDict() # sid -> search, in the order dispatched
+        dispatched = {} # sid -> time of dispatch
+        poller = _Poller(self.interval, self.max_interval)
+        progress = {}
+        try:
+            while waiting or running:
+                while waiting and len(running) < self.max_searches and \
+                        waiting[0][0] <= time.time():
+                    _, index, search = heapq.heappop(waiting)
+                    try:
+                        search.job = self.service.jobs.create(search.query, **search.params)
+                    except Exception as e:
+                        if _retryable(e) and search.retries < self.retries:
+                            delay = self.retry_delay * 2 ** search.retries
+                            search.retries += 1
+                            self.dispatch_retries += 1
+                            heapq.heappush(waiting, (time.time() + delay, index, search))
+                            continue
+                        search.error = e
+                        self.failed += 1
+                        yield search
+                        continue
+                    now = time.time()
+                    search.queued = now - start
+                    dispatched[search.job.sid] = now
+                    running[search.job.sid] = search
+                    self.dispatched += 1
+                if not running:
+                    if waiting:
+                        sleep(max(0, waiting[0][0] - time.time()))
+                    continue
+                contents = self.service.jobs._poll(
+                    dict((sid, search.job) for sid, search in running.iteritems()))
+                finished = [sid for sid in running if _job_done(contents[sid])]
+                for sid in finished:
+                    search = running.pop(sid)
+                    search.latency = time.time() - dispatched.pop(sid)
+                    progress.pop(sid, None)
+                    if contents[sid].get('isFailed') == '1':
+                        search.error = OperationError("Search job %s failed." % sid)
+                    else:
+                        try:
+                            search.results = search.job.results(**result_params)
+                        except Exception as e:
+                            search.error = e
+                    if search.error is None:
+                        self.completed += 1
+                    else:
+                        self.failed += 1
+                    yield search
+                for sid in running:
+                    progress[sid] = _job_progress(contents[sid])
+                if running and not finished:
+                    delay = poller.next(min(progress.itervalues()))
+                    if waiting and len(running) < self.max_searches:
+                        delay = min(delay, max(0, waiting[0][0] - time.time()))
+                    sleep(delay)
+        finally:
+            for search in running.itervalues():
+                try:
+                    search.job.cancel()
+                except Exception:
+                    pass
+
+
+# Return whether a request that raised *error* can be sent again without the
+# risk of running it twice: splunkd turned it away as busy, or the connection
+# was refused, so the request never arrived
+def _retryable(error):
+    if isinstance(error, HTTPError):
+        return error.status == 503
+    return isinstance(error, socket.error) and error.errno == errno.ECONNREFUSED
 
 
 class Loggers(Collection):
@@ -3081,7 +5348,7 @@ class SavedSearch(Entity):
         :return: The number of alerts fired by this saved search.
         :rtype: ``integer``
         """
-        return int(self._state.content.get('triggered_alert_count', 0))
+        return int(self.content.get('triggered_alert_count', 0))
 
     def dispatch(self, **kwargs):
         """Runs the saved search and returns the resulting search job.
@@ -3097,6 +5364,46 @@ class SavedSearch(Entity):
         sid = _load_sid(response)
         return Job(self.service, sid)
 
+    def dispatch_results(self, timeout=None, **kwargs):
+        """Runs the saved search, waits for it to finish, and returns a
+        streaming handle to all of its results.
+
+        If the service has a :class:`ResultCache`, the results of an earlier
+        identical call may be returned instead, without contacting the
+        server. Calls are identical when the search of the saved search, its
+        namespace, and the arguments are the same. The time the results are
+        kept depends on the ``dispatch.latest_time`` argument or, without it,
+        on the ``dispatch.latest_time`` of the saved search.
+
+        :param timeout: The number of seconds to wait for the search
+            (optional; the default is to wait until it finishes).
+        :type timeout: ``float``
+        :param `kwargs`: Additional dispatch arguments (optional), as for
+            :meth:`dispatch`, and the ``output_mode`` of the results.
+        :type kwargs: ``dict``
+        :raises TimeoutError: Raised when the search does not finish in time.
+        :return: The ``InputStream`` IO handle to the results, as returned
+            by :meth:`Job.results`.
+        """
+        output_mode = kwargs.pop('output_mode', None)
+        params = {'count': 0}
+        if output_mode is not None:
+            params['output_mode'] = output_mode
+        def request():
+            job = self.dispatch(**kwargs)
+            job.wait(timeout)
+            return job.results(**params)
+        cache = self.service.result_cache
+        if cache is None:
+            return request()
+        content = self.content
+        key = cache.key(_result_origin(self.service), "dispatch",
+                        _cache_path(self.path), content.get('search'),
+                        sorted(kwargs.items()), output_mode)
+        latest_time = kwargs.get('dispatch.latest_time',
+                                 content.get('dispatch.latest_time'))
+        return cache.fetch(key, latest_time or None, request)
+
     @property
     def fired_alerts(self):
         """Returns the collection of fired alerts (a fired alert group)
@@ -3112,9 +5419,9 @@ class SavedSearch(Entity):
         c = Collection(
             self.service,
             self.service._abspath(PATH_FIRED_ALERTS + self.name,
-                                  owner=self._state.access.owner,
-                                  app=self._state.access.app,
-                                  sharing=self._state.access.sharing),
+                                  owner=self.access.owner,
+                                  app=self.access.app,
+                                  sharing=self.access.sharing),
             item=AlertGroup)
         return c
 
@@ -3253,7 +5560,10 @@ class Settings(Entity):
         :type kwargs: ``dict``
         :return: The :class:`Settings` collection.
         """
-        self.service.post("server/settings/settings", **kwargs)
+        try:
+            self.service.post("server/settings/settings", **kwargs)
+        finally:
+            _invalidate_cached(self.service, "server/settings/settings")
         return self
 
 
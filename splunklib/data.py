@@ -16,9 +16,18 @@
 format, which is the format used by most of the REST API.
 """
 
-from xml.etree.ElementTree import XML
+from StringIO import StringIO
 
-__all__ = ["load"]
+from xml.etree.ElementTree import ParseError
+
+try:
+    from xml.etree.cElementTree import XML, iterparse
+    from xml.etree.cElementTree import ParseError as _ParseError
+except ImportError:
+    from xml.etree.ElementTree import XML, iterparse
+    _ParseError = ParseError
+
+__all__ = ["load", "iterload"]
 
 # LNAME refers to element names without namespaces; XNAME is the same
 # name, but with an XML namespace.
@@ -74,7 +83,10 @@ def load(text, match=None):
         'namespaces': [],
         'names': {}
     }
-    root = XML(text)
+    try:
+        root = XML(text)
+    except _ParseError as e:
+        raise parse_error(e)
     items = [root] if match is None else root.findall(match)
     count = len(items)
     if count == 0: 
@@ -84,22 +96,82 @@ def load(text, match=None):
     else:
         return [load_root(item, nametable) for item in items]
 
+def iterload(source, match):
+    """This function reads the XML of an Atom Feed from a string or a stream,
+    and returns an iterator over the children of the top-level element that
+    have the tag name *match*. If the top-level element itself has that name,
+    it is the only one returned.
+
+    Each child is loaded as soon as it has been read, and then discarded, so
+    only one is in memory at a time. The value returned for each child is the
+    one it has in the result of :func:`load`; for example,
+    ``iterload(text, "{http://www.w3.org/2005/Atom}entry")`` returns the same
+    records as ``load(text).feed.entry``, one at a time.
+
+    :param source: The XML text to load, or a stream to read it from.
+    :type source: ``string`` or file-like object
+    :param match: A tag name, which may include a namespace, as in
+        ``{http://www.w3.org/2005/Atom}entry``. A name without a namespace
+        matches the name in any namespace.
+    :type match: ``string``
+    """
+    if isinstance(source, basestring):
+        source = source.strip()
+        if len(source) == 0: return
+        source = StringIO(source)
+    qualified = match.startswith('{')
+    nametable = {
+        'namespaces': [],
+        'names': {}
+    }
+    depth = 0
+    root = None
+    events = iterparse(source, ("start", "end"))
+    while True:
+        try:
+            event, element = events.next()
+        except StopIteration:
+            return
+        except _ParseError as e:
+            raise parse_error(e)
+        if event == "start":
+            if root is None: root = element
+            depth += 1
+            continue
+        depth -= 1
+        if (element.tag if qualified else localname(element.tag)) != match:
+            continue
+        if depth == 1:
+            yield load_elem(element, nametable)[1]
+            root.clear() # Discard the children read so far
+        elif depth == 0:
+            yield load_elem(element, nametable)[1]
+
+# cElementTree raises its own ParseError, which is not the one that callers of
+# this module have always caught, so convert it.
+def parse_error(error):
+    if isinstance(error, ParseError): return error
+    result = ParseError(*error.args)
+    result.code = getattr(error, "code", None)
+    result.position = getattr(error, "position", None)
+    return result
+
+# Records are filled in with dict.__setitem__ while they are loaded, which
+# skips the bookkeeping Record does when a record in use is changed.
+setitem = dict.__setitem__
+
 # Load the attributes of the given element.
 def load_attrs(element):
     if not hasattrs(element): return None
-    attrs = record()
-    for key, value in element.attrib.iteritems(): 
-        attrs[key] = value
-    return attrs
+    return record(element.attrib)
 
 # Parse a <dict> element and return a Python dict
 def load_dict(element, nametable = None):
     value = record()
-    children = list(element)
-    for child in children:
+    for child in element:
         assert iskey(child.tag)
         name = child.attrib["name"]
-        value[name] = load_value(child, nametable)
+        setitem(value, name, load_value(child, nametable))
     return value
 
 # Loads the given elements attrs & value into single merged dict.
@@ -129,8 +201,7 @@ def load_elem(element, nametable=None):
 def load_list(element, nametable=None):
     assert islist(element.tag)
     value = []
-    children = list(element)
-    for child in children:
+    for child in element:
         assert isitem(child.tag)
         value.append(load_value(child, nametable))
     return value
@@ -169,13 +240,14 @@ def load_value(element, nametable=None):
     for child in children:
         name, item = load_elem(child, nametable)
         # If we have seen this name before, promote the value to a list
-        if value.has_key(name):
-            current = value[name]
+        if name in value:
+            current = dict.__getitem__(value, name)
             if not isinstance(current, list): 
-                value[name] = [current]
-            value[name].append(item)
+                current = [current]
+                setitem(value, name, current)
+            current.append(item)
         else:
-            value[name] = item
+            setitem(value, name, item)
 
     return value
 
@@ -197,6 +269,10 @@ class Record(dict):
     with the keys ``baz`` and ``qux``. If a key contains multiple ``.``, each 
     one is placed into a nested dictionary, so you can write ``r.bar.qux`` or 
     ``r['bar.qux']`` interchangeably.
+
+    The nested dictionaries are built the first time a prefix is retrieved and
+    then reused, until the record is changed. Changing a nested dictionary
+    does not change the record it came from.
     """
     sep = '.'
 
@@ -225,26 +301,80 @@ class Record(dict):
     def __getitem__(self, key):
         if key in self:
             return dict.__getitem__(self, key)
-        key += self.sep
-        result = record()
-        for k,v in self.iteritems():
-            if not k.startswith(key):
+        prefixes = self.__dict__.get('_Record__prefixes')
+        if prefixes is None:
+            prefixes = self.__dict__['_Record__prefixes'] = self._prefixes()
+        try:
+            return prefixes[key]
+        except KeyError:
+            raise KeyError("No key or prefix: %s%s" % (key, self.sep))
+
+    # Maps every prefix of the dotted keys to the nested record of the keys
+    # that share it. The map is kept until the record (or one of the nested
+    # records it returned) is changed.
+    def _prefixes(self):
+        sep = self.sep
+        prefixes = {}
+        for key, value in self.iteritems():
+            if not isinstance(key, basestring) or sep not in key:
                 continue
-            suffix = k[len(key):]
-            if '.' in suffix:
-                ks = suffix.split(self.sep)
-                z = result
-                for x in ks[:-1]:
-                    if x not in z:
-                        z[x] = record()
-                    z = z[x]
-                z[ks[-1]] = v
-            else:
-                result[suffix] = v
-        if len(result) == 0:
-            raise KeyError("No key or prefix: %s" % key)
-        return result
-    
+            parts = key.split(sep)
+            parent = prefix = None
+            for part in parts[:-1]:
+                prefix = part if prefix is None else prefix + sep + part
+                node = prefixes.get(prefix)
+                if node is None:
+                    node = prefixes[prefix] = record()
+                    node.__dict__['_Record__owner'] = self
+                    if parent is not None:
+                        dict.__setitem__(parent, part, node)
+                parent = node
+            # A nested record takes precedence over a value of the same name.
+            if key not in prefixes:
+                dict.__setitem__(parent, parts[-1], value)
+        return prefixes
+
+    def _invalidate(self):
+        self.__dict__.pop('_Record__prefixes', None)
+        owner = self.__dict__.pop('_Record__owner', None)
+        if owner is not None:
+            owner._invalidate()
+
+    # The map of prefixes is not copied or pickled.
+    def __getstate__(self):
+        return {}
+
+    def __setstate__(self, state):
+        pass
+
+    def __setitem__(self, key, value):
+        self._invalidate()
+        dict.__setitem__(self, key, value)
+
+    def __delitem__(self, key):
+        self._invalidate()
+        dict.__delitem__(self, key)
+
+    def clear(self):
+        self._invalidate()
+        dict.clear(self)
+
+    def pop(self, *args):
+        self._invalidate()
+        return dict.pop(self, *args)
+
+    def popitem(self):
+        self._invalidate()
+        return dict.popitem(self)
+
+    def setdefault(self, key, default=None):
+        self._invalidate()
+        return dict.setdefault(self, key, default)
+
+    def update(self, *args, **kwargs):
+        self._invalidate()
+        dict.update(self, *args, **kwargs)
+
 
 def record(value=None): 
     """This function returns a :class:`Record` instance constructed with an 
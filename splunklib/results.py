@@ -30,8 +30,24 @@ as follows:::
     for item in reader:
         print(item)
     print "Results are a preview: %s" % reader.is_preview
+
+Results requested with ``output_mode="json"`` or ``output_mode="csv"`` are
+read the same way with :class:`JSONResultsReader` and
+:class:`CSVResultsReader`. Given the response from splunkd,
+:func:`reader_for` picks the reader that matches its content type:::
+
+    response = service.get("search/jobs/%s/results" % sid, output_mode="json")
+    for item in results.reader_for(response):
+        print(item)
 """
 
+import collections
+import csv
+import json
+import re
+import weakref
+from itertools import izip
+
 try:
     import xml.etree.cElementTree as et
 except:
@@ -49,7 +65,12 @@ except:
 
 __all__ = [
     "ResultsReader",
-    "Message"
+    "JSONResultsReader",
+    "CSVResultsReader",
+    "Message",
+    "Row",
+    "reader_for",
+    "read_columnar"
 ]
 
 class Message(object):
@@ -95,22 +116,23 @@ class _ConcatenatedStream(object):
 
         If *n* is ``None``, return all available characters.
         """
-        response = ""
+        chunks = []
         while len(self.streams) > 0 and (n is None or n > 0):
             txt = self.streams[0].read(n)
-            response += txt
+            chunks.append(txt)
             if n is not None:
                 n -= len(txt)
-            if n > 0 or n is None:
+            if n is None or n > 0:
                 del self.streams[0]
-        return response
+        return "".join(chunks)
 
 class _XMLDTDFilter(object):
     """Lazily remove all XML DTDs from a stream.
 
     All substrings matching the regular expression <?[^>]*> are
-    removed in their entirety from the stream. No regular expressions
-    are used, however, so everything still streams properly.
+    removed in their entirety from the stream. The stream is read in
+    blocks of *chunk_size* characters, which are scanned with
+    ``str.find``, so everything still streams properly.
 
     **Example**::
 
@@ -118,35 +140,179 @@ class _XMLDTDFilter(object):
         s = _XMLDTDFilter("<?xml abcd><element><?xml ...></element>")
         assert s.read() == "<element></element>"
     """
-    def __init__(self, stream):
+    def __init__(self, stream, chunk_size=64*1024):
         self.stream = stream
+        self.chunk_size = chunk_size
+        self._output = [] # Filtered text not returned by read yet
+        self._size = 0 # The total length of _output
+        self._pending = "" # The start of a DTD that ends in a later chunk
+        self._eof = False
 
     def read(self, n=None):
         """Read at most *n* characters from this stream.
 
         If *n* is ``None``, return all available characters.
         """
-        response = ""
-        while n is None or n > 0:
-            c = self.stream.read(1)
-            if c == "":
-                break
-            elif c == "<":
-                c += self.stream.read(1)
-                if c == "<?":
-                    while True:
-                        q = self.stream.read(1)
-                        if q == ">":
-                            break
-                else:
-                    response += c
-                    if n is not None:
-                        n -= len(c)
-            else:
-                response += c
-                if n is not None:
-                    n -= 1
-        return response
+        while not self._eof and (n is None or self._size < n):
+            self._fill()
+        response = "".join(self._output)
+        if n is None or len(response) <= n:
+            self._output, self._size = [], 0
+            return response
+        self._output, self._size = [response[n:]], len(response) - n
+        return response[:n]
+
+    def _fill(self):
+        # Read one chunk from the stream and append it, minus any DTDs, to
+        # _output.
+        chunk = self.stream.read(self.chunk_size)
+        if chunk == "":
+            self._eof = True
+            # A DTD still open at the end of the stream is dropped, but a
+            # lone '<' is passed through.
+            if self._pending == "<":
+                self._append("<")
+            self._pending = ""
+            return
+        text = self._pending + chunk if self._pending else chunk
+        self._pending = ""
+        start = 0
+        while True:
+            i = text.find("<?", start)
+            if i == -1:
+                end = len(text)
+                # A '<' at the end of the chunk may start a DTD that
+                # continues in the next one.
+                if text.endswith("<"):
+                    end -= 1
+                    self._pending = "<"
+                self._append(text[start:end])
+                return
+            self._append(text[start:i])
+            j = text.find(">", i + 2)
+            if j == -1:
+                self._pending = text[i:]
+                return
+            start = j + 1
+
+    def _append(self, text):
+        if text:
+            self._output.append(text)
+            self._size += len(text)
+
+def _utf8(text):
+    # ElementTree returns a str for ASCII text, which is UTF-8 already.
+    return text if isinstance(text, str) else text.encode('utf8')
+
+class Row(tuple):
+    """This class is a search result returned by ``ResultsReader`` with
+    ``compact=True``.
+
+    A ``Row`` holds only the values of a result. The names of its fields are
+    shared by all the rows with the same fields, in the ``fields`` field of
+    their class, much like a ``collections.namedtuple``. A missing value is
+    ``None``. Otherwise a ``Row`` reads like the ``dict`` returned for the
+    same result: ``row['count']``, ``row.get('count')``, ``'count' in row``,
+    ``row.keys()``, ``row.items()`` and iteration all skip missing values,
+    and a ``Row`` is equal to the ``dict`` of its fields. It is not a ``dict``
+    (but it is a ``collections.Mapping``), so tell it apart from a
+    :class:`Message` with ``isinstance(result, results.Message)``.
+
+    **Example**::
+
+        for row in results.ResultsReader(job.results(), compact=True):
+            if not isinstance(row, results.Message):
+                print row['count'], row.fields
+    """
+    __slots__ = ()
+    fields = ()
+    _index = {}
+
+    def __getitem__(self, key):
+        value = tuple.__getitem__(self, self._index[key])
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def get(self, key, default=None):
+        i = self._index.get(key)
+        if i is None:
+            return default
+        value = tuple.__getitem__(self, i)
+        return default if value is None else value
+
+    def __contains__(self, key):
+        i = self._index.get(key)
+        return i is not None and tuple.__getitem__(self, i) is not None
+
+    has_key = __contains__
+
+    def __iter__(self):
+        return self.iterkeys()
+
+    def __len__(self):
+        return sum(1 for value in tuple.__iter__(self) if value is not None)
+
+    def iteritems(self):
+        for key, value in izip(self.fields, tuple.__iter__(self)):
+            if value is not None:
+                yield key, value
+
+    def iterkeys(self):
+        for key, value in self.iteritems():
+            yield key
+
+    def itervalues(self):
+        for key, value in self.iteritems():
+            yield value
+
+    def items(self):
+        return list(self.iteritems())
+
+    def keys(self):
+        return list(self.iterkeys())
+
+    def values(self):
+        return list(self.itervalues())
+
+    def _asdict(self):
+        """Returns the fields of this row as an ``OrderedDict``."""
+        return OrderedDict(self.iteritems())
+
+    def __eq__(self, other):
+        if isinstance(other, (dict, Row)):
+            return dict(self.iteritems()) == dict(other.iteritems())
+        return NotImplemented
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    __hash__ = None
+
+    def __repr__(self):
+        return "Row(%r)" % dict(self.iteritems())
+
+    def __reduce__(self):
+        return (_row, (self.fields, tuple(tuple.__iter__(self))))
+
+collections.Mapping.register(Row)
+
+# The subclasses of Row by their fields, shared by all the readers.
+_row_types = weakref.WeakValueDictionary()
+
+def _row_type(fields):
+    row_type = _row_types.get(fields)
+    if row_type is None:
+        row_type = type("Row", (Row,), {
+            '__slots__': (),
+            'fields': fields,
+            '_index': dict((k, i) for i, k in enumerate(fields))})
+        _row_types[fields] = row_type
+    return row_type
+
+def _row(fields, values):
+    return _row_type(fields)(values)
 
 class ResultsReader(object):
     """This class returns dictionaries and Splunk messages from an XML results
@@ -160,8 +326,17 @@ class ResultsReader(object):
     This function has no network activity other than what is implicit in the
     stream it operates on.
 
+    With ``compact=True``, results are returned as :class:`Row` objects
+    instead of dictionaries. The field names of the rows are read once, from
+    the ``<meta>`` header of the stream or else from the first result, and
+    shared by all the rows with the same fields, which makes each row take a
+    fraction of the memory of a ``dict``. Use this for large result sets
+    that are kept in memory.
+
     :param `stream`: The stream to read from (any object that supports
         ``.read()``).
+    :param `compact`: Whether to return results as :class:`Row` objects.
+    :type compact: ``boolean``
 
     **Example**::
 
@@ -183,7 +358,7 @@ class ResultsReader(object):
     # except that you cannot get the current generator inside the
     # function creating that generator. Thus it's all wrapped up for
     # the sake of one field.
-    def __init__(self, stream):
+    def __init__(self, stream, compact=False):
         # The search/jobs/exports endpoint, when run with
         # earliest_time=rt and latest_time=rt streams a sequence of
         # XML documents, each containing a result, as opposed to one
@@ -196,6 +371,7 @@ class ResultsReader(object):
         stream = _XMLDTDFilter(stream)
         stream = _ConcatenatedStream(StringIO("<doc>"), stream, StringIO("</doc>"))
         self.is_preview = None
+        self._compact = compact
         self._gen = self._parse_results(stream)
 
     def __iter__(self):
@@ -208,6 +384,11 @@ class ResultsReader(object):
         """Parse results and messages out of *stream*."""
         result = None
         values = None
+        names = {} # Each field name, encoded once
+        # In compact mode, the fields of the <meta> header, and the type of
+        # the rows.
+        field_order = None
+        row_type = None
         try:
             for event, elem in et.iterparse(stream, events=('start', 'end')):
                 if elem.tag == 'results' and event == 'start':
@@ -219,12 +400,26 @@ class ResultsReader(object):
                     self.is_preview = is_preview
                 if elem.tag == 'result':
                     if event == 'start':
-                        result = OrderedDict()
+                        result = [] if self._compact else OrderedDict()
                     elif event == 'end':
+                        if self._compact:
+                            row_type = self._fit(row_type, result)
+                            row = [None] * len(row_type.fields)
+                            index = row_type._index
+                            for field_name, value in result:
+                                row[index[field_name]] = value
+                            result = row_type(row)
                         yield result
                         result = None
                         elem.clear()
 
+                elif elem.tag == 'fieldOrder' and self._compact:
+                    if event == 'start':
+                        field_order = []
+                    elif event == 'end':
+                        row_type = _row_type(tuple(field_order))
+                        field_order = None
+
                 elif elem.tag == 'field' and result is not None:
                     # We need the 'result is not None' check because
                     # 'field' is also the element name in the <meta>
@@ -233,11 +428,15 @@ class ResultsReader(object):
                     if event == 'start':
                         values = []
                     elif event == 'end':
-                        field_name = elem.attrib['k'].encode('utf8')
-                        if len(values) == 1:
-                            result[field_name] = values[0]
+                        k = elem.attrib['k']
+                        field_name = names.get(k)
+                        if field_name is None:
+                            field_name = names[k] = _utf8(k)
+                        value = values[0] if len(values) == 1 else values
+                        if self._compact:
+                            result.append((field_name, value))
                         else:
-                            result[field_name] = values
+                            result[field_name] = value
                         # Calling .clear() is necessary to let the
                         # element be garbage collected. Otherwise
                         # arbitrarily large results sets will use
@@ -245,9 +444,13 @@ class ResultsReader(object):
                         # streaming.
                         elem.clear()
 
+                elif elem.tag == 'field' and field_order is not None:
+                    if event == 'end':
+                        field_order.append(_utf8(elem.text or ""))
+
                 elif elem.tag in ('text', 'v') and event == 'end':
                     text = "".join(elem.itertext())
-                    values.append(text.encode('utf8'))
+                    values.append(_utf8(text))
                     elem.clear()
 
                 elif elem.tag == 'msg':
@@ -265,6 +468,394 @@ class ResultsReader(object):
             else:
                 raise
 
+    def _fit(self, row_type, fields):
+        # Returns the type of row for the (name, value) pairs in *fields*:
+        # *row_type*, or the type with the fields it is missing added.
+        if row_type is None:
+            return _row_type(tuple(name for name, value in fields))
+        missing = [name for name, value in fields if name not in row_type._index]
+        if missing:
+            return _row_type(row_type.fields + tuple(missing))
+        return row_type
+
+
+def _encode(value):
+    # The XML reader returns UTF-8 encoded strings, so the JSON reader does
+    # too.
+    if isinstance(value, unicode):
+        return value.encode('utf8')
+    if isinstance(value, list):
+        return [_encode(x) for x in value]
+    return value
+
+def _reader(stream):
+    """Returns the function to read at most a given number of characters from
+    *stream*: its ``read1`` if it has one, which returns the characters that
+    have arrived rather than waiting for that many, or else its ``read``."""
+    return getattr(stream, 'read1', stream.read)
+
+def _iter_json(stream, chunk_size):
+    """Yields the JSON documents in *stream*, which may be one document or a
+    sequence of concatenated documents as returned by realtime exports."""
+    read = _reader(stream)
+    try:
+        decoder = json.JSONDecoder(object_pairs_hook=OrderedDict)
+    except TypeError: # Python 2.6
+        decoder = json.JSONDecoder()
+    whitespace = re.compile(r'\s*')
+    text = ""
+    chunks = []
+    size = 0
+    eof = False
+    while not eof:
+        chunk = read(chunk_size)
+        if chunk == "":
+            eof = True
+        else:
+            chunks.append(chunk)
+            size += len(chunk)
+        # Retry an incomplete document once the chunk may end one (it has a
+        # newline or a closing brace), or else only once the text has
+        # doubled, so that decoding a large document takes linear time.
+        if not eof and size < len(text) and '\n' not in chunk and '}' not in chunk:
+            continue
+        text = text + "".join(chunks)
+        chunks, size = [], 0
+        pos = 0
+        while True:
+            pos = whitespace.match(text, pos).end()
+            if pos == len(text):
+                break
+            try:
+                document, pos = decoder.raw_decode(text, pos)
+            except ValueError:
+                if eof:
+                    raise
+                break
+            yield document
+        text = text[pos:]
+
+class JSONResultsReader(object):
+    """This class returns dictionaries and Splunk messages from a JSON results
+    stream, as returned for ``output_mode="json"``.
+
+    ``JSONResultsReader`` behaves exactly like :class:`ResultsReader`: it is
+    iterable, returns a ``dict`` for results or a :class:`Message` object for
+    Splunk messages, and has an ``is_preview`` field. It reads both the single
+    document returned by the results endpoints and the sequence of
+    concatenated documents streamed by ``search/jobs/export``. The
+    ``json_rows`` layout is supported as well.
+
+    :param `stream`: The stream to read from (any object that supports
+        ``.read()``).
+    :param `chunk_size`: The most characters to read from *stream* at a
+        time. If *stream* has a ``read1`` method, as a
+        :class:`splunklib.binding.ResponseReader` does, the characters that
+        have arrived are read without waiting for more, so results of a
+        stream are returned as soon as they arrive.
+
+    **Example**::
+
+        import results
+        response = job.results(output_mode="json")
+        for result in results.JSONResultsReader(response):
+            print result
+    """
+    def __init__(self, stream, chunk_size=64*1024):
+        self.is_preview = None
+        self._gen = self._parse_results(_iter_json(stream, chunk_size))
 
+    def __iter__(self):
+        return self
 
+    def next(self):
+        return self._gen.next()
 
+    def _parse_results(self, documents):
+        """Parse results and messages out of *documents*."""
+        for document in documents:
+            if 'preview' in document:
+                self.is_preview = bool(document['preview'])
+            for message in document.get('messages', ()):
+                yield Message(_encode(message.get('type')),
+                              _encode(message.get('text', "")))
+            if 'result' in document:
+                yield self._result(document['result'])
+            for result in document.get('results', ()):
+                yield self._result(result)
+            if 'rows' in document:
+                fields = [_encode(f['name'] if isinstance(f, dict) else f)
+                          for f in document.get('fields', ())]
+                for row in document['rows']:
+                    yield OrderedDict((k, _encode(v))
+                                      for k, v in zip(fields, row)
+                                      if v is not None)
+
+    def _result(self, result):
+        return OrderedDict((_encode(k), _encode(v))
+                           for k, v in result.iteritems())
+
+def _iter_lines(stream, chunk_size):
+    """Yields the lines of *stream*, with their line endings."""
+    read = _reader(stream)
+    pending = ""
+    while True:
+        chunk = read(chunk_size)
+        if chunk == "":
+            break
+        lines = (pending + chunk).splitlines(True)
+        # The last line continues in the next chunk, unless it is complete
+        # and cannot be the '\r' of a '\r\n' split between chunks.
+        pending = lines.pop() if not lines[-1].endswith("\n") else ""
+        for line in lines:
+            yield line
+    if pending:
+        yield pending
+
+class CSVResultsReader(object):
+    """This class returns dictionaries from a CSV results stream, as returned
+    for ``output_mode="csv"``.
+
+    ``CSVResultsReader`` is iterable and returns a ``dict`` for each row. The
+    first row of the stream gives the field names, which are also available
+    in the ``fields`` field. Fields that are empty in a row are left out of
+    its ``dict``. CSV has no room for Splunk messages or for the preview flag,
+    so no :class:`Message` objects are returned and ``is_preview`` is always
+    ``None``. The values of multivalue fields are returned as one string
+    with the values separated by newlines.
+
+    :param `stream`: The stream to read from (any object that supports
+        ``.read()``).
+    :param `chunk_size`: The most characters to read from *stream* at a
+        time. If *stream* has a ``read1`` method, as a
+        :class:`splunklib.binding.ResponseReader` does, the characters that
+        have arrived are read without waiting for more, so results of a
+        stream are returned as soon as they arrive.
+    """
+    def __init__(self, stream, chunk_size=64*1024):
+        self.is_preview = None
+        self.fields = None
+        self._gen = self._parse_results(csv.reader(_iter_lines(stream, chunk_size)))
+
+    def __iter__(self):
+        return self
+
+    def next(self):
+        return self._gen.next()
+
+    def _parse_results(self, rows):
+        """Parse results out of the rows returned by a ``csv.reader``."""
+        for row in rows:
+            if len(row) == 0:
+                continue
+            if self.fields is None:
+                self.fields = row
+                continue
+            yield OrderedDict((k, v) for k, v in zip(self.fields, row) if v != "")
+
+_READERS = {
+    'application/json': JSONResultsReader,
+    'text/json': JSONResultsReader,
+    'text/csv': CSVResultsReader,
+    'application/xml': ResultsReader,
+    'text/xml': ResultsReader
+}
+
+def _content_type(response):
+    # Accepts a response from binding.Context, a ResponseReader, or an
+    # httplib.HTTPResponse.
+    headers = response.get('headers') if isinstance(response, dict) else None
+    if headers is not None:
+        for key, value in headers:
+            if key.lower() == 'content-type':
+                return value
+        return None
+    getheader = getattr(response, 'getheader', None)
+    return getheader('content-type') if getheader is not None else None
+
+def reader_for(response):
+    """Returns the results reader for a search results response.
+
+    The reader is picked by the content type of *response*: a
+    :class:`JSONResultsReader` for ``output_mode="json"``, a
+    :class:`CSVResultsReader` for ``output_mode="csv"``, and a
+    :class:`ResultsReader` otherwise. If the response does not say what its
+    content type is, the reader is picked by the first character of the body.
+
+    :param `response`: A response returned by
+        :meth:`splunklib.binding.Context.get` and the like, or the body of one
+        (a :class:`splunklib.binding.ResponseReader`, such as the return
+        value of :meth:`splunklib.client.Job.results`).
+    """
+    reader, body = _reader_type(response)
+    return reader(body)
+
+def _reader_type(response):
+    # Returns the class of the reader for *response*, and the body to read.
+    body = response['body'] if isinstance(response, dict) else response
+    content_type = _content_type(response)
+    if content_type is not None:
+        mimetype = content_type.split(';')[0].strip().lower()
+        if mimetype in _READERS:
+            return _READERS[mimetype], body
+    peek = getattr(body, 'peek', None)
+    if peek is not None:
+        start = peek(256).lstrip()[:1]
+        if start in ('{', '['):
+            return JSONResultsReader, body
+        if start not in ('', '<'):
+            return CSVResultsReader, body
+    return ResultsReader, body
+
+def _optional(name):
+    # Returns the module *name*, or None if it is not installed.
+    try:
+        return __import__(name)
+    except ImportError:
+        return None
+
+# The types inferred for columns, from the narrowest to the widest.
+_INT, _FLOAT, _OBJECT = 'int', 'float', 'object'
+
+def _infer(values, kind):
+    # Returns the narrowest type, no narrower than *kind*, that holds all of
+    # *values*. Multivalue fields are objects.
+    for value in values:
+        if kind == _OBJECT:
+            break
+        if value is None:
+            continue
+        if isinstance(value, list):
+            return _OBJECT
+        if kind == _INT:
+            try:
+                if not isinstance(value, float) and -2**63 <= int(value) < 2**63:
+                    continue
+            except ValueError:
+                pass
+            kind = _FLOAT
+        try:
+            float(value)
+        except ValueError:
+            kind = _OBJECT
+    return kind
+
+def _column(name, values, dtype, kinds, numpy):
+    # Converts the values of the field *name* in one batch into a column,
+    # of *dtype* or else of the type inferred for the field so far.
+    if dtype is None:
+        kind = kinds[name] = _infer(values, kinds.get(name, _INT))
+        if kind == _OBJECT:
+            dtype = object
+        elif kind == _FLOAT or (numpy is not None and None in values):
+            dtype = float # NaN stands for the missing values
+        else:
+            dtype = int
+    if numpy is None:
+        if dtype is object:
+            return values
+        return [None if value is None else dtype(value) for value in values]
+    dtype = numpy.dtype(dtype)
+    if dtype.kind == 'O':
+        column = numpy.empty(len(values), dtype=object)
+        for i, value in enumerate(values):
+            column[i] = value
+        return column
+    if dtype.kind in 'fc':
+        nan = float('nan')
+        values = [nan if value is None else value for value in values]
+    elif dtype.kind in 'SU':
+        values = ["" if value is None else value for value in values]
+    elif None in values:
+        raise ValueError("Field %s is missing from some results, which a "
+                         "column of %s cannot hold." % (name, dtype))
+    elif dtype.kind in 'iub':
+        values = [int(value) for value in values]
+    return numpy.array(values, dtype=dtype)
+
+def read_columnar(response, batch_size=10000, dtypes=None, frame=None):
+    """Returns the search results in a response as batches of columns.
+
+    The results are read with the reader that :func:`reader_for` picks for
+    *response*, and split into batches of at most *batch_size* results. Each
+    batch is returned as an ``OrderedDict`` that maps the name of each field
+    to a column, which has one value for each result in the batch. Splunk
+    messages are skipped.
+
+    If NumPy is installed, each column is a NumPy array. Unless *dtypes*
+    gives the type of a field, the narrowest of integer, float, and object
+    that holds all of its values so far is used. Values of fields that are
+    missing from a result are NaN in float columns, and ``None`` in object
+    columns, so an integer field that is missing from some results is read
+    as float. Missing values are empty in string columns, and cannot be held
+    in integer columns. Multivalue fields are object columns, whose values
+    are lists.
+    If NumPy is not installed, each column is a ``list`` of values converted
+    in the same way, with ``None`` for missing values.
+
+    If pandas is installed, each batch is returned as a ``DataFrame`` of the
+    columns instead, unless *frame* is ``False``.
+
+    This function has no network activity other than what is implicit in
+    reading the body of *response*.
+
+    :param `response`: A response, or the body of one, as accepted by
+        :func:`reader_for`.
+    :param `batch_size`: The largest number of results in a batch.
+    :type batch_size: ``integer``
+    :param `dtypes`: The types of fields, by name, as accepted by
+        ``numpy.dtype``. Without NumPy, a function such as ``int`` or
+        ``float`` that converts a value, or ``object`` to keep it as it is.
+    :type dtypes: ``dict``
+    :param `frame`: Whether to return ``DataFrame`` objects. The default is
+        to return them if pandas is installed.
+    :type frame: ``boolean``
+    :return: An iterator over ``OrderedDict`` or ``DataFrame`` objects.
+
+    **Example**::
+
+        import results
+        response = job.results(count=0)
+        for batch in results.read_columnar(response, dtypes={'bytes': 'int64'}):
+            print batch['bytes'].sum()
+    """
+    numpy = _optional('numpy')
+    pandas = _optional('pandas') if frame or frame is None else None
+    if frame and pandas is None:
+        raise ImportError("No module named pandas")
+    dtypes = dtypes or {}
+    kinds = {}
+    reader_type, body = _reader_type(response)
+    if reader_type is ResultsReader:
+        reader = ResultsReader(body, compact=True)
+    else:
+        reader = reader_type(body)
+
+    def batch(columns):
+        columns = OrderedDict(
+            (name, _column(name, values, dtypes.get(name), kinds, numpy))
+            for name, values in columns.iteritems())
+        if pandas is None:
+            return columns
+        return pandas.DataFrame(columns, columns=list(columns))
+
+    columns = OrderedDict()
+    count = 0
+    for result in reader:
+        if isinstance(result, Message):
+            continue
+        for name, value in result.iteritems():
+            values = columns.get(name)
+            if values is None:
+                values = columns[name] = [None] * count
+            values.append(value)
+        count += 1
+        for values in columns.itervalues():
+            if len(values) < count:
+                values.append(None)
+        if count == batch_size:
+            yield batch(columns)
+            columns = OrderedDict()
+            count = 0
+    if count > 0:
+        yield batch(columns)
@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+#
+# Copyright 2011-2014 Splunk, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"): you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Measures the throughput of splunklib.data on Atom feeds.
+
+The entries of the feeds in data/services.xml and data/services.server.info.xml
+are repeated until the feed is about --size megabytes, and then the entries
+are read with data.load as it was with the pure Python ElementTree, with
+data.load as it is now, and with data.iterload, which holds only one entry
+in memory at a time.
+
+Run it from the tests directory:
+
+    python benchmark_data.py [--size MB] [--repeat N]
+"""
+
+from optparse import OptionParser
+import os
+import sys
+import time
+import xml.etree.ElementTree
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from splunklib import data
+
+ENTRY = "{http://www.w3.org/2005/Atom}entry"
+
+
+def entries(name):
+    path = os.path.join(os.path.dirname(__file__), "data", name)
+    with open(path) as f:
+        document = f.read()
+    # Both fixtures use the ns0 prefix for the Atom namespace.
+    start = document.index("<ns0:entry>")
+    end = document.rindex("</ns0:entry>") + len("</ns0:entry>")
+    return document, start, end
+
+
+def fixture(megabytes):
+    document, start, end = entries("services.xml")
+    info, info_start, info_end = entries("services.server.info.xml")
+    body = document[start:end] + info[info_start:info_end]
+    count = max(1, int(megabytes * 1024 * 1024 / len(body)))
+    return document[:start] + body * count + document[end:]
+
+
+def load_python(text):
+    # data.load as it was before it used cElementTree.
+    original = data.XML
+    data.XML = xml.etree.ElementTree.XML
+    try:
+        return data.load(text).feed.entry
+    finally:
+        data.XML = original
+
+
+def main(argv):
+    parser = OptionParser(usage="%prog [--size MB] [--repeat N]")
+    parser.add_option("--size", type="float", default=4,
+                      help="Size of the feed in megabytes (default 4)")
+    parser.add_option("--repeat", type="int", default=3,
+                      help="Number of runs to take the best of (default 3)")
+    opts, _ = parser.parse_args(argv)
+
+    text = fixture(opts.size)
+    megabytes = len(text) / (1024.0 * 1024)
+    timings = {}
+    for name, read in (("load (python)", load_python),
+                       ("load", lambda text: data.load(text).feed.entry),
+                       ("iterload", lambda text: data.iterload(text, ENTRY))):
+        best = None
+        for _ in range(opts.repeat):
+            start = time.time()
+            count = sum(1 for _ in read(text))
+            elapsed = time.time() - start
+            best = elapsed if best is None else min(best, elapsed)
+        timings[name] = best
+        print "%-15s %8d items %8.3f s %8.2f MB/s" % (
+            name, count, best, megabytes / best)
+    print "speedup: %.1fx (load), %.1fx (iterload)" % (
+        timings["load (python)"] / timings["load"],
+        timings["load (python)"] / timings["iterload"])
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
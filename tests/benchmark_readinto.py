@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+#
+# Copyright 2011-2014 Splunk, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"): you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Measures the throughput of reading a response body with
+splunklib.binding.ResponseReader, with read, with readinto and a reused
+buffer, and through an io.BufferedReader.
+
+A body of --size megabytes is served by a StubSplunkd on the loopback
+interface and read in chunks of --chunk kilobytes.
+
+Run it from the tests directory:
+
+    python benchmark_readinto.py [--size MB] [--chunk KB] [--repeat N]
+"""
+
+from optparse import OptionParser
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from splunklib import binding
+import testlib
+
+
+def read(body, chunk):
+    count = 0
+    while True:
+        data = body.read(chunk)
+        if data == "":
+            return count
+        count += len(data)
+
+
+def readinto(body, chunk):
+    buffer = bytearray(chunk)
+    count = 0
+    while True:
+        n = body.readinto(buffer)
+        if n == 0:
+            return count
+        count += n
+
+
+def buffered(body, chunk):
+    return read(io.BufferedReader(body, chunk), chunk)
+
+
+def main(argv):
+    parser = OptionParser(usage="%prog [--size MB] [--chunk KB] [--repeat N]")
+    parser.add_option("--size", type="float", default=64,
+                      help="Size of the body in megabytes (default 64)")
+    parser.add_option("--chunk", type="int", default=64,
+                      help="Size of each read in kilobytes (default 64)")
+    parser.add_option("--repeat", type="int", default=5,
+                      help="Number of runs to take the best of (default 5)")
+    opts, _ = parser.parse_args(argv)
+
+    body = "x" * int(opts.size * 1024 * 1024)
+    chunk = opts.chunk * 1024
+    megabytes = len(body) / (1024.0 * 1024)
+    with testlib.StubSplunkd() as stub:
+        stub.route("GET", "/services/body", body=body)
+        pool = binding.pooled_handler()
+        context = binding.Context(handler=pool, **stub.context_kwargs())
+        timings = {}
+        for name, consume in (("read", read), ("readinto", readinto),
+                              ("buffered", buffered)):
+            best = None
+            for _ in range(opts.repeat):
+                response = context.get("/services/body")
+                start = time.time()
+                count = consume(response.body, chunk)
+                elapsed = time.time() - start
+                assert count == len(body)
+                best = elapsed if best is None else min(best, elapsed)
+            timings[name] = best
+            print "%-10s %8.3f s %8.1f MB/s" % (name, best, megabytes / best)
+        pool.close()
+    print "speedup: %.2fx (readinto), %.2fx (buffered)" % (
+        timings["read"] / timings["readinto"],
+        timings["read"] / timings["buffered"])
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
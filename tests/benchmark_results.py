@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+#
+# Copyright 2011-2014 Splunk, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"): you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Measures the throughput of splunklib.results.ResultsReader.
+
+The realtime export fixture in data/streaming_results.xml is repeated until
+it is about --size megabytes, and then read by ResultsReader as it is now and
+as it was with the former byte-at-a-time DTD filter.
+
+Run it from the tests directory:
+
+    python benchmark_results.py [--size MB] [--repeat N]
+"""
+
+from optparse import OptionParser
+from StringIO import StringIO
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from splunklib import results
+
+
+class ByteAtATimeDTDFilter(object):
+    # The DTD filter used by ResultsReader until it was made to read blocks.
+    def __init__(self, stream):
+        self.stream = stream
+
+    def read(self, n=None):
+        response = ""
+        while n is None or n > 0:
+            c = self.stream.read(1)
+            if c == "":
+                break
+            elif c == "<":
+                c += self.stream.read(1)
+                if c == "<?":
+                    while True:
+                        q = self.stream.read(1)
+                        if q == ">":
+                            break
+                else:
+                    response += c
+                    if n is not None:
+                        n -= len(c)
+            else:
+                response += c
+                if n is not None:
+                    n -= 1
+        return response
+
+
+def fixture(megabytes):
+    path = os.path.join(os.path.dirname(__file__), "data", "streaming_results.xml")
+    with open(path) as f:
+        # Every document of a realtime export starts with an XML declaration.
+        document = "<?xml version='1.0' encoding='UTF-8'?>\n" + f.read()
+    return document * max(1, int(megabytes * 1024 * 1024 / len(document)))
+
+
+def read_all(text, dtd_filter):
+    original = results._XMLDTDFilter
+    results._XMLDTDFilter = dtd_filter
+    try:
+        start = time.time()
+        count = sum(1 for _ in results.ResultsReader(StringIO(text)))
+        return count, time.time() - start
+    finally:
+        results._XMLDTDFilter = original
+
+
+def main(argv):
+    parser = OptionParser(usage="%prog [--size MB] [--repeat N]")
+    parser.add_option("--size", type="float", default=4,
+                      help="Size of the result stream in megabytes (default 4)")
+    parser.add_option("--repeat", type="int", default=3,
+                      help="Number of runs to take the best of (default 3)")
+    opts, _ = parser.parse_args(argv)
+
+    text = fixture(opts.size)
+    megabytes = len(text) / (1024.0 * 1024)
+    timings = {}
+    for name, dtd_filter in (("byte-at-a-time", ByteAtATimeDTDFilter),
+                             ("chunked", results._XMLDTDFilter)):
+        best = None
+        for _ in range(opts.repeat):
+            count, elapsed = read_all(text, dtd_filter)
+            best = elapsed if best is None else min(best, elapsed)
+        timings[name] = best
+        print "%-15s %8d items %8.3f s %8.2f MB/s" % (
+            name, count, best, megabytes / best)
+    print "speedup: %.1fx" % (timings["byte-at-a-time"] / timings["chunked"])
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
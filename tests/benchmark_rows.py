@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+#
+# Copyright 2011-2014 Splunk, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"): you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Measures the memory taken by the results read by
+splunklib.results.ResultsReader, as dictionaries and as compact rows.
+
+A results document of --rows events with the usual fields is read into a
+list, and the objects reachable from the list are added up.
+
+Run it from the tests directory:
+
+    python benchmark_rows.py [--rows N]
+"""
+
+from optparse import OptionParser
+from StringIO import StringIO
+import gc
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from splunklib import results
+
+FIELDS = ("_time", "host", "source", "sourcetype", "index", "splunk_server",
+          "linecount", "_raw")
+
+
+def fixture(rows):
+    parts = ["<?xml version='1.0' encoding='UTF-8'?>\n<results preview='0'>\n"
+             "<meta><fieldOrder>"]
+    parts.extend("<field>%s</field>" % name for name in FIELDS)
+    parts.append("</fieldOrder></meta>\n")
+    for i in range(rows):
+        values = ("2014-01-01T00:00:%02d.000+00:00" % (i % 60), "web-%d" % (i % 8),
+                  "/var/log/access.log", "access_combined", "main", "idx-1",
+                  "1", "10.0.0.%d - - GET /page/%d HTTP/1.1 200" % (i % 256, i))
+        parts.append("<result offset='%d'>" % i)
+        parts.extend("<field k='%s'><value><text>%s</text></value></field>" % kv
+                     for kv in zip(FIELDS, values))
+        parts.append("</result>\n")
+    parts.append("</results>\n")
+    return "".join(parts)
+
+
+def deep_size(root):
+    # The size of everything reachable from root, counting shared objects
+    # (such as the field names) once, and not counting types.
+    seen = set()
+    size = 0
+    pending = [root]
+    while pending:
+        obj = pending.pop()
+        if id(obj) in seen or isinstance(obj, type):
+            continue
+        seen.add(id(obj))
+        size += sys.getsizeof(obj)
+        pending.extend(gc.get_referents(obj))
+    return size
+
+
+def main(argv):
+    parser = OptionParser(usage="%prog [--rows N]")
+    parser.add_option("--rows", type="int", default=100000,
+                      help="Number of results to read (default 100000)")
+    opts, _ = parser.parse_args(argv)
+
+    text = fixture(opts.rows)
+    sizes = {}
+    for name, compact in (("dict", False), ("compact", True)):
+        start = time.time()
+        rows = list(results.ResultsReader(StringIO(text), compact=compact))
+        elapsed = time.time() - start
+        sizes[name] = deep_size(rows) / float(len(rows))
+        print "%-10s %8d rows %8.3f s %8d bytes/row" % (
+            name, len(rows), elapsed, sizes[name])
+        del rows
+    print "memory: %.1fx smaller" % (sizes["dict"] / sizes["compact"])
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
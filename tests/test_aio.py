@@ -0,0 +1,195 @@
+#!/usr/bin/env python
+#
+# Copyright 2011-2014 Splunk, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"): you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import threading
+import time
+import unittest
+
+from testlib import atom_entry, atom_feed, StubSplunkd
+
+import splunklib.aio as aio
+import splunklib.binding as binding
+import splunklib.results as results
+
+RESULTS = """<?xml version='1.0' encoding='UTF-8'?>
+<results preview='0'>
+<meta><fieldOrder><field>count</field></fieldOrder></meta>
+<result offset='0'><field k='count'><value><text>42</text></value></field></result>
+</results>"""
+
+
+class TestFuture(unittest.TestCase):
+    def test_result(self):
+        with aio.WorkerPool(2) as pool:
+            self.assertEqual(pool.submit(lambda x, y: x + y, 1, y=2).result(), 3)
+
+    def test_exception(self):
+        def fail():
+            raise ValueError("boom")
+        with aio.WorkerPool(2) as pool:
+            future = pool.submit(fail)
+            self.assertRaises(ValueError, future.result)
+            self.assertTrue(isinstance(future.exception(), ValueError))
+
+    def test_timeout(self):
+        event = threading.Event()
+        with aio.WorkerPool(1) as pool:
+            future = pool.submit(event.wait)
+            self.assertRaises(aio.TimeoutError, future.result, 0.05)
+            self.assertFalse(future.done())
+            event.set()
+            future.result(5)
+            self.assertTrue(future.done())
+
+    def test_cancel(self):
+        started, event = threading.Event(), threading.Event()
+        def block():
+            started.set()
+            event.wait(5)
+        with aio.WorkerPool(1) as pool:
+            running = pool.submit(block)
+            waiting = pool.submit(lambda: 1)
+            started.wait(5)
+            self.assertTrue(waiting.cancel())
+            self.assertFalse(running.cancel())
+            event.set()
+            self.assertRaises(aio.CancelledError, waiting.result)
+            running.result(5)
+
+    def test_done_callback(self):
+        seen = []
+        with aio.WorkerPool(1) as pool:
+            future = pool.submit(lambda: 1)
+            future.result()
+            future.add_done_callback(seen.append)
+        self.assertEqual(seen, [future])
+
+
+class TestWorkerPool(unittest.TestCase):
+    def test_bounded_threads(self):
+        lock = threading.Lock()
+        state = {'active': 0, 'peak': 0}
+        def work(x):
+            with lock:
+                state['active'] += 1
+                state['peak'] = max(state['peak'], state['active'])
+            time.sleep(0.01)
+            with lock:
+                state['active'] -= 1
+            return x
+        with aio.WorkerPool(3) as pool:
+            self.assertEqual(aio.gather([pool.submit(work, i) for i in range(12)]),
+                             range(12))
+            self.assertTrue(len(pool._threads) <= 3)
+        self.assertTrue(state['peak'] <= 3)
+
+    def test_imap_ordered(self):
+        def work(x):
+            time.sleep(0.001 * (10 - x))
+            return x * x
+        with aio.WorkerPool(4) as pool:
+            self.assertEqual(list(pool.imap(work, range(10))),
+                             [x * x for x in range(10)])
+
+    def test_imap_unordered(self):
+        with aio.WorkerPool(4) as pool:
+            found = list(pool.imap(lambda x: x * x, range(10), ordered=False))
+        self.assertEqual(sorted(found), [x * x for x in range(10)])
+
+    def test_imap_window(self):
+        calls = []
+        with aio.WorkerPool(2) as pool:
+            it = pool.imap(calls.append, range(100), window=4)
+            it.next()
+            it.close()
+        self.assertTrue(len(calls) <= 4)
+
+    def test_as_completed(self):
+        event = threading.Event()
+        with aio.WorkerPool(2) as pool:
+            slow = pool.submit(event.wait, 5)
+            fast = pool.submit(lambda: "fast")
+            it = aio.as_completed([slow, fast])
+            self.assertTrue(it.next() is fast)
+            event.set()
+            self.assertTrue(it.next() is slow)
+
+    def test_shutdown(self):
+        pool = aio.WorkerPool(2)
+        pool.submit(lambda: None).result()
+        pool.shutdown()
+        self.assertRaises(RuntimeError, pool.submit, lambda: None)
+
+
+class TestAsyncService(unittest.TestCase):
+    def setUp(self):
+        self.splunkd = StubSplunkd().start()
+        self.splunkd.route("POST", "/services/auth/login",
+                           "<response><sessionKey>abc</sessionKey></response>")
+        self.splunkd.route("POST", "/services/search/jobs/",
+                           "<response><sid>123</sid></response>", status=201)
+        self.splunkd.route("GET", "/services/search/jobs/123/", atom_entry(
+            "search *", "/services/search/jobs/123",
+            {"sid": "123", "dispatchState": "DONE", "isDone": "1"}))
+        # Once refreshed, the job is in the namespace of its eai:acl.
+        self.splunkd.route("GET", "/servicesNS/nobody/search/search/jobs/123/results",
+                           RESULTS)
+        apps = atom_feed([
+            atom_entry(name, "/servicesNS/nobody/system/apps/local/" + name)
+            for name in ("search", "launcher")])
+        self.splunkd.route("GET", "/services/apps/local", apps)
+        self.splunkd.route("GET", "/services/apps/local/", apps)
+        self.service = aio.Service(workers=4,
+                                   **self.splunkd.context_kwargs(
+                                       username="admin", password="changeme"))
+
+    def tearDown(self):
+        self.service.close()
+        self.splunkd.stop()
+
+    def test_login(self):
+        self.assertTrue(self.service.login().result(5) is self.service)
+        self.assertEqual(self.service.token, "Splunk abc")
+
+    def test_concurrent_requests_share_connections(self):
+        self.service.login().result(5)
+        found = aio.gather([self.service.apps.list() for _ in range(20)], 5)
+        self.assertEqual([len(apps) for apps in found], [2] * 20)
+        self.assertTrue(self.splunkd.connections <= 4)
+
+    def test_collection(self):
+        self.service.login().result(5)
+        apps = self.service.apps.list().result(5)
+        self.assertEqual(sorted(app.name for app in apps), ["launcher", "search"])
+        self.assertEqual(len(self.service.apps.iter().result(5)), 2)
+
+    def test_jobs(self):
+        self.service.login().result(5)
+        job = self.service.jobs.create("search *").result(5)
+        self.assertTrue(isinstance(job, aio.Job))
+        self.assertEqual(job.sid, "123")
+        self.assertTrue(job.is_done().result(5))
+        rows = list(results.ResultsReader(job.results().result(5)))
+        self.assertEqual(rows, [{"count": "42"}])
+
+    def test_errors(self):
+        self.service.login().result(5)
+        future = self.service.get("no/such/endpoint")
+        self.assertRaises(binding.HTTPError, future.result, 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
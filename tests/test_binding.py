@@ -15,17 +15,25 @@
 # under the License.
 
 
+import httplib
+import io
 import uuid
 import urllib2
 from StringIO import StringIO
 from xml.etree.ElementTree import XML
 
 import logging
+import multiprocessing
+import os
+import shutil
+import tempfile
 import testlib
+import threading
 import unittest
 import socket
 import sys
 import ssl
+import zlib
 
 import splunklib.binding as binding
 from splunklib.binding import HTTPError, AuthenticationError, UrlEncoded
@@ -471,6 +479,397 @@ class TestPluggableHTTP(testlib.SDKTestCase):
                 body = context.get(path).body.read()
                 self.assertTrue(isatom(body))
 
+class TestConnectionPool(unittest.TestCase):
+    def setUp(self):
+        self.stub = testlib.StubSplunkd().start()
+        self.stub.route('GET', '/services/server/info', body='<feed/>')
+        self.stub.route('GET', '/services/empty', status=204, body='')
+        self.pool = binding.pooled_handler(pool_size=2, idle_timeout=60)
+        self.context = binding.Context(handler=self.pool,
+                                       **self.stub.context_kwargs())
+
+    def tearDown(self):
+        self.pool.close()
+        self.stub.stop()
+
+    def test_reuses_connection(self):
+        for _ in range(5):
+            body = self.context.get('/services/server/info').body.read()
+            self.assertEqual(body, '<feed/>')
+        self.assertEqual(self.stub.connections, 1)
+        self.assertEqual(self.pool.created, 1)
+        self.assertEqual(self.pool.reused, 4)
+
+    def test_empty_body_releases_connection(self):
+        self.context.get('/services/empty')
+        self.context.get('/services/empty')
+        self.assertEqual(self.stub.connections, 1)
+
+    def test_truncated_body_raises(self):
+        self.stub.route('GET', '/services/truncated', body='<feed>',
+                        headers=[('Content-Length', '100')])
+        body = self.context.get('/services/truncated').body
+        self.assertEqual(body.read(6), '<feed>')
+        self.assertRaises(httplib.IncompleteRead, body.read, 10)
+
+    def test_unread_response_is_not_reused(self):
+        first = self.context.get('/services/server/info')
+        self.context.get('/services/server/info').body.read()
+        self.assertEqual(self.stub.connections, 2)
+        first.body.close()
+        self.assertEqual(self.pool.idle, 1)
+
+    def test_errors_release_connection(self):
+        for _ in range(3):
+            self.assertRaises(HTTPError, self.context.get, '/services/nope')
+        self.assertEqual(self.stub.connections, 1)
+
+    def test_idle_timeout(self):
+        self.pool.idle_timeout = 0
+        self.context.get('/services/server/info').body.read()
+        self.context.get('/services/server/info').body.read()
+        self.assertEqual(self.stub.connections, 2)
+
+    def test_pool_size_bounds_idle_connections(self):
+        responses = [self.context.get('/services/server/info') for _ in range(4)]
+        for response in responses:
+            response.body.read()
+        self.assertEqual(self.pool.idle, 2)
+
+    def test_discards_dropped_connection(self):
+        self.context.get('/services/server/info').body.read()
+        # Simulate the server timing out the keep-alive connection.
+        self.stub.drop_connections()
+        body = self.context.get('/services/server/info').body.read()
+        self.assertEqual(body, '<feed/>')
+        self.assertEqual(self.stub.connections, 2)
+        self.assertEqual(self.pool.reused, 0)
+
+    def drop_unnoticed(self):
+        # The server closes the pooled connection, but the pool does not
+        # notice before it sends the next request on it.
+        self.context.get('/services/server/info').body.read()
+        self.stub.drop_connections()
+        is_dropped = binding._is_dropped
+        binding._is_dropped = lambda sock: False
+        self.addCleanup(setattr, binding, '_is_dropped', is_dropped)
+
+    def test_get_is_resent(self):
+        self.drop_unnoticed()
+        body = self.context.get('/services/server/info').body.read()
+        self.assertEqual(body, '<feed/>')
+        self.assertEqual(self.stub.connections, 2)
+
+    def test_post_is_not_resent(self):
+        self.stub.route('POST', '/services/thing', body='<response/>')
+        self.drop_unnoticed()
+        self.assertRaises((httplib.HTTPException, socket.error),
+                          self.context.post, '/services/thing', body='x')
+        self.assertEqual(self.stub.connections, 1)
+
+    def test_threads_share_pool(self):
+        import threading
+        bodies = []
+        def fetch():
+            for _ in range(10):
+                bodies.append(self.context.get('/services/server/info').body.read())
+        threads = [threading.Thread(target=fetch) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(bodies, ['<feed/>'] * 40)
+        self.assertTrue(self.stub.connections <= 4 + 2 * 4)
+
+def gzip(text):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return compressor.compress(text) + compressor.flush()
+
+def deflate(text, wbits=zlib.MAX_WBITS):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, wbits)
+    return compressor.compress(text) + compressor.flush()
+
+class TestCompression(unittest.TestCase):
+    feed = "<feed>%s</feed>" % "".join("<entry>%d</entry>" % n for n in range(20000))
+
+    def setUp(self):
+        self.stub = testlib.StubSplunkd().start()
+        self.stub.route('GET', '/services/feed', self.respond)
+        self.stub.route('POST', '/services/receivers/simple', body='<response/>')
+        self.encoding = 'gzip'
+
+    def tearDown(self):
+        self.stub.stop()
+
+    def respond(self, request):
+        accepted = request.headers.getheader('accept-encoding') or ''
+        if self.encoding not in accepted:
+            return 200, [], self.feed
+        body = {'gzip': gzip, 'deflate': deflate,
+                'raw': lambda text: deflate(text, -zlib.MAX_WBITS)}[self.mode](self.feed)
+        return 200, [('Content-Encoding', self.encoding)], body
+
+    @property
+    def mode(self):
+        return getattr(self, '_mode', self.encoding)
+
+    def context(self, handler):
+        return binding.Context(handler=handler, **self.stub.context_kwargs())
+
+    def test_gzip(self):
+        context = self.context(binding.pooled_handler())
+        self.assertEqual(context.get('/services/feed').body.read(), self.feed)
+        self.assertEqual(self.stub.requests[0].headers.getheader('accept-encoding'),
+                         'gzip, deflate')
+
+    def test_deflate(self):
+        self.encoding = 'deflate'
+        context = self.context(binding.pooled_handler())
+        self.assertEqual(context.get('/services/feed').body.read(), self.feed)
+        # Some servers send deflate without the zlib header.
+        self._mode = 'raw'
+        self.assertEqual(context.get('/services/feed').body.read(), self.feed)
+
+    def test_incremental(self):
+        pool = binding.pooled_handler()
+        context = self.context(pool)
+        body = context.get('/services/feed').body
+        self.assertEqual(body.peek(6), '<feed>')
+        chunks = []
+        while True:
+            chunk = body.read(1000)
+            if chunk == '':
+                break
+            self.assertTrue(len(chunk) == 1000 or body.empty)
+            chunks.append(chunk)
+        self.assertEqual(''.join(chunks), self.feed)
+        # Reading the body to the end released the connection.
+        self.assertEqual(pool.idle, 1)
+        context.get('/services/feed').body.read()
+        self.assertEqual(self.stub.connections, 1)
+
+    def test_uncompressed(self):
+        context = self.context(binding.pooled_handler(compress=False))
+        self.assertEqual(context.get('/services/feed').body.read(), self.feed)
+        # httplib itself asks for the identity encoding.
+        self.assertEqual(self.stub.requests[0].headers.getheader('accept-encoding'),
+                         'identity')
+
+    def test_compress_requests(self):
+        context = self.context(binding.pooled_handler(compress_requests=1024))
+        context.post('/services/receivers/simple', body='small')
+        context.post('/services/receivers/simple', body=self.feed)
+        small, large = self.stub.requests
+        self.assertEqual(small.body, 'small')
+        self.assertEqual(small.headers.getheader('content-encoding'), None)
+        self.assertEqual(large.headers.getheader('content-encoding'), 'gzip')
+        self.assertTrue(len(large.body) < len(self.feed))
+        self.assertEqual(zlib.decompress(large.body, 16 + zlib.MAX_WBITS), self.feed)
+
+class TestReadinto(unittest.TestCase):
+    body = "".join("%08d" % n for n in range(20000))
+
+    def setUp(self):
+        self.stub = testlib.StubSplunkd().start()
+        self.stub.route('GET', '/services/body', body=self.body)
+        self.stub.route('GET', '/services/truncated', body=self.body[:100],
+                        headers=[('Content-Length', str(len(self.body)))])
+        self.pool = binding.pooled_handler()
+        self.context = binding.Context(handler=self.pool,
+                                       **self.stub.context_kwargs())
+
+    def tearDown(self):
+        self.pool.close()
+        self.stub.stop()
+
+    def read_all(self, reader, size):
+        buffer = bytearray(size)
+        chunks = []
+        while True:
+            count = reader.readinto(buffer)
+            if count == 0:
+                return "".join(chunks)
+            chunks.append(str(buffer[:count]))
+
+    def test_readinto(self):
+        body = self.context.get('/services/body').body
+        self.assertEqual(self.read_all(body, 4096), self.body)
+        self.assertTrue(body.empty)
+        # Reading the body to the end released the connection.
+        self.assertEqual(self.pool.idle, 1)
+
+    def test_readinto_after_peek(self):
+        body = self.context.get('/services/body').body
+        self.assertEqual(body.peek(4), "0000")
+        self.assertEqual(body.peek(12), "000000000000")
+        self.assertEqual(body.read(2), "00")
+        self.assertEqual(self.read_all(body, 7), self.body[2:])
+
+    def test_readinto_plain_response(self):
+        connection = httplib.HTTPConnection(self.stub.host, self.stub.port)
+        connection.request("GET", "/services/body")
+        response = connection.getresponse()
+        view = memoryview(bytearray(1000))
+        self.assertEqual(binding._readinto(response, view), 1000)
+        self.assertEqual(view.tobytes(), self.body[:1000])
+        self.assertEqual(response.length, len(self.body) - 1000)
+        reader = binding.ResponseReader(response)
+        self.assertEqual(self.read_all(reader, 1 << 20), self.body[1000:])
+        self.assertTrue(response.isclosed())
+        connection.close()
+
+    def test_buffered_reader(self):
+        body = io.BufferedReader(self.context.get('/services/body').body, 1024)
+        self.assertEqual(body.peek(1)[:1], "0")
+        self.assertEqual(body.read(10), "0000000000")
+        self.assertEqual(body.read(), self.body[10:])
+        body.close()
+        self.assertTrue(body.closed)
+
+    def test_truncated(self):
+        body = self.context.get('/services/truncated').body
+        buffer = bytearray(len(self.body))
+        self.assertEqual(body.readinto(buffer), 100)
+        self.assertRaises(httplib.IncompleteRead, body.readinto, buffer)
+
+    def test_read1(self):
+        body = self.context.get('/services/body').body
+        self.assertEqual(body.peek(3), "000")
+        self.assertEqual(body.read1(5), "000")
+        chunks = []
+        while True:
+            chunk = body.read1(1 << 20)
+            if chunk == "":
+                break
+            chunks.append(chunk)
+        self.assertEqual("".join(chunks), self.body[3:])
+        self.assertEqual(self.pool.idle, 1)
+        body = self.context.get('/services/truncated').body
+        self.assertEqual(body.read1(len(self.body)), self.body[:100])
+        self.assertRaises(httplib.IncompleteRead, body.read1, len(self.body))
+
+    def test_read1_stream(self):
+        # read1 returns each chunk of a stream as it arrives.
+        arrived = threading.Event()
+        def stream():
+            yield "first"
+            arrived.wait(5)
+            yield "second"
+        self.stub.route('GET', '/services/stream', lambda request: (200, [], stream()))
+        body = self.context.get('/services/stream').body
+        self.assertEqual(body.read1(1000), "first")
+        arrived.set()
+        self.assertEqual(body.read1(1000), "second")
+        self.assertEqual(body.read1(1000), "")
+        self.assertEqual(self.pool.idle, 1)
+
+def session_worker(kwargs, store, barrier):
+    # Runs in another process: log in through the store and make a request.
+    barrier.wait()
+    context = binding.connect(session_store=store, handler=binding.pooled_handler(),
+                              **kwargs)
+    context.get('/services/thing').body.read()
+
+class TestSessionStore(unittest.TestCase):
+    def setUp(self):
+        self.stub = testlib.StubSplunkd().start()
+        self.logins = multiprocessing.Value('i', 0)
+        self.valid = multiprocessing.Value('i', 1) # The valid session, KEY-1
+        self.stub.route('POST', '/services/auth/login', self.login)
+        self.stub.route('GET', '/services/thing', self.thing)
+        self.directory = tempfile.mkdtemp()
+        self.kwargs = self.stub.context_kwargs(username='admin', password='changeme',
+                                               autologin=True)
+
+    def tearDown(self):
+        self.stub.stop()
+        shutil.rmtree(self.directory)
+
+    def login(self, request):
+        with self.logins.get_lock():
+            self.logins.value += 1
+            self.valid.value = self.logins.value
+        return 200, [], "<response><sessionKey>KEY-%d</sessionKey></response>" % self.valid.value
+
+    def thing(self, request):
+        if request.headers.getheader('authorization') != "Splunk KEY-%d" % self.valid.value:
+            return 401, [], ('<response><messages><msg type="WARN">call not properly '
+                             'authenticated</msg></messages></response>')
+        return 200, [], "<thing/>"
+
+    def connect(self, store):
+        return binding.connect(session_store=store, handler=binding.pooled_handler(),
+                               **self.kwargs)
+
+    def test_shared_login(self):
+        store = binding.SessionStore()
+        contexts = [self.connect(store) for _ in range(5)]
+        for context in contexts:
+            self.assertEqual(context.get('/services/thing').body.read(), "<thing/>")
+        self.assertEqual(self.logins.value, 1)
+        self.assertEqual((store.logins, store.avoided), (1, 4))
+        self.assertEqual(set(c.token for c in contexts), set(["Splunk KEY-1"]))
+
+    def test_expired_session(self):
+        store = binding.SessionStore()
+        contexts = [self.connect(store) for _ in range(5)]
+        self.valid.value = 0 # The session expires.
+        for context in contexts:
+            self.assertEqual(context.get('/services/thing').body.read(), "<thing/>")
+        # Only the first context to get a 401 logged in again.
+        self.assertEqual(self.logins.value, 2)
+        self.assertEqual((store.logins, store.avoided), (2, 8))
+
+    def test_threads(self):
+        store = binding.SessionStore()
+        errors = []
+        def work():
+            try:
+                self.connect(store).get('/services/thing').body.read()
+            except Exception as e:
+                errors.append(e)
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(self.logins.value, 1)
+
+    def test_file_store(self):
+        path = os.path.join(self.directory, "sessions")
+        first = self.connect(binding.FileSessionStore(path))
+        store = binding.FileSessionStore(path)
+        second = self.connect(store)
+        self.assertEqual(second.token, first.token)
+        self.assertTrue(isinstance(second.token, str))
+        self.assertEqual((store.logins, store.avoided), (0, 1))
+        self.assertEqual(self.logins.value, 1)
+        if os.name != 'nt':
+            self.assertEqual(os.stat(path).st_mode & 0777, 0600)
+
+    def test_file_store_malformed(self):
+        path = os.path.join(self.directory, "sessions")
+        with open(path, 'w') as f:
+            f.write("{")
+        self.connect(binding.FileSessionStore(path))
+        self.assertEqual(self.logins.value, 1)
+
+    @unittest.skipIf(os.name == 'nt', "forks worker processes")
+    def test_processes(self):
+        store = binding.FileSessionStore(os.path.join(self.directory, "sessions"))
+        barrier = multiprocessing.Event()
+        workers = [multiprocessing.Process(target=session_worker,
+                                           args=(self.kwargs, store, barrier))
+                   for _ in range(8)]
+        for worker in workers:
+            worker.start()
+        barrier.set()
+        for worker in workers:
+            worker.join()
+        self.assertEqual([w.exitcode for w in workers], [0] * 8)
+        self.assertEqual(self.logins.value, 1)
+
 class TestLogout(BindingTestCase):
     def test_logout(self):
         response = self.context.get("/services")
@@ -18,6 +18,9 @@ import testlib
 import logging
 
 from contextlib import contextmanager
+import threading
+import time
+import unittest
 
 import splunklib.client as client
 
@@ -257,6 +260,118 @@ class CollectionTestCase(testlib.SDKTestCase):
 
 
 
+class TestLazyCollection(testlib.StubServiceTestCase):
+    def setUp(self):
+        super(TestLazyCollection, self).setUp()
+        self.splunkd.route("GET", "/services/apps/local/", testlib.atom_feed([
+            testlib.atom_entry(name, "/servicesNS/nobody/system/apps/local/" + name,
+                               {"label": name.title(), "visible": "1"},
+                               {"owner": "nobody", "app": "system", "sharing": "system"})
+            for name in ("launcher", "search")]))
+        self.splunkd.route("GET", "/services/search/jobs/", testlib.atom_feed([
+            testlib.atom_entry("search *", "/services/search/jobs/1234.5",
+                               {"sid": "1234.5", "isDone": "1"})]))
+
+    def test_names_without_parsing(self):
+        apps = self.service.apps.list(lazy=True)
+        self.assertEqual([app.name for app in apps], ["launcher", "search"])
+        self.assertEqual([app.path for app in apps],
+                         [app.path for app in self.service.apps.list()])
+        self.assertTrue(all(app._state is None for app in apps))
+
+    def test_same_state_as_eager(self):
+        eager = self.service.apps.list()
+        lazy = list(self.service.apps.iter(lazy=True))
+        for e, l in zip(eager, lazy):
+            self.assertEqual(l.label, e.label)
+            self.assertEqual(l.content, e.content)
+            self.assertEqual(l.access, e.access)
+            self.assertEqual(l.fields, e.fields)
+            self.assertEqual(l.links, e.links)
+            self.assertEqual(l._proper_namespace(), ("nobody", "system", "system"))
+        # Lazy entities are parsed locally, without a round trip.
+        self.assertEqual(len(self.splunkd.requests), 2)
+
+    def test_jobs(self):
+        job, = self.service.jobs.list(lazy=True)
+        self.assertEqual(job.sid, "1234.5")
+        self.assertEqual(job.path, self.service.jobs.list()[0].path)
+        self.assertEqual(job["isDone"], "1")
+
+    def test_saved_search_alert_count(self):
+        self.splunkd.route("GET", "/services/saved/searches/", testlib.atom_feed([
+            testlib.atom_entry("errors", "/servicesNS/nobody/search/saved/searches/errors",
+                               {"search": "error", "triggered_alert_count": "3"})]))
+        ss, = self.service.saved_searches.iter(lazy=True)
+        self.assertEqual(ss.alert_count, 3)
+        self.assertEqual(ss.alert_count, self.service.saved_searches.list()[0].alert_count)
+
+    def test_stanza_len(self):
+        self.splunkd.route("GET", "/services/configs/conf-props/", testlib.atom_feed([
+            testlib.atom_entry("stanza", "/servicesNS/nobody/search/configs/conf-props/stanza",
+                               {"a": "1", "b": "2", "disabled": "0", "eai:appName": "search"})]))
+        conf = client.ConfigurationFile(self.service, client.PATH_CONF % "props",
+                                        state={"title": "props"})
+        stanza, = conf.iter(lazy=True)
+        self.assertEqual(len(stanza), 2)
+        self.assertEqual(len(stanza), len(conf.list()[0]))
+
+
+class TestConcurrentPager(testlib.StubServiceTestCase):
+    def setUp(self):
+        super(TestConcurrentPager, self).setUp()
+        self.splunkd.route("GET", "/services/apps/local/", self.page)
+        self.names = ["app%03d" % i for i in range(95)]
+        self.total = len(self.names)
+        self.lock = threading.Lock()
+        self.active = self.peak = 0
+
+    def page(self, request):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(0.02)
+        offset = int(request.query["offset"][0])
+        count = int(request.query["count"][0])
+        names = self.names[offset:offset + count]
+        with self.lock:
+            self.active -= 1
+        return 200, [], testlib.atom_feed([
+            testlib.atom_entry(name, "/servicesNS/nobody/system/apps/local/" + name)
+            for name in names], self.total)
+
+    def offsets(self):
+        return sorted(int(r.query["offset"][0]) for r in self.splunkd.requests)
+
+    def test_in_order(self):
+        apps = self.service.apps.list(pagesize=10, workers=4)
+        self.assertEqual([app.name for app in apps], self.names)
+        self.assertEqual(self.offsets(), range(0, 95, 10))
+        self.assertTrue(1 < self.peak <= 4)
+
+    def test_offset_and_count(self):
+        apps = self.service.apps.iter(offset=5, count=23, pagesize=10, workers=3, lazy=True)
+        self.assertEqual([app.name for app in apps], self.names[5:28])
+        counts = [int(r.query["count"][0]) for r in self.splunkd.requests]
+        self.assertEqual(sorted(counts), [3, 10, 10])
+
+    def test_early_exit(self):
+        apps = self.service.apps.iter(pagesize=5, workers=2)
+        self.assertEqual([apps.next().name for _ in range(7)], self.names[:7])
+        apps.close()
+        time.sleep(0.1)
+        self.assertTrue(len(self.splunkd.requests) <= 4)
+
+    def test_without_total(self):
+        self.total = None
+        def page(request):
+            status, headers, body = self.page(request)
+            return status, headers, body.replace("totalResults", "itemsPerPage")
+        self.splunkd.route("GET", "/services/apps/local/", page)
+        apps = self.service.apps.list(pagesize=10, workers=4)
+        self.assertEqual([app.name for app in apps], self.names)
+
+
 if __name__ == "__main__":
     try:
         import unittest2 as unittest
@@ -14,8 +14,12 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import copy
+import pickle
 import sys
+import unittest
 from os import path
+from StringIO import StringIO
 import xml.etree.ElementTree as et
 
 import testlib
@@ -245,6 +249,92 @@ class DataTestCase(testlib.SDKTestCase):
         self.assertRaises(KeyError, d.__getitem__, 'boris')
 
 
+class TestIterload(unittest.TestCase):
+    def setUp(self):
+        with open(path.join(path.dirname(__file__), "data", "services.xml")) as f:
+            self.text = f.read()
+
+    def test_same_as_load(self):
+        entries = data.load(self.text).feed.entry
+        self.assertEqual(list(data.iterload(self.text, "entry")), entries)
+        self.assertEqual(list(data.iterload(StringIO(self.text),
+                                            "{http://www.w3.org/2005/Atom}entry")),
+                         entries)
+
+    def test_feeds(self):
+        feed = testlib.atom_feed([
+            testlib.atom_entry("a", "/services/x/a", {"k.a": "1", "k.b": "2"}),
+            testlib.atom_entry("b", "/services/x/b")])
+        entries = list(data.iterload(feed, "entry"))
+        self.assertEqual(entries, data.load(feed).feed.entry)
+        self.assertEqual(entries[0].content.k, {"a": "1", "b": "2"})
+        self.assertEqual(list(data.iterload(testlib.atom_feed([]), "entry")), [])
+        self.assertEqual(list(data.iterload("  ", "entry")), [])
+
+    def test_root(self):
+        entry = testlib.atom_entry("a", "/services/x/a", {"sid": "1"})
+        self.assertEqual(list(data.iterload(entry, "entry")),
+                         [data.load(entry).entry])
+
+    def test_nested(self):
+        # Only children of the top-level element match.
+        self.assertEqual(list(data.iterload("<a><b><c>1</c></b><c>2</c></a>", "c")),
+                         ["2"])
+
+    def test_invalid(self):
+        self.assertRaises(et.ParseError, list,
+                          data.iterload("<feed><entry></feed>", "entry"))
+        self.assertRaises(et.ParseError, data.load, "<dict</dict>")
+
+
+class TestRecord(unittest.TestCase):
+    def setUp(self):
+        self.record = data.record({'foo': 5,
+                                   'bar.baz': 6,
+                                   'bar.zrp.meep': 8,
+                                   'bar.zrp.peem': 9})
+
+    def test_prefixes_are_reused(self):
+        r = self.record
+        self.assertEqual(r.bar, {'baz': 6, 'zrp': {'meep': 8, 'peem': 9}})
+        self.assertTrue(r.bar is r.bar)
+        self.assertTrue(r['bar.zrp'] is r.bar.zrp)
+        self.assertRaises(KeyError, r.__getitem__, 'bar.baz.x')
+        self.assertRaises(AttributeError, getattr, r, 'boris')
+
+    def test_changes(self):
+        r = self.record
+        bar = r.bar
+        r['bar.qux'] = 7
+        self.assertEqual(r.bar.qux, 7)
+        self.assertFalse(r.bar is bar)
+        r.update({'bar.zrp.meep': 10})
+        self.assertEqual(r.bar.zrp.meep, 10)
+        del r['bar.qux']
+        self.assertFalse('qux' in r.bar)
+        r.pop('bar.baz')
+        self.assertRaises(KeyError, r.bar.__getitem__, 'baz')
+        r.clear()
+        self.assertRaises(KeyError, r.__getitem__, 'bar')
+
+    def test_nested_changes(self):
+        r = self.record
+        bar = r.bar
+        bar.baz = 0
+        self.assertEqual(bar.baz, 0)
+        self.assertEqual(r.bar.baz, 6)
+        self.assertEqual(r['bar.baz'], 6)
+
+    def test_copy(self):
+        r = self.record
+        r.bar
+        c = copy.copy(r)
+        c['bar.qux'] = 7
+        self.assertEqual(c.bar.qux, 7)
+        self.assertFalse('qux' in r.bar)
+        self.assertEqual(pickle.loads(pickle.dumps(r, 2)).bar, r.bar)
+
+
 if __name__ == "__main__":
     try:
         import unittest2 as unittest
@@ -16,6 +16,14 @@
 
 import testlib
 import logging
+import errno
+import socket
+import threading
+import time
+import zlib
+
+import splunklib.binding as binding
+import splunklib.client as client
 
 try:
     import unittest
@@ -119,6 +127,238 @@ class IndexTest(testlib.SDKTestCase):
         self.index.upload(path)
         self.assertEventuallyTrue(lambda: self.totalEventCount() == eventCount+4, timeout=60)
 
+class TestIndexWriter(testlib.StubServiceTestCase):
+    def setUp(self):
+        super(TestIndexWriter, self).setUp()
+        self.splunkd.route("GET", "/services/data/indexes/main/", testlib.atom_feed([
+            testlib.atom_entry("main", "/servicesNS/nobody/system/data/indexes/main")]))
+        self.splunkd.route("POST", "/services/receivers/simple", self.receive)
+        self.index = client.Index(self.service, "data/indexes/main")
+        self.bodies = []
+        self.ready = threading.Event()
+        self.ready.set()
+
+    def tearDown(self):
+        self.ready.set()
+        super(TestIndexWriter, self).tearDown()
+
+    def receive(self, request):
+        self.ready.wait(5)
+        self.bodies.append(request.body)
+        return 200, [], "<response/>"
+
+    def events(self):
+        return [line for body in self.bodies for line in body.splitlines()]
+
+    def test_batch_submit(self):
+        self.index.batch_submit(["a\n", u"\xe9", "c"], sourcetype="st")
+        self.assertEqual(self.bodies, ["a\n\xc3\xa9\nc\n"])
+        request = self.splunkd.requests[-1]
+        self.assertEqual(request.query["index"], ["main"])
+        self.assertEqual(request.query["sourcetype"], ["st"])
+
+    def test_flush_by_count(self):
+        with self.index.writer(max_events=10) as writer:
+            for i in range(25):
+                writer.write("event %d" % i)
+        self.assertEqual([len(b.splitlines()) for b in self.bodies], [10, 10, 5])
+        self.assertEqual(self.events(), ["event %d" % i for i in range(25)])
+        self.assertEqual(writer.metrics.events, 25)
+        self.assertEqual(writer.metrics.batches, 3)
+
+    def test_flush_by_size(self):
+        writer = self.index.writer(max_bytes=100, background=False)
+        for i in range(10):
+            writer.write("x" * 49)
+        self.assertEqual(len(self.bodies), 5)
+        writer.close()
+
+    def test_flush_by_age(self):
+        writer = self.index.writer(max_age=0.05)
+        writer.write("old")
+        for _ in range(100):
+            if self.bodies:
+                break
+            time.sleep(0.01)
+        self.assertEqual(self.bodies, ["old\n"])
+        writer.close()
+
+    def test_backpressure(self):
+        self.ready.clear()
+        writer = self.index.writer(max_events=1, max_pending=1)
+        writer.write("in flight")
+        writer.write("pending")
+        blocked = threading.Thread(target=writer.write, args=("blocked",))
+        blocked.start()
+        blocked.join(0.2)
+        self.assertTrue(blocked.is_alive())
+        self.ready.set()
+        blocked.join(5)
+        writer.close()
+        self.assertEqual(self.events(), ["in flight", "pending", "blocked"])
+
+    def test_errors_are_raised(self):
+        self.splunkd.route("POST", "/services/receivers/simple", status=500,
+                           body="<response/>")
+        writer = self.index.writer()
+        writer.write("lost")
+        self.assertRaises(binding.HTTPError, writer.flush)
+        self.assertEqual(writer.metrics.failed, 1)
+        writer.close()
+
+    def test_metrics(self):
+        with self.index.writer() as writer:
+            writer.write("abc")
+            writer.write("de")
+        metrics = writer.metrics
+        self.assertEqual((metrics.events, metrics.bytes, metrics.buffered), (2, 7, 0))
+        self.assertTrue(metrics.events_per_second > 0)
+        self.assertTrue(metrics.max_flush_latency >= metrics.flush_latency > 0)
+        self.assertRaises(ValueError, writer.write, "closed")
+
+
+class _StreamReceiver(object):
+    # A TCP server standing in for receivers/stream: it records what is sent
+    # on each connection, and can close connections once data has arrived.
+    def __init__(self):
+        self.server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.server.bind(("127.0.0.1", 0))
+        self.server.listen(5)
+        self.port = self.server.getsockname()[1]
+        self.received = []
+        self.drop_after_body = 0 # Connections to close when data arrives
+        self.dropped = threading.Event()
+        thread = threading.Thread(target=self.accept)
+        thread.daemon = True
+        thread.start()
+
+    def accept(self):
+        while True:
+            try:
+                sock, _ = self.server.accept()
+            except socket.error:
+                return
+            thread = threading.Thread(target=self.receive, args=(sock,))
+            thread.daemon = True
+            thread.start()
+
+    def receive(self, sock):
+        data = []
+        self.received.append(data)
+        while True:
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            data.append(chunk)
+            head, _, body = "".join(data).partition("\r\n\r\n")
+            if body and self.drop_after_body > 0:
+                self.drop_after_body -= 1
+                sock.close()
+                self.dropped.set()
+                return
+        sock.close()
+
+    def requests(self):
+        # The (headers, body) of each connection.
+        return ["".join(data).partition("\r\n\r\n")[::2] for data in self.received]
+
+    def close(self):
+        self.server.close()
+
+
+class TestIndexStream(unittest.TestCase):
+    def setUp(self):
+        self.receiver = _StreamReceiver()
+        self.service = client.Service(token="Splunk abc", scheme="http",
+                                      host="127.0.0.1", port=self.receiver.port)
+        self.index = client.Index(self.service, "data/indexes/main",
+                                  skip_refresh=True)
+        self.index._state = client.record({'title': 'main'})
+
+    def tearDown(self):
+        self.receiver.close()
+
+    def wait_for(self, predicate):
+        for _ in range(500):
+            if predicate():
+                return
+            time.sleep(0.01)
+        self.fail("Timed out.")
+
+    def test_buffers_and_batches(self):
+        with self.index.stream(sourcetype="st", buffer_size=100) as stream:
+            for i in range(30):
+                stream.write("event %02d" % i)
+            self.assertEqual(stream.throughput.batches, 2)
+        self.assertEqual(stream.throughput.batches, 3)
+        self.wait_for(lambda: len(self.receiver.requests()) == 1)
+        time.sleep(0.05)
+        head, body = self.receiver.requests()[0]
+        self.assertTrue(head.startswith("POST /services/receivers/stream?"))
+        self.assertTrue("sourcetype=st" in head and "index=main" in head)
+        self.assertTrue("Authorization: Splunk abc" in head)
+        self.assertEqual(body, "".join("event %02d\n" % i for i in range(30)))
+        throughput = stream.throughput
+        self.assertEqual((throughput.events, throughput.bytes, throughput.reconnects),
+                         (30, 270, 0))
+        self.assertTrue(throughput.events_per_second > 0)
+
+    def test_gzip(self):
+        with self.index.stream(compress=True) as stream:
+            stream.write(u"\xe9v\xe9nement")
+            stream.flush()
+            stream.write("second\n")
+        time.sleep(0.1)
+        head, body = self.receiver.requests()[0]
+        self.assertTrue("Content-Encoding: gzip" in head)
+        self.assertEqual(zlib.decompress(body, 16 + zlib.MAX_WBITS),
+                         "\xc3\xa9v\xc3\xa9nement\nsecond\n")
+        self.assertEqual(stream.throughput.bytes_sent, len(body))
+
+    def test_reconnects_when_server_closes(self):
+        self.receiver.drop_after_body = 1
+        with self.index.stream() as stream:
+            stream.write("first")
+            stream.flush()
+            self.receiver.dropped.wait(5)
+            time.sleep(0.05)
+            stream.write("second")
+        self.wait_for(lambda: len(self.receiver.requests()) == 2)
+        time.sleep(0.05)
+        self.assertEqual([body for _, body in self.receiver.requests()],
+                         ["first\n", "second\n"])
+        self.assertEqual(stream.throughput.reconnects, 1)
+
+    def test_reconnects_on_broken_pipe(self):
+        sent = []
+        class BrokenSocket(object):
+            def sendall(self, data):
+                raise socket.error(errno.EPIPE, "Broken pipe")
+            def shutdown(self, how):
+                pass
+            def close(self):
+                pass
+            def fileno(self):
+                return -1
+        class Socket(BrokenSocket):
+            def sendall(self, data):
+                sent.append(data)
+        sockets = [BrokenSocket(), Socket()]
+        self.index._attach = lambda *args, **kwargs: sockets.pop(0)
+        stream = self.index.stream(retries=1)
+        stream.write("event")
+        stream.flush()
+        self.assertEqual(sent, ["event\n"])
+        self.assertEqual(stream.throughput.reconnects, 1)
+
+    def test_gives_up_after_retries(self):
+        self.receiver.close()
+        self.service.port = 1 # Nothing listens there
+        stream = self.index.stream(retries=1)
+        stream.write("event")
+        self.assertRaises(socket.error, stream.flush)
+
+
 if __name__ == "__main__":
     try:
         import unittest2 as unittest
@@ -17,6 +17,9 @@ from splunklib.binding import HTTPError
 
 import testlib
 import logging
+import threading
+import time
+import urllib
 try:
     import unittest
 except ImportError:
@@ -279,6 +282,191 @@ class TestInput(testlib.SDKTestCase):
             remaining -= 1
 
 
+def _kind_entry(name, path, creatable=True):
+    # An entry of the data/inputs tree; only kinds have a "create" link.
+    entry = testlib.atom_entry(name, path)
+    if creatable:
+        entry = entry.replace('rel="list"/>', 'rel="list"/><link href="%s/_new" rel="create"/>' % path)
+    return entry
+
+
+class StubInputs(object):
+    """Serves the inputs in *inputs*, a ``dict`` of kind to input names, from
+    a :class:`testlib.StubSplunkd`, as splunkd does under data/inputs."""
+    def __init__(self, splunkd, inputs, delay=0.02):
+        self.inputs = inputs
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.active = self.peak = 0
+        tree = {}
+        for kind in inputs:
+            parent, _, name = kind.rpartition('/')
+            tree.setdefault(parent, set()).add(name)
+            while parent:
+                grandparent, _, name = parent.rpartition('/')
+                tree.setdefault(grandparent, set()).add(name)
+                parent = grandparent
+        for parent, names in tree.items():
+            base = "/services/data/inputs/" + (parent + "/" if parent else "")
+            splunkd.route("GET", base if not parent else base.rstrip("/"), testlib.atom_feed([
+                _kind_entry(name, base + name, (parent + "/" + name).lstrip("/") in inputs)
+                for name in sorted(names)]))
+        for kind, names in inputs.items():
+            splunkd.route("GET", "/services/data/inputs/" + kind, self.handler(kind))
+            for name in names:
+                path = "/services/data/inputs/%s/%s" % (kind, urllib.quote(name, safe=""))
+                splunkd.route("GET", path, testlib.atom_feed([self.entry(kind, name)]))
+
+    def entry(self, kind, name):
+        return testlib.atom_entry(name, "/servicesNS/nobody/search/data/inputs/%s/%s" % (
+            kind, urllib.quote(name, safe="")))
+
+    def handler(self, kind):
+        def respond(request):
+            with self.lock:
+                self.active += 1
+                self.peak = max(self.peak, self.active)
+            time.sleep(self.delay)
+            names = list(self.inputs[kind])
+            if request.query.get("sort_mode", [""])[0].startswith("alpha"):
+                names.sort(key=lambda name: name.lower(),
+                           reverse=request.query["sort_dir"][0] == "desc")
+            count = int(request.query.get("count", ["30"])[0])
+            if count > 0:
+                names = names[:count]
+            with self.lock:
+                self.active -= 1
+            return 200, [], testlib.atom_feed([self.entry(kind, name) for name in names])
+        return respond
+
+
+class TestInputsOffline(testlib.StubServiceTestCase):
+    def setUp(self):
+        super(TestInputsOffline, self).setUp()
+        self.stub = StubInputs(self.splunkd, {
+            "monitor": ["/var/log/b", "/var/log/D"],
+            "script": ["a.sh", "c.sh", "e.sh"],
+            "tcp/raw": ["9997"],
+            "udp": ["514", "C"]})
+
+    def kinds_requested(self):
+        return [r.path.split("/services/data/inputs/")[1] for r in self.splunkd.requests
+                if "count" in r.query]
+
+    def test_kinds(self):
+        self.assertEqual(self.service.inputs.kinds, ["monitor", "script", "tcp/raw", "udp"])
+
+    def test_list_concurrently(self):
+        names = [i.name for i in self.service.inputs.list()]
+        self.assertEqual(names, ["/var/log/b", "/var/log/D", "a.sh", "c.sh", "e.sh",
+                                 "9997", "514", "C"])
+        self.assertTrue(self.stub.peak > 1)
+
+    def test_sorted_merge(self):
+        expected = sorted(sum(self.stub.inputs.values(), []), key=lambda n: n.lower())
+        inputs = self.service.inputs.list(sort_mode="alpha")
+        self.assertEqual([i.name for i in inputs], expected)
+        inputs = self.service.inputs.list(sort_mode="alpha", sort_dir="desc")
+        self.assertEqual([i.name for i in inputs], expected[::-1])
+        inputs = self.service.inputs.list(sort_mode="alpha_case")
+        self.assertEqual([i.name for i in inputs], sorted(expected))
+
+    def test_sorted_offset_and_count(self):
+        expected = sorted(sum(self.stub.inputs.values(), []), key=lambda n: n.lower())
+        inputs = self.service.inputs.list(sort_mode="alpha", offset=2, count=3)
+        self.assertEqual([i.name for i in inputs], expected[2:5])
+        counts = set(r.query["count"][0] for r in self.splunkd.requests if "sort_mode" in r.query)
+        self.assertEqual(counts, set(["5"]))
+
+    def test_unsorted_count(self):
+        inputs = self.service.inputs.list(offset=1, count=3)
+        self.assertEqual([i.name for i in inputs], ["/var/log/D", "a.sh", "c.sh"])
+        inputs = self.service.inputs.list(count=3, sort_dir="desc")
+        self.assertEqual([i.name for i in inputs], ["C", "514", "9997"])
+
+    def test_iter_stops_early(self):
+        inputs = self.service.inputs.iter(count=4, workers=1)
+        self.assertEqual(len(list(inputs)), 4)
+        self.assertEqual(self.kinds_requested(), ["monitor", "script"])
+
+    def walks(self):
+        return len([r for r in self.splunkd.requests
+                    if r.path in ("/services/data/inputs/", "/services/data/inputs/tcp")])
+
+    def test_kinds_are_cached(self):
+        for _ in range(3):
+            self.service.inputs.kinds
+            self.service.inputs.kindpath("udp")
+        self.assertEqual(self.walks(), 2)
+        self.service.inputs.invalidate_kinds()
+        self.service.inputs.kinds
+        self.assertEqual(self.walks(), 4)
+
+    def test_kinds_ttl(self):
+        service = self.stub_service(input_kinds_ttl=0)
+        service.inputs.kinds
+        service.inputs.kinds
+        self.assertEqual(self.walks(), 4)
+
+    def test_getitem_by_name(self):
+        self.assertEqual(self.service.inputs["c.sh"].kind, "script")
+        del self.splunkd.requests[:]
+        entity = self.service.inputs["/var/log/b"]
+        self.assertEqual((entity.name, entity.kind), ("/var/log/b", "monitor"))
+        self.assertEqual([r.path for r in self.splunkd.requests],
+                         ["/services/data/inputs/monitor/%2Fvar%2Flog%2Fb"])
+        self.assertTrue("9997" in self.service.inputs)
+        self.assertFalse("nothing" in self.service.inputs)
+        self.assertRaises(KeyError, self.service.inputs.__getitem__, "nothing")
+
+    def test_getitem_ambiguous(self):
+        self.stub = StubInputs(self.splunkd, {"script": ["a.sh"], "udp": ["a.sh"]})
+        self.assertRaises(client.AmbiguousReferenceException,
+                          self.service.inputs.__getitem__, "a.sh")
+
+    def test_stale_index(self):
+        self.service.inputs["a.sh"]
+        # The input moves to another kind behind the SDK's back.
+        self.splunkd.route("GET", "/services/data/inputs/script/a.sh", "<response><messages>"
+                           "<msg type=\"ERROR\">Not Found</msg></messages></response>", status=404)
+        self.splunkd.route("GET", "/services/data/inputs/udp/a.sh",
+                           testlib.atom_feed([self.stub.entry("udp", "a.sh")]))
+        self.assertEqual(self.service.inputs["a.sh"].kind, "udp")
+
+    def test_missing_kind(self):
+        self.splunkd.route("GET", "/services/data/inputs/udp", "<response><messages>"
+                           "<msg type=\"ERROR\">Not Found</msg></messages></response>", status=404)
+        self.assertEqual(len(self.service.inputs.list(lazy=True)), 6)
+
+    def test_lazy_entry_without_link(self):
+        entry = self.stub.entry("udp", "514").replace('rel="alternate"', 'rel="other"')
+        self.splunkd.route("GET", "/services/data/inputs/udp",
+                           testlib.atom_feed([entry, self.stub.entry("udp", "C")]))
+        inputs = self.service.inputs.list("udp", lazy=True)
+        self.assertEqual([(i.name, i.kind) for i in inputs], [("514", "udp"), ("C", "udp")])
+        self.assertEqual(inputs[0].path, "data/inputs/udp/514/")
+
+    def test_lazy_update_keeps_restrict_to_host(self):
+        path = "/servicesNS/nobody/search/data/inputs/udp/514"
+        self.splunkd.route("GET", "/services/data/inputs/udp", testlib.atom_feed([
+            testlib.atom_entry("myhost:514", path, {"restrictToHost": "myhost"})]))
+        self.splunkd.route("POST", path + "/", "<response/>")
+        entity, = self.service.inputs.list("udp", lazy=True)
+        entity.update(sourcetype="syslog")
+        form = self.splunkd.requests[-1].form
+        self.assertEqual(form["restrictToHost"], ["myhost"])
+        self.assertEqual(form["sourcetype"], ["syslog"])
+
+    def test_delete_invalidates_cache(self):
+        service = self.stub_service(cache_ttl=60)
+        self.splunkd.route("DELETE", "/services/data/inputs/script/c.sh/", "<response/>")
+        service.cache.put(("data/inputs/script/c.sh", None, None, None), "entity")
+        service.cache.put(("data/inputs/script", None, None, None), "collection")
+        service.cache.put(("data/inputs/udp/514", None, None, None), "other")
+        service.inputs.delete("c.sh")
+        self.assertEqual(len(service.cache), 1)
+
+
 if __name__ == "__main__":
     try:
         import unittest2 as unittest
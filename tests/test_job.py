@@ -22,6 +22,16 @@ try:
 except ImportError:
     import unittest
 
+import errno
+import json
+import re
+import socket
+import threading
+import time
+import zlib
+
+import splunklib.aio as aio
+import splunklib.binding as binding
 import splunklib.client as client
 import splunklib.results as results
 
@@ -395,6 +405,24 @@ class TestResultsReader(unittest.TestCase):
         s = results._XMLDTDFilter(StringIO("<?xml asdf awe awdf=""><boris>Other stuf</boris><?xml dafawe \n asdfaw > ab"))
         self.assertEqual(s.read(), "<boris>Other stuf</boris> ab")
 
+    def test_xmldtd_filter_across_chunks(self):
+        import re
+        from StringIO import StringIO
+        text = "<?xml a?><doc><a>x < y</a><?xml b ?>\n<b/><<?x?>c><?unterminated"
+        expected = re.sub(r"<\?[^>]*(>|$)", "", text)
+        for chunk_size in range(1, len(text) + 1):
+            s = results._XMLDTDFilter(StringIO(text), chunk_size=chunk_size)
+            self.assertEqual(s.read(), expected)
+            s = results._XMLDTDFilter(StringIO(text), chunk_size=chunk_size)
+            pieces = []
+            while True:
+                piece = s.read(3)
+                if piece == "":
+                    break
+                self.assertTrue(len(piece) <= 3)
+                pieces.append(piece)
+            self.assertEqual("".join(pieces), expected)
+
     def test_concatenated_stream(self):
         from StringIO import StringIO
         s = results._ConcatenatedStream(StringIO("This is a test "),
@@ -403,5 +431,523 @@ class TestResultsReader(unittest.TestCase):
         self.assertEqual(s.read(20), 's is a test of the e')
         self.assertEqual(s.read(), 'mergency broadcast system.')
 
+class TestParallelExport(testlib.StubServiceTestCase):
+    def setUp(self):
+        super(TestParallelExport, self).setUp()
+        self.splunkd.route("POST", "/services/search/jobs/export", self.export)
+        self.lock = threading.Lock()
+        self.failures = {} # (earliest, latest) -> how to fail the next export
+
+    def export(self, request):
+        # One event per second, newest first, as JSON documents.
+        lower = float(request.form['earliest_time'][0])
+        upper = float(request.form['latest_time'][0])
+        times = [t for t in range(1000) if lower <= t < upper]
+        body = "".join(json.dumps({"preview": False, "offset": i,
+                                   "result": {"_time": str(t)}}) + "\n"
+                       for i, t in enumerate(reversed(times)))
+        headers = [("Content-Type", "application/json; charset=UTF-8")]
+        with self.lock:
+            failure = self.failures.pop((lower, upper), None)
+        if failure == "truncate":
+            headers.append(("Content-Length", str(len(body))))
+            return 200, headers, body[:len(body) // 2]
+        if failure == "error":
+            self.failures[lower, upper] = "error"
+            return 503, [], "<response/>"
+        return 200, headers, body
+
+    def times(self, found):
+        return [int(r["_time"]) for r in found]
+
+    def test_ordered(self):
+        found = self.service.jobs.parallel_export(
+            "search *", 0, 100, slices=7, workers=3, output_mode="json")
+        self.assertEqual(self.times(found), range(99, -1, -1))
+        self.assertEqual(len(self.splunkd.requests), 7)
+
+    def test_unordered(self):
+        found = self.service.jobs.parallel_export(
+            "search *", 0, 100, slices=7, workers=3, ordered=False,
+            output_mode="json")
+        self.assertEqual(sorted(self.times(found)), range(100))
+
+    def test_retry_resumes_slice(self):
+        self.failures[50.0, 100.0] = "truncate"
+        found = self.service.jobs.parallel_export(
+            "search *", 0, 100, slices=2, workers=2, retry_delay=0,
+            output_mode="json")
+        self.assertEqual(self.times(found), range(99, -1, -1))
+        self.assertEqual(len(self.splunkd.requests), 3)
+
+    def test_retries_exhausted(self):
+        self.failures[0.0, 50.0] = "error"
+        found = self.service.jobs.parallel_export(
+            "search *", 0, 100, slices=2, workers=2, retries=2, retry_delay=0,
+            output_mode="json")
+        try:
+            list(found)
+            self.fail("Expected an HTTPError.")
+        except binding.HTTPError as he:
+            self.assertEqual(he.status, 503)
+        attempts = [r for r in self.splunkd.requests
+                    if r.form['earliest_time'] == ['0.000000']]
+        self.assertEqual(len(attempts), 3)
+
+    def test_resume_from_checkpoint(self):
+        checkpoint = {}
+        found = self.service.jobs.parallel_export(
+            "search *", 0, 100, slices=4, workers=2, checkpoint=checkpoint,
+            output_mode="json")
+        first = [found.next() for _ in range(30)]
+        found.close()
+        saved = json.loads(json.dumps(checkpoint))
+        rest = self.service.jobs.parallel_export(
+            "search *", 0, 100, slices=4, workers=2, checkpoint=saved,
+            output_mode="json")
+        self.assertEqual(self.times(first) + self.times(rest), range(99, -1, -1))
+        self.assertTrue(all(state["done"] for state in saved.values()))
+
+    def test_invalid_arguments(self):
+        self.assertRaises(ValueError, self.service.jobs.parallel_export,
+                          "search *", 10, 10)
+        self.assertRaises(TypeError, self.service.jobs.parallel_export,
+                          "search *", 0, 10, earliest_time="-1d")
+
+
+class TestWait(testlib.StubServiceTestCase):
+    def setUp(self):
+        super(TestWait, self).setUp()
+        self.polls = {} # sid -> number of times the job was polled
+        self.steps = {} # sid -> number of polls until the job is done
+
+    def job(self, sid, steps):
+        # A job whose doneProgress advances by 1/steps per poll.
+        self.steps[sid] = steps
+        self.polls[sid] = 0
+        handler = lambda request: (200, [], testlib.atom_entry(
+            sid, "/services/search/jobs/" + sid, self.poll(sid)))
+        self.splunkd.route("GET", "/services/search/jobs/%s/" % sid, handler)
+        self.splunkd.route("GET", "/servicesNS/nobody/search/search/jobs/%s/" % sid, handler)
+        return client.Job(self.service, sid)
+
+    def poll(self, sid):
+        self.polls[sid] += 1
+        progress = min(1.0, float(self.polls[sid]) / self.steps[sid])
+        return {"sid": sid, "dispatchState": "DONE" if progress == 1 else "RUNNING",
+                "doneProgress": str(progress), "isDone": "1" if progress == 1 else "0"}
+
+    def list_jobs(self, sids):
+        # Lists the jobs among *sids*, and another job of the same user, that
+        # the search filter of the request matches.
+        self.listed = [] # The sids each listing asked for
+        def handler(request):
+            self.assertEqual(request.query["f"], client.JOB_PROGRESS_FIELDS)
+            wanted = re.findall(r'sid="([^"]*)"', request.query["search"][0])
+            self.assertEqual(request.query["search"][0],
+                             " OR ".join('sid="%s"' % sid for sid in wanted))
+            self.assertEqual(request.query["count"], [str(len(wanted))])
+            self.listed.append(wanted)
+            entries = [testlib.atom_entry(sid, "/services/search/jobs/" + sid,
+                                          self.poll(sid) if sid in sids else
+                                          {"sid": sid, "isDone": "0"})
+                       for sid in sids + ["other"] if sid in wanted]
+            return 200, [], testlib.atom_feed(entries)
+        self.splunkd.route("GET", "/services/search/jobs/", handler)
+
+    def test_wait(self):
+        job = self.job("1", 4)
+        seen = []
+        self.assertTrue(job.wait(on_progress=lambda j, p: seen.append(p),
+                                 interval=0.01) is job)
+        self.assertEqual(seen, [0.25, 0.5, 0.75, 1.0])
+        self.assertEqual(job["isDone"], "1")
+
+    def test_wait_timeout(self):
+        job = self.job("1", 1000)
+        self.assertRaises(aio.TimeoutError, job.wait, 0.1, None, 0.01)
+
+    def test_backoff(self):
+        poller = client._Poller(0.1, 2)
+        self.assertEqual(poller.next(0.0), 0.1)
+        self.assertEqual(poller.next(0.0), 0.2)
+        self.assertEqual(poller.next(0.0), 0.4)
+        poller.time -= 10 # 10% of the job took 10 seconds, so 90% takes 90
+        self.assertEqual(poller.next(0.1), 2)
+
+    def test_wait_all(self):
+        jobs = [self.job(sid, steps) for sid, steps in (("a", 2), ("b", 5), ("c", 3))]
+        self.list_jobs(["a", "b", "c"])
+        seen = {}
+        done = self.service.jobs.wait_all(
+            jobs, on_progress=lambda j, p: seen.setdefault(j.sid, []).append(p),
+            interval=0.01)
+        self.assertEqual([job.sid for job in done], ["a", "b", "c"])
+        self.assertEqual(seen["a"], [0.5, 1.0])
+        self.assertEqual(seen["b"], [0.2, 0.4, 0.6, 0.8, 1.0])
+        # One request per poll, which lists only the pending jobs.
+        self.assertEqual([r.path for r in self.splunkd.requests],
+                         ["/services/search/jobs/"] * 5)
+        self.assertEqual(self.listed, [["a", "b", "c"], ["a", "b", "c"],
+                                       ["b", "c"], ["b"], ["b"]])
+        self.assertEqual(done[1]["isDone"], "1")
+
+    def test_wait_all_batches(self):
+        sids = ["job%d" % n for n in range(5)]
+        for sid in sids:
+            self.job(sid, 1)
+        self.list_jobs(sids)
+        batch = client.JOB_POLL_BATCH
+        client.JOB_POLL_BATCH = 2
+        try:
+            self.service.jobs.wait_all(sids, interval=0.01)
+        finally:
+            client.JOB_POLL_BATCH = batch
+        self.assertEqual(self.listed, [sids[0:2], sids[2:4], sids[4:]])
+
+    def test_wait_all_unlisted(self):
+        self.job("a", 2)
+        self.job("hidden", 3)
+        self.list_jobs(["a"])
+        done = self.service.jobs.wait_all(["a", "hidden"], interval=0.01)
+        self.assertEqual([job.sid for job in done], ["a", "hidden"])
+        self.assertEqual(self.polls["hidden"], 3)
+
+    def test_wait_all_none_listed(self):
+        self.job("x", 1)
+        self.job("y", 1)
+        self.list_jobs([])
+        self.service.jobs.wait_all(["x", "y"], interval=0.01)
+        # The listing, then one request for each job it did not list.
+        self.assertEqual(sorted(r.path for r in self.splunkd.requests),
+                         ["/services/search/jobs/", "/services/search/jobs/x/",
+                          "/services/search/jobs/y/"])
+
+    def test_wait_all_timeout(self):
+        self.job("a", 1000)
+        self.list_jobs(["a"])
+        self.assertRaises(aio.TimeoutError, self.service.jobs.wait_all, ["a"], 0.1,
+                          None, 0.01)
+
+
+class TestIterResults(testlib.StubServiceTestCase):
+    def setUp(self):
+        super(TestIterResults, self).setUp()
+        self.total = 95
+        self.max_rows = None # The maxresultrows of the server
+        job = lambda request: (200, [], testlib.atom_entry(
+            "123", "/services/search/jobs/123",
+            {"sid": "123", "dispatchState": "DONE", "isDone": "1",
+             "resultCount": str(self.total)}))
+        self.splunkd.route("GET", "/services/search/jobs/123/", job)
+        self.splunkd.route("GET", "/servicesNS/nobody/search/search/jobs/123/", job)
+        self.splunkd.route("GET", "/servicesNS/nobody/search/search/jobs/123/results",
+                           self.page)
+        self.job = client.Job(self.service, "123")
+        self.lock = threading.Lock()
+        self.active = self.peak = 0
+
+    def page(self, request):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        sleep(0.02)
+        offset = int(request.query["offset"][0])
+        count = int(request.query["count"][0])
+        if self.max_rows is not None:
+            count = min(count, self.max_rows)
+        limit = 42 if "search" in request.query else self.total
+        rows = [{"n": str(n)} for n in range(offset, min(offset + count, limit))]
+        with self.lock:
+            self.active -= 1
+        return 200, [("Content-Type", "application/json; charset=UTF-8")], json.dumps(
+            {"preview": False, "init_offset": offset, "messages": [], "results": rows})
+
+    def offsets(self):
+        return [int(r.query["offset"][0]) for r in self.splunkd.requests
+                if r.path.endswith("/results")]
+
+    def test_all_pages(self):
+        found = [int(r["n"]) for r in self.job.iter_results(page_size=10, prefetch=3)]
+        self.assertEqual(found, range(95))
+        self.assertEqual(sorted(self.offsets()), range(0, 95, 10))
+        self.assertTrue(1 < self.peak <= 3)
+
+    def test_without_prefetch(self):
+        found = [int(r["n"]) for r in self.job.iter_results(page_size=30, prefetch=0)]
+        self.assertEqual(found, range(95))
+        self.assertEqual(self.offsets(), [0, 30, 60, 90])
+
+    def test_pages_above_max_rows(self):
+        self.max_rows = 25
+        found = [int(r["n"]) for r in self.job.iter_results(page_size=40, prefetch=2)]
+        self.assertEqual(found, range(95))
+        self.assertEqual(sorted(self.offsets()), [0, 25, 40, 65, 80])
+
+    def test_xml(self):
+        def page(request):
+            offset = int(request.query["offset"][0])
+            self.assertEqual(request.query["output_mode"], ["xml"])
+            return 200, [], ("<?xml version='1.0' encoding='UTF-8'?><results preview='0'>"
+                             "<meta><fieldOrder><field>n</field></fieldOrder></meta>%s</results>" %
+                             "".join("<result offset='%d'><field k='n'><value><text>%d</text>"
+                                     "</value></field></result>" % (n, n)
+                                     for n in range(offset, min(offset + 10, 25))))
+        self.splunkd.route("GET", "/servicesNS/nobody/search/search/jobs/123/results", page)
+        self.total = 25
+        found = [int(r["n"]) for r in self.job.iter_results(page_size=10, output_mode="xml")]
+        self.assertEqual(found, range(25))
+
+    def test_post_process(self):
+        found = list(self.job.iter_results(page_size=10, prefetch=2, search="n<42"))
+        self.assertEqual(len(found), 42)
+        self.assertTrue(max(self.offsets()) <= 70)
+
+    def test_early_exit(self):
+        results = self.job.iter_results(page_size=10, prefetch=2)
+        self.assertEqual(results.next(), {"n": "0"})
+        results.close()
+        sleep(0.1)
+        self.assertTrue(len(self.offsets()) <= 3)
+
+
+class TestFollow(testlib.StubServiceTestCase):
+    def setUp(self):
+        super(TestFollow, self).setUp()
+        self.counts = [0, 3, 3, 3, 7, 10] # eventCount of each poll of the job
+        self.polls = 0
+        self.report = None
+        self.splunkd.route("GET", "/services/search/jobs/123/", self.job)
+        self.splunkd.route("GET", "/servicesNS/nobody/search/search/jobs/123/", self.job)
+        self.splunkd.route("GET", "/servicesNS/nobody/search/search/jobs/123/events",
+                           self.events)
+
+    def job(self, request):
+        count = self.counts[min(self.polls, len(self.counts) - 1)]
+        self.polls += 1
+        content = {"sid": "123", "dispatchState": "RUNNING", "eventCount": str(count),
+                   "numPreviews": str(count), "isDone": "0"}
+        if self.polls >= len(self.counts):
+            content.update(dispatchState="DONE", isDone="1")
+        if self.report is not None:
+            content["reportSearch"] = self.report
+        return 200, [], testlib.atom_entry("123", "/services/search/jobs/123", content)
+
+    def events(self, request):
+        offset = int(request.query["offset"][0])
+        count = int(request.query["count"][0])
+        return 200, [("Content-Type", "application/json")], json.dumps(
+            {"results": [{"n": str(n)} for n in range(offset, offset + count)]})
+
+    def test_deltas(self):
+        job = client.Job(self.service, "123")
+        found = [int(e["n"]) for e in job.follow(interval=0.01)]
+        self.assertEqual(found, range(10))
+        requested = [(r.query["offset"][0], r.query["count"][0])
+                     for r in self.splunkd.requests if r.path.endswith("/events")]
+        self.assertEqual(requested, [("0", "3"), ("3", "4"), ("7", "3")])
+
+    def test_previews(self):
+        self.report = "stats count"
+        self.splunkd.route("GET", "/servicesNS/nobody/search/search/jobs/123/results_preview",
+                           lambda request: (200, [("Content-Type", "application/json")],
+                                            json.dumps({"results": [{"count": str(self.polls)}]})))
+        job = client.Job(self.service, "123")
+        self.assertEqual([r["count"] for r in job.follow(interval=0.01)], ["2", "5", "6"])
+
+    def test_realtime_export(self):
+        def export(request):
+            self.assertEqual(request.form["earliest_time"], ["rt"])
+            self.assertEqual(request.form["search_mode"], ["realtime"])
+            return 200, [("Content-Type", "application/json")], "".join(
+                json.dumps({"preview": True, "offset": n, "result": {"n": str(n)}}) + "\n"
+                for n in range(5))
+        self.splunkd.route("POST", "/services/search/jobs/export", export)
+        found = self.service.jobs.follow("search *")
+        self.assertEqual([r["n"] for r in found], ["0", "1", "2", "3", "4"])
+        self.assertEqual(len(self.splunkd.requests), 1)
+
+    def test_realtime_export_streams(self):
+        # Each result is returned as soon as it arrives, not once enough of
+        # the stream has arrived to fill a buffer.
+        def stream(compress):
+            compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+            for n in range(3):
+                if n > 0:
+                    sleep(0.5)
+                part = json.dumps({"preview": True, "offset": n, "result": {"n": str(n)}})
+                if compress:
+                    part = compressor.compress(part + "\n") + compressor.flush(zlib.Z_SYNC_FLUSH)
+                yield part
+            if compress:
+                yield compressor.flush()
+        for encoding in ("identity", "gzip"):
+            self.splunkd.route("POST", "/services/search/jobs/export",
+                               lambda request: (200, [("Content-Type", "application/json"),
+                                                      ("Content-Encoding", encoding)],
+                                                stream(encoding == "gzip")))
+            start = time.time()
+            arrived = [time.time() - start for result in self.service.jobs.follow("search *")]
+            self.assertEqual(len(arrived), 3)
+            self.assertTrue(arrived[0] < 0.4, arrived)
+            self.assertTrue(arrived[1] < 0.9, arrived)
+            self.assertTrue(arrived[2] >= 1.0, arrived)
+
+
+class TestControlMany(testlib.StubServiceTestCase):
+    def setUp(self):
+        super(TestControlMany, self).setUp()
+        self.lock = threading.Lock()
+        self.active = self.peak = 0
+        for n in range(20):
+            self.splunkd.route("POST", "/services/search/jobs/%d/control" % n, self.control)
+        self.splunkd.route("POST", "/services/search/jobs/gone/control",
+                           '<response><messages><msg type="ERROR">Unknown sid.</msg>'
+                           '</messages></response>', status=404)
+        self.splunkd.route("POST", "/services/search/jobs/bad/control",
+                           '<response><messages><msg type="ERROR">Oops.</msg>'
+                           '</messages></response>', status=500)
+
+    def control(self, request):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        sleep(0.02)
+        with self.lock:
+            self.active -= 1
+        return 200, [], "<response><messages><msg type='INFO'>Done.</msg></messages></response>"
+
+    def test_concurrent(self):
+        sids = [str(n) for n in range(20)]
+        outcome = self.service.jobs.control_many(sids, "set_ttl", workers=4, ttl=600)
+        self.assertEqual(sorted(outcome.succeeded, key=int), sids)
+        self.assertEqual((outcome.missing, outcome.failed), ([], {}))
+        self.assertTrue(1 < self.peak <= 4)
+        self.assertTrue(outcome.elapsed > 0 and outcome.rate > 0)
+        forms = [r.form for r in self.splunkd.requests]
+        self.assertEqual(set(f["action"][0] for f in forms), set(["setttl"]))
+        self.assertEqual(set(f["ttl"][0] for f in forms), set(["600"]))
+
+    def test_outcomes(self):
+        jobs = [client.Job(self.service, "1"), "gone", "bad"]
+        outcome = self.service.jobs.control_many(jobs, "cancel")
+        self.assertEqual(outcome.succeeded, ["1"])
+        self.assertEqual(outcome.missing, ["gone"])
+        self.assertEqual(outcome.failed.keys(), ["bad"])
+        self.assertEqual(outcome.failed["bad"].status, 500)
+
+    def test_empty(self):
+        outcome = self.service.jobs.control_many([], "touch")
+        self.assertEqual(outcome.succeeded, [])
+        self.assertEqual(len(self.splunkd.requests), 0)
+
+
+class TestSearchPool(testlib.StubServiceTestCase):
+    def setUp(self):
+        super(TestSearchPool, self).setUp()
+        self.steps = {"search a": 3, "search b": 1, "search c": 2, "search d": 1000}
+        self.busy = 0 # Number of dispatches to refuse with a 503
+        self.polls = {} # sid -> number of times the job was polled
+        self.running = set()
+        self.peak = 0
+        self.cancelled = []
+        self.splunkd.route("POST", "/services/search/jobs/", self.create)
+        self.splunkd.route("GET", "/services/search/jobs/", self.list_jobs)
+        for query in self.steps:
+            sid = query.split()[1]
+            self.splunkd.route("GET", "/services/search/jobs/%s/results" % sid,
+                               "results of %s" % sid)
+            self.splunkd.route("POST", "/services/search/jobs/%s/control" % sid,
+                               lambda request, sid=sid: self.cancel(sid))
+        self.pool = client.SearchPool(self.service, max_searches=2, interval=0.01,
+                                      retry_delay=0.01)
+
+    def create(self, request):
+        if self.busy:
+            self.busy -= 1
+            return 503, [], ('<response><messages><msg type="ERROR">Busy.</msg>'
+                             '</messages></response>')
+        sid = request.form["search"][0].split()[1]
+        self.polls[sid] = 0
+        self.running.add(sid)
+        self.peak = max(self.peak, len(self.running))
+        return 201, [], "<response><sid>%s</sid></response>" % sid
+
+    def list_jobs(self, request):
+        entries = []
+        for sid in re.findall(r'sid="([^"]*)"', request.query["search"][0]):
+            self.polls[sid] += 1
+            done = self.polls[sid] >= self.steps["search " + sid]
+            if done:
+                self.running.discard(sid)
+            entries.append(testlib.atom_entry(sid, "/services/search/jobs/" + sid, {
+                "sid": sid, "isDone": "1" if done else "0",
+                "isFailed": "1" if done and sid == "c" else "0",
+                "doneProgress": "1.0" if done else "0.5"}))
+        return 200, [], testlib.atom_feed(entries)
+
+    def cancel(self, sid):
+        self.cancelled.append(sid)
+        self.running.discard(sid)
+        return 200, [], "<response><messages><msg type='INFO'>Done.</msg></messages></response>"
+
+    def test_run(self):
+        searches = list(self.pool.run(["search a", "search b", ("search c", {"earliest_time": "-1h"})]))
+        self.assertEqual([s.query for s in searches], ["search b", "search a", "search c"])
+        self.assertEqual([s.index for s in searches], [1, 0, 2])
+        self.assertEqual(self.peak, 2)
+        a, b, c = sorted(searches, key=lambda s: s.index)
+        self.assertEqual(a.results.read(), "results of a")
+        self.assertEqual(a.error, None)
+        self.assertTrue(a.latency > 0 and a.queued >= 0)
+        # c waits for b to finish before it is dispatched.
+        self.assertTrue(c.queued >= b.latency)
+        self.assertEqual(c.results, None)
+        self.assertTrue(isinstance(c.error, client.OperationError))
+        self.assertEqual(c.job.sid, "c")
+        self.assertEqual(c.params, {"earliest_time": "-1h"})
+        self.assertEqual((self.pool.dispatched, self.pool.completed, self.pool.failed),
+                         (3, 2, 1))
+        created = [r.form for r in self.splunkd.requests if r.method == "POST"]
+        self.assertEqual(created[2]["earliest_time"], ["-1h"])
+
+    def test_retry(self):
+        self.busy = 2
+        [search] = list(self.pool.run(["search b"]))
+        self.assertEqual((search.retries, search.error), (2, None))
+        self.assertEqual(self.pool.dispatch_retries, 2)
+
+    def test_retries_exhausted(self):
+        self.busy = 3
+        [search] = list(self.pool.run(["search b"]))
+        self.assertEqual(search.job, None)
+        self.assertEqual(search.error.status, 503)
+        self.assertEqual((self.pool.dispatch_retries, self.pool.failed), (2, 1))
+
+    def test_no_retry_after_send(self):
+        # A 500 may come after the job was created, so it is not retried.
+        self.splunkd.route("POST", "/services/search/jobs/",
+                           '<response><messages><msg type="ERROR">Oops.</msg>'
+                           '</messages></response>', status=500)
+        [search] = list(self.pool.run(["search b"]))
+        self.assertEqual((search.retries, search.error.status), (0, 500))
+        self.assertEqual(self.pool.dispatch_retries, 0)
+
+    def test_retry_refused(self):
+        refused = socket.error(errno.ECONNREFUSED, "Connection refused")
+        self.assertTrue(client._retryable(refused))
+        self.assertFalse(client._retryable(socket.error(errno.ECONNRESET, "Reset")))
+        self.assertFalse(client._retryable(socket.timeout("timed out")))
+
+    def test_stop_early(self):
+        searches = self.pool.run(["search b", "search d"])
+        self.assertEqual(searches.next().query, "search b")
+        searches.close()
+        self.assertEqual(self.cancelled, ["d"])
+
+    def test_exec_mode(self):
+        self.assertRaises(TypeError, list, self.pool.run(["search b"], exec_mode="blocking"))
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -17,8 +17,12 @@
 from StringIO import StringIO
 import testlib
 from time import sleep
+import splunklib.binding as binding
 import splunklib.results as results
 import io
+import pickle
+import time
+import unittest
 
 
 class ResultsTestCase(testlib.SDKTestCase):
@@ -160,6 +164,228 @@ class ResultsTestCase(testlib.SDKTestCase):
         actual_results = [x for x in results_reader]
         self.assertEquals(expected_results, actual_results)
 
+
+class TestCompactRows(unittest.TestCase):
+    text = """<?xml version='1.0' encoding='UTF-8'?>
+<results preview='0'>
+<meta><fieldOrder><field>a</field><field>b</field></fieldOrder></meta>
+<messages><msg type='DEBUG'>base lispy: [ AND ]</msg></messages>
+<result offset='0'><field k='a'><value><text>1</text></value></field><field k='b'><value><text>2</text></value></field></result>
+<result offset='1'><field k='b'><value><text>3</text></value></field></result>
+<result offset='2'><field k='c'><value><text>4</text></value><value><text>5</text></value></field></result>
+</results>"""
+
+    def read(self, compact):
+        return list(results.ResultsReader(StringIO(self.text), compact=compact))
+
+    def test_same_as_dicts(self):
+        rows = self.read(True)
+        self.assertEqual(rows, self.read(False))
+        self.assertEqual(rows[0], results.Message('DEBUG', 'base lispy: [ AND ]'))
+        self.assertTrue(all(isinstance(row, results.Row) for row in rows[1:]))
+
+    def test_shared_fields(self):
+        rows = self.read(True)
+        self.assertTrue(type(rows[1]) is type(rows[2]))
+        self.assertEqual(rows[1].fields, ('a', 'b'))
+        self.assertEqual(rows[3].fields, ('a', 'b', 'c'))
+
+    def test_mapping(self):
+        row = self.read(True)[2]
+        self.assertEqual(row['b'], '3')
+        self.assertRaises(KeyError, row.__getitem__, 'a')
+        self.assertRaises(KeyError, row.__getitem__, 'z')
+        self.assertEqual(row.get('a', 'x'), 'x')
+        self.assertFalse('a' in row)
+        self.assertEqual(len(row), 1)
+        self.assertEqual(list(row), ['b'])
+        self.assertEqual(row.items(), [('b', '3')])
+        self.assertEqual(self.read(True)[3]['c'], ['4', '5'])
+
+    def test_pickle(self):
+        row = self.read(True)[1]
+        self.assertEqual(pickle.loads(pickle.dumps(row, 2)), row)
+        self.assertTrue(type(pickle.loads(pickle.dumps(row))) is type(row))
+
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+try:
+    import pandas
+except ImportError:
+    pandas = None
+
+
+class TestReadColumnar(unittest.TestCase):
+    text = TestCompactRows.text
+
+    def read(self, **kwargs):
+        return list(results.read_columnar(StringIO(self.text), **kwargs))
+
+    def test_lists(self):
+        optional = results._optional
+        results._optional = lambda name: None
+        try:
+            batches = self.read(batch_size=2)
+            self.assertEqual(batches, [
+                {'a': [1, None], 'b': [2, 3]},
+                {'c': [['4', '5']]}])
+            self.assertEqual(batches[0].keys(), ['a', 'b'])
+            self.assertEqual(self.read(dtypes={'a': str})[0]['a'], ['1', None, None])
+            self.assertRaises(ImportError, self.read, frame=True)
+        finally:
+            results._optional = optional
+
+    @unittest.skipIf(numpy is None, "requires numpy")
+    def test_arrays(self):
+        batch, = self.read(frame=False)
+        self.assertEqual(batch['a'].dtype, numpy.float64)
+        self.assertEqual(batch['a'][0], 1.0)
+        self.assertTrue(numpy.isnan(batch['a'][1]))
+        self.assertEqual(batch['b'].dtype, numpy.float64)
+        self.assertEqual(list(batch['b'][:2]), [2.0, 3.0])
+        self.assertEqual(self.read(frame=False, batch_size=2)[0]['b'].dtype,
+                         numpy.int64)
+        self.assertEqual(batch['c'].dtype, object)
+        self.assertEqual(list(batch['c']), [None, None, ['4', '5']])
+
+    @unittest.skipIf(numpy is None, "requires numpy")
+    def test_dtypes(self):
+        batch, = self.read(frame=False, dtypes={'b': 'float32', 'c': object})
+        self.assertEqual(batch['b'].dtype, numpy.float32)
+        self.assertRaises(ValueError, self.read, frame=False, dtypes={'a': 'int32'})
+
+    @unittest.skipIf(numpy is None, "requires numpy")
+    def test_widening(self):
+        response = {'headers': [('Content-Type', 'application/json')],
+                    'body': StringIO('{"results":[{"a":"1"},{"a":"2"},{"a":"2.5"}]}')}
+        first, second = results.read_columnar(response, batch_size=2, frame=False)
+        self.assertEqual(first['a'].dtype, numpy.int64)
+        self.assertEqual(second['a'].dtype, numpy.float64)
+
+    @unittest.skipIf(pandas is None, "requires pandas")
+    def test_frame(self):
+        frame, = self.read()
+        self.assertTrue(isinstance(frame, pandas.DataFrame))
+        self.assertEqual(list(frame.columns), ['a', 'b', 'c'])
+        self.assertEqual(frame['b'].sum(), 5)
+
+
+class TestJSONResultsReader(unittest.TestCase):
+    def test_results(self):
+        text = """{"preview":false,"init_offset":0,
+            "messages":[{"type":"DEBUG","text":"base lispy: [ AND ]"}],
+            "fields":[{"name":"series"},{"name":"sum(kb)"}],
+            "results":[{"series":"twitter","sum(kb)":"14372242.758775"},
+                       {"series":["a","b"],"sum(kb)":"1"}],
+            "highlighted":{}}"""
+        reader = results.JSONResultsReader(StringIO(text))
+        self.assertEqual(list(reader), [
+            results.Message("DEBUG", "base lispy: [ AND ]"),
+            {'series': 'twitter', 'sum(kb)': '14372242.758775'},
+            {'series': ['a', 'b'], 'sum(kb)': '1'}])
+        self.assertFalse(reader.is_preview)
+
+    def test_field_order_and_encoding(self):
+        text = '{"preview":true,"results":[{"z":"1","a":"\\u00e9"}]}'
+        reader = results.JSONResultsReader(StringIO(text))
+        result = reader.next()
+        self.assertTrue(reader.is_preview)
+        self.assertEqual(result.keys(), ['z', 'a'])
+        self.assertEqual(result['a'], '\xc3\xa9')
+        self.assertTrue(isinstance(result['a'], str))
+
+    def test_concatenated_documents(self):
+        # Realtime exports stream one document per result, with or without
+        # newlines between them.
+        text = "".join('{"preview":true,"offset":%d,"result":{"count":"%d"}}%s'
+                       % (i, i, "\n" if i % 2 else "") for i in range(50))
+        for chunk_size in (1, 7, 64 * 1024):
+            reader = results.JSONResultsReader(StringIO(text), chunk_size=chunk_size)
+            self.assertEqual([r['count'] for r in reader],
+                             [str(i) for i in range(50)])
+
+    def test_document_split_before_pause(self):
+        # A document whose last part is shorter than its first is returned
+        # as soon as that part arrives, not when the stream goes on.
+        doc = '{"preview":false,"offset":0,"result":{"_raw":"%s"}}\n' % ("x" * 4000)
+        parts = [doc[:3900], doc[3900:]]
+        class Stream(object):
+            def read1(self, size):
+                if parts:
+                    return parts.pop(0)
+                sleep(3)
+                return ""
+            read = read1
+        start = time.time()
+        result = results.JSONResultsReader(Stream()).next()
+        self.assertEqual(len(result['_raw']), 4000)
+        self.assertTrue(time.time() - start < 1)
+
+    def test_rows(self):
+        text = '{"fields":["a","b"],"rows":[["1",null],["2","3"]]}'
+        self.assertEqual(list(results.JSONResultsReader(StringIO(text))),
+                         [{'a': '1'}, {'a': '2', 'b': '3'}])
+
+    def test_empty(self):
+        self.assertEqual(list(results.JSONResultsReader(StringIO(""))), [])
+
+    def test_truncated(self):
+        reader = results.JSONResultsReader(StringIO('{"results":[{"a":"1"}'))
+        self.assertRaises(ValueError, list, reader)
+
+
+class TestCSVResultsReader(unittest.TestCase):
+    def test_results(self):
+        text = ('series,"sum(kb)",_raw\r\n'
+                'twitter,14372242.758775,"line one\r\nline, two"\r\n'
+                'splunkd,,\r\n')
+        for chunk_size in (1, 5, 64 * 1024):
+            reader = results.CSVResultsReader(StringIO(text), chunk_size=chunk_size)
+            self.assertEqual(list(reader), [
+                {'series': 'twitter', 'sum(kb)': '14372242.758775',
+                 '_raw': 'line one\r\nline, two'},
+                {'series': 'splunkd'}])
+            self.assertEqual(reader.fields, ['series', 'sum(kb)', '_raw'])
+            self.assertEqual(reader.is_preview, None)
+
+    def test_empty(self):
+        self.assertEqual(list(results.CSVResultsReader(StringIO(""))), [])
+
+
+class TestReaderFor(unittest.TestCase):
+    def response(self, content_type, body):
+        headers = [('content-type', content_type)] if content_type else []
+        return binding.record({'status': 200, 'reason': 'OK',
+                               'headers': headers,
+                               'body': binding.ResponseReader(StringIO(body))})
+
+    def test_content_type(self):
+        for content_type, reader in (
+                ('application/json; charset=UTF-8', results.JSONResultsReader),
+                ('text/csv; charset=UTF-8', results.CSVResultsReader),
+                ('text/xml; charset=UTF-8', results.ResultsReader)):
+            self.assertTrue(isinstance(
+                results.reader_for(self.response(content_type, "")), reader))
+
+    def test_sniff(self):
+        for body, reader in (
+                (' {"results":[]}', results.JSONResultsReader),
+                ('a,b\r\n1,2\r\n', results.CSVResultsReader),
+                ("<?xml version='1.0'?><results preview='0'/>", results.ResultsReader),
+                ('', results.ResultsReader)):
+            found = results.reader_for(self.response(None, body))
+            self.assertTrue(isinstance(found, reader))
+            list(found)
+
+    def test_body(self):
+        response = self.response(None, '{"results":[{"a":"1"}]}')
+        self.assertEqual(list(results.reader_for(response.body)), [{'a': '1'}])
+
+
 if __name__ == "__main__":
     try:
         import unittest2 as unittest
@@ -16,12 +16,17 @@
 
 import testlib
 import logging
+import os
+import shutil
+import tempfile
+import time
 
 import unittest
 
 import splunklib.data as data
 
 import splunklib.client as client
+import splunklib.results as results
 from splunklib.client import AuthenticationError
 from splunklib.client import Service
 from splunklib.binding import HTTPError
@@ -218,6 +223,240 @@ class TestEntityNamespacing(testlib.SDKTestCase):
                      self.service.namespace.sharing)
         self.assertEquals(namespace, entity._proper_namespace())
 
+
+class TestEntityCache(testlib.StubServiceTestCase):
+    def setUp(self):
+        super(TestEntityCache, self).setUp()
+        app = testlib.atom_feed([testlib.atom_entry(
+            "search", "/servicesNS/nobody/system/apps/local/search",
+            {"visible": "1"})])
+        self.splunkd.route("GET", "/services/apps/local/search", app)
+        self.splunkd.route("GET", "/services/apps/local/search/", app)
+        # Once loaded, the entity is in the namespace of its eai:acl.
+        self.splunkd.route("GET", "/servicesNS/nobody/search/apps/local/search/", app)
+        self.splunkd.route("POST", "/servicesNS/nobody/search/apps/local/search/", app)
+        self.splunkd.route("POST", "/services/apps/local/", app, status=201)
+        self.splunkd.route("DELETE", "/services/apps/local/search", "<response/>")
+        self.service = self.stub_service(cache_ttl=60)
+
+    def gets(self):
+        return len([r for r in self.splunkd.requests if r.method == "GET"])
+
+    def test_disabled_by_default(self):
+        service = self.stub_service()
+        self.assertTrue(service.cache is None)
+        service.apps["search"]
+        service.apps["search"]
+        self.assertEqual(self.gets(), 2)
+
+    def test_collection_lookup(self):
+        for _ in range(5):
+            self.assertEqual(self.service.apps["search"].visible, "1")
+        self.assertEqual(self.gets(), 1)
+        self.assertEqual((self.service.cache.hits, self.service.cache.misses), (4, 1))
+
+    def test_entity_load(self):
+        client.Application(self.service, "apps/local/search")
+        entity = client.Application(self.service, "apps/local/search")
+        self.assertEqual(entity.visible, "1")
+        self.assertEqual(self.gets(), 1)
+        # An explicit refresh always goes to the server.
+        entity.refresh()
+        self.assertEqual(self.gets(), 2)
+
+    def test_lookup_after_refresh(self):
+        entity = client.Application(self.service, "apps/local/search")
+        entity.refresh()
+        entity.refresh()
+        self.assertEqual(len(self.service.cache), 1)
+        client.Application(self.service, "apps/local/search")
+        self.assertEqual(self.gets(), 3)
+        self.assertEqual(self.service.cache.hits, 1)
+
+    def test_cached_entities_are_copies(self):
+        first = self.service.apps["search"]
+        first._state = None
+        self.assertEqual(self.service.apps["search"].visible, "1")
+
+    def test_update_invalidates(self):
+        app = self.service.apps["search"]
+        app.update(visible=True)
+        self.service.apps["search"]
+        self.assertEqual(self.gets(), 2)
+        self.assertEqual(len(self.service.cache), 1)
+
+    def test_create_and_delete_invalidate(self):
+        self.service.apps["search"]
+        self.service.apps.create("search")
+        self.service.apps["search"]
+        self.assertEqual(self.gets(), 2)
+        self.service.apps.delete("search")
+        self.assertEqual(len(self.service.cache), 0)
+
+    def seed(self, *paths):
+        for path in paths:
+            self.service.cache.put((path, None, None, None), path)
+
+    def test_stanza_submit_invalidates(self):
+        self.splunkd.route("POST", "/services/configs/conf-props/foo/", "<response/>")
+        self.seed("configs/conf-props/foo", "configs/conf-props", "configs/conf-web/bar")
+        client.Stanza(self.service, "configs/conf-props/foo/").submit({"a": "b"})
+        self.assertEqual(len(self.service.cache), 1)
+        self.assertEqual(self.service.cache.get(("configs/conf-web/bar", None, None, None)),
+                         "configs/conf-web/bar")
+
+    def test_settings_update_invalidates(self):
+        self.splunkd.route("POST", "/services/server/settings/settings", "<response/>")
+        self.seed("server/settings/settings", "server/settings", "server/info")
+        self.service.settings.update(host="x")
+        self.assertEqual(len(self.service.cache), 1)
+
+    def test_expiry(self):
+        self.service.cache.ttl = 0
+        self.service.apps["search"]
+        self.service.apps["search"]
+        self.assertEqual(self.gets(), 2)
+
+    def test_lru_eviction(self):
+        cache = client.EntityCache(max_size=2)
+        cache.put(("a",), 1)
+        cache.put(("b",), 2)
+        cache.get(("a",))
+        cache.put(("c",), 3)
+        self.assertEqual(cache.get(("b",)), None)
+        self.assertEqual(cache.get(("a",)), 1)
+        self.assertEqual(cache.evictions, 1)
+
+    def test_invalidate_children(self):
+        cache = client.EntityCache()
+        cache.put(("apps/local/search",), 1)
+        cache.put(("apps/local/search/setup",), 2)
+        cache.put(("apps/local/searchable",), 3)
+        cache.invalidate("/apps/local/search/")
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.get(("apps/local/searchable",)), 3)
+
+
+RESULTS = """<?xml version='1.0' encoding='UTF-8'?>
+<results preview='0'>
+<meta><fieldOrder><field>count</field></fieldOrder></meta>
+<result offset='0'><field k='count'><value><text>42</text></value></field></result>
+</results>"""
+
+
+class TestResultCache(testlib.StubServiceTestCase):
+    def setUp(self):
+        super(TestResultCache, self).setUp()
+        self.splunkd.route("POST", "/services/search/jobs/", RESULTS)
+        self.splunkd.route("POST", "/servicesNS/nobody/launcher/search/jobs/", RESULTS)
+        search = testlib.atom_entry("daily", "/servicesNS/nobody/search/saved/searches/daily",
+                                    {"search": "search * | stats count",
+                                     "dispatch.latest_time": "now"})
+        self.splunkd.route("GET", "/services/saved/searches/daily", search)
+        self.splunkd.route("POST", "/servicesNS/nobody/search/saved/searches/daily/dispatch",
+                           "<response><sid>123</sid></response>", status=201)
+        self.splunkd.route("GET", "/services/search/jobs/123/", testlib.atom_entry(
+            "123", "/services/search/jobs/123",
+            {"sid": "123", "dispatchState": "DONE", "isDone": "1"}))
+        self.splunkd.route("GET", "/servicesNS/nobody/search/search/jobs/123/results",
+                           RESULTS)
+        self.directory = tempfile.mkdtemp()
+        self.cache = client.ResultCache(self.directory)
+        self.service = self.stub_service(result_cache=self.cache)
+
+    def tearDown(self):
+        super(TestResultCache, self).tearDown()
+        shutil.rmtree(self.directory)
+
+    def searches(self):
+        return len([r for r in self.splunkd.requests
+                    if r.method == "POST" and r.path.endswith("/search/jobs/")])
+
+    def test_oneshot(self):
+        first = self.service.jobs.oneshot("search *  |  head 5")
+        self.assertEqual(first.read(), RESULTS)
+        second = self.service.jobs.oneshot("search * | head 5")
+        self.assertEqual(second.getheader("content-type"), "text/xml; charset=utf-8")
+        self.assertEqual(list(results.reader_for(second)), [{"count": "42"}])
+        self.assertEqual(self.searches(), 1)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_key(self):
+        self.service.jobs.oneshot("search *")
+        self.service.jobs.oneshot('search  "a  b"')
+        self.service.jobs.oneshot('search "a b"')
+        self.service.jobs.oneshot("search *", output_mode="json")
+        self.service.jobs.oneshot("search *", latest_time="-1h")
+        self.service.jobs.oneshot("search *", app="launcher")
+        self.assertEqual(self.searches(), 6)
+
+    def test_token_users(self):
+        self.service.jobs.oneshot("search *")
+        other = self.stub_service(token="Splunk xyz", result_cache=self.cache)
+        other.jobs.oneshot("search *")
+        self.assertEqual(self.searches(), 2)
+        self.assertEqual(self.cache.hits, 0)
+
+    def test_ttl(self):
+        self.assertTrue(self.cache.expires("rt") is None)
+        self.assertTrue(self.cache.expires("rt-5m") is None)
+        now = time.time()
+        self.assertTrue(self.cache.expires("-1h") <= now + self.cache.ttl + 1)
+        self.assertTrue(self.cache.expires("1262304000") >= now + self.cache.fixed_ttl)
+        self.assertTrue(self.cache.expires("2010-01-01T00:00:00.000+02:00") >=
+                        now + self.cache.fixed_ttl)
+        self.assertTrue(self.cache.expires(str(now + 7200)) <= now + self.cache.ttl + 1)
+        # A time without an offset may be up to a day later in UTC, so a window
+        # ending 3 hours from now, or a few hours ago, may still be filling.
+        for hours in (3, -3):
+            naive = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(now + hours * 3600))
+            self.assertTrue(self.cache.expires(naive) <= now + self.cache.ttl + 1)
+        naive = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(now - 2 * 86400))
+        self.assertTrue(self.cache.expires(naive) >= now + self.cache.fixed_ttl)
+        self.service.jobs.oneshot("search *", latest_time="rt")
+        self.service.jobs.oneshot("search *", latest_time="rt")
+        self.assertEqual(self.searches(), 2)
+        self.cache.ttl = -1
+        self.service.jobs.oneshot("search *")
+        self.service.jobs.oneshot("search *")
+        self.assertEqual(self.searches(), 4)
+
+    def test_eviction(self):
+        size = len(RESULTS) + 100
+        self.cache.max_bytes = 2 * size
+        for n in range(3):
+            self.service.jobs.oneshot("search %d" % n).close()
+        self.assertEqual(len(self.cache), 2)
+        self.assertEqual(self.cache.evictions, 1)
+        self.assertEqual(len(os.listdir(self.directory)), 2)
+        self.service.jobs.oneshot("search 0")
+        self.assertEqual(self.searches(), 4)
+        # Results larger than the cache are returned, but not kept.
+        self.cache.max_bytes = 10
+        self.assertEqual(self.service.jobs.oneshot("search 3").read(), RESULTS)
+        self.assertEqual(len(os.listdir(self.directory)), 2)
+        self.assertEqual(len(self.cache), 2)
+
+    def test_shared_directory(self):
+        self.service.jobs.oneshot("search *")
+        cache = client.ResultCache(self.directory)
+        self.assertEqual(len(cache), 1)
+        self.service.result_cache = cache
+        self.assertEqual(self.service.jobs.oneshot("search *").read(), RESULTS)
+        self.assertEqual(self.searches(), 1)
+        self.cache.clear()
+        self.assertEqual(self.service.jobs.oneshot("search *").read(), RESULTS)
+        self.assertEqual(self.searches(), 2)
+
+    def test_dispatch_results(self):
+        search = self.service.saved_searches["daily"]
+        self.assertEqual(search.dispatch_results().read(), RESULTS)
+        self.assertEqual(search.dispatch_results().read(), RESULTS)
+        dispatches = [r for r in self.splunkd.requests if r.path.endswith("/dispatch")]
+        self.assertEqual(len(dispatches), 1)
+        self.assertEqual(self.cache.hits, 1)
+
+
 if __name__ == "__main__":
     try:
         import unittest2 as unittest
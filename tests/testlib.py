@@ -22,6 +22,7 @@ import sys
 sys.path.insert(0, '../')
 sys.path.insert(0, '../examples')
 
+import splunklib.binding as binding
 import splunklib.client as client
 from time import sleep
 from datetime import datetime, timedelta
@@ -38,6 +39,12 @@ except ImportError:
 
 import os
 import time
+import socket
+import threading
+import urlparse
+import BaseHTTPServer
+import SocketServer
+from xml.sax.saxutils import escape
 
 import logging
 logging.basicConfig(
@@ -77,6 +84,247 @@ def wait(predicate, timeout=60, pause_time=0.5):
         logging.debug("wait finished after %s seconds", datetime.now()-start)
 
 
+def atom_entry(title, path, content=None, acl=None):
+    """Returns the XML of an Atom ``<entry>`` as splunkd would send it.
+
+    *content* is a ``dict`` of the entity's content, and *acl* a ``dict`` of
+    its ``eai:acl`` metadata (defaults to the ``nobody``/``search`` namespace).
+    """
+    if acl is None:
+        acl = {'owner': 'nobody', 'app': 'search', 'sharing': 'app'}
+    content = dict(content or {})
+    keys = ''.join('<s:key name="%s">%s</s:key>' % (k, escape(str(v)))
+                   for k, v in sorted(content.items()))
+    acl_keys = ''.join('<s:key name="%s">%s</s:key>' % (k, escape(str(v)))
+                       for k, v in sorted(acl.items()))
+    return ('<entry xmlns="http://www.w3.org/2005/Atom" '
+            'xmlns:s="http://dev.splunk.com/ns/rest">'
+            '<title>%s</title><id>https://localhost:8089%s</id>'
+            '<link href="%s" rel="alternate"/><link href="%s" rel="list"/>'
+            '<content type="text/xml"><s:dict>%s'
+            '<s:key name="eai:acl"><s:dict>%s</s:dict></s:key>'
+            '</s:dict></content></entry>') % (
+        escape(title), path, path, path, keys, acl_keys)
+
+
+def atom_feed(entries, total=None):
+    """Returns the XML of an Atom ``<feed>`` of *entries*.
+
+    *entries* are strings returned by :func:`atom_entry`. *total* is the
+    ``totalResults`` of the feed (defaults to the number of entries).
+    """
+    if total is None:
+        total = len(entries)
+    return ('<feed xmlns="http://www.w3.org/2005/Atom" '
+            'xmlns:s="http://dev.splunk.com/ns/rest" '
+            'xmlns:opensearch="http://a9.com/-/spec/opensearch/1.1/">'
+            '<title>feed</title><id>https://localhost:8089/services</id>'
+            '<opensearch:totalResults>%d</opensearch:totalResults>'
+            '%s</feed>') % (total, ''.join(
+                e.replace(' xmlns="http://www.w3.org/2005/Atom" '
+                          'xmlns:s="http://dev.splunk.com/ns/rest"', '')
+                for e in entries))
+
+
+class _StubHTTPServer(SocketServer.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def handle_error(self, request, client_address):
+        # Clients hanging up on kept-alive connections is business as usual.
+        logging.debug("stub splunkd: error handling request from %s",
+                      client_address, exc_info=True)
+
+
+class _StubRequestHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        BaseHTTPServer.BaseHTTPRequestHandler.setup(self)
+        self.server.stub._connected(self.connection)
+
+    def log_message(self, format, *args):
+        logging.debug("stub splunkd: " + format, *args)
+
+    def _dispatch(self):
+        length = int(self.headers.getheader('content-length') or 0)
+        body = self.rfile.read(length) if length else ''
+        path, _, query = self.path.partition('?')
+        request = StubRequest(self.command, path,
+                              urlparse.parse_qs(query, keep_blank_values=True),
+                              self.headers, body)
+        status, headers, body = self.server.stub._respond(request)
+        self.send_response(status)
+        if not isinstance(body, basestring):
+            # A body given as a sequence of parts is streamed, one chunk per
+            # part, as splunkd streams exports.
+            for key, value in headers:
+                self.send_header(key, value)
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.end_headers()
+            for part in body:
+                if part:
+                    self.wfile.write("%x\r\n%s\r\n" % (len(part), part))
+                    self.wfile.flush()
+            self.wfile.write("0\r\n\r\n")
+            return
+        length = None
+        for key, value in headers:
+            if key.lower() == 'content-length':
+                length = int(value)
+            self.send_header(key, value)
+        if length is None:
+            self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        if length is not None and length > len(body):
+            # A response that is shorter than it says it is simulates a
+            # connection lost in the middle of the body.
+            self.close_connection = 1
+
+    do_GET = do_POST = do_DELETE = _dispatch
+
+
+class StubRequest(object):
+    """A request received by a :class:`StubSplunkd`."""
+    def __init__(self, method, path, query, headers, body):
+        self.method = method
+        self.path = path
+        self.query = query
+        self.headers = headers
+        self.body = body
+
+    @property
+    def form(self):
+        """The ``x-www-form-urlencoded`` arguments in the body."""
+        return urlparse.parse_qs(self.body, keep_blank_values=True)
+
+
+class StubSplunkd(object):
+    """An in-process HTTP/1.1 server standing in for splunkd.
+
+    Tests that exercise the wire behavior of the SDK (connection reuse,
+    concurrency, and so on) rather than the behavior of splunkd can run
+    against a ``StubSplunkd`` instead of a real Splunk instance. Responses are
+    registered per method and path with :meth:`route`; anything else gets a
+    404. All requests are recorded in ``requests``.
+
+    **Example**::
+
+        with StubSplunkd() as stub:
+            stub.route('GET', '/services/server/info', body='<feed/>')
+            context = binding.Context(scheme='http', port=stub.port)
+            context.get('/services/server/info')
+    """
+    not_found = '<response><messages><msg type="ERROR">Not Found</msg></messages></response>'
+
+    def __init__(self):
+        self.connections = 0
+        self.requests = []
+        self._routes = {}
+        self._sockets = []
+        self._lock = threading.Lock()
+        self._server = _StubHTTPServer(('127.0.0.1', 0), _StubRequestHandler)
+        self._server.stub = self
+        self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    @property
+    def host(self):
+        return self._server.server_address[0]
+
+    @property
+    def port(self):
+        return self._server.server_address[1]
+
+    def context_kwargs(self, **kwargs):
+        """Returns keyword arguments to connect a ``Context`` to this stub."""
+        kwargs.setdefault('scheme', 'http')
+        kwargs.setdefault('host', self.host)
+        kwargs.setdefault('port', self.port)
+        return kwargs
+
+    def route(self, method, path, body='', status=200, headers=None):
+        """Registers the response to *method* requests of *path*.
+
+        *body* may also be a function taking a :class:`StubRequest` and
+        returning a ``(status, headers, body)`` tuple. A body that is an
+        iterable of strings, rather than a string, is sent with chunked
+        transfer encoding as each string is produced. If *headers* include a
+        ``Content-Length`` greater than the length of *body*, the connection
+        is closed after *body* is sent.
+        """
+        if headers is None:
+            headers = [('Content-Type', 'text/xml; charset=utf-8')]
+        self._routes[method, path] = (status, headers, body)
+        return self
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever,
+                                        kwargs={'poll_interval': 0.05})
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        self.drop_connections()
+
+    def drop_connections(self):
+        """Closes all open client connections, as a server timing out
+        keep-alive connections would."""
+        with self._lock:
+            sockets, self._sockets = self._sockets, []
+        for sock in sockets:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except socket.error:
+                pass
+
+    def _connected(self, sock):
+        with self._lock:
+            self.connections += 1
+            self._sockets.append(sock)
+
+    def _respond(self, request):
+        with self._lock:
+            self.requests.append(request)
+        route = self._routes.get((request.method, request.path))
+        if route is None:
+            return 404, [('Content-Type', 'text/xml')], self.not_found
+        status, headers, body = route
+        if callable(body):
+            return body(request)
+        return status, headers, body
+
+
+class StubServiceTestCase(unittest.TestCase):
+    """A test case run against a :class:`StubSplunkd`, ``self.splunkd``,
+    rather than a Splunk instance, through ``self.service``, a
+    ``client.Service`` with a pooled handler that is connected to it."""
+    def setUp(self):
+        super(StubServiceTestCase, self).setUp()
+        self.splunkd = StubSplunkd().start()
+        self.service = self.stub_service()
+
+    def tearDown(self):
+        self.splunkd.stop()
+        super(StubServiceTestCase, self).tearDown()
+
+    def stub_service(self, **kwargs):
+        """Returns another ``client.Service`` connected to ``self.splunkd``,
+        made with *kwargs*."""
+        kwargs.setdefault('handler', binding.pooled_handler())
+        kwargs.setdefault('token', 'Splunk abc')
+        return client.Service(**self.splunkd.context_kwargs(**kwargs))
+
+
 class SDKTestCase(unittest.TestCase):
     restart_already_required = False
     installedApps = []